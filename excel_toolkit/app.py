@@ -45,6 +45,8 @@ from excel_toolkit.db_config import get_db_manager
 # 导入业务模块
 from excel_toolkit.tooltip import create_tooltip
 from excel_toolkit.warehouse_router import read_inventory
+from excel_toolkit.key_history import DEFAULT_HISTORY_PATH
+from excel_toolkit import sheet_cache
 
 
 class ToolkitAppRefactored(
@@ -88,6 +90,7 @@ class ToolkitAppRefactored(
         self._text_widgets = []
         self.theme_mode_var = tk.StringVar(value="系统")
         self.topmost_var = tk.BooleanVar(value=True)
+        self.sheet_cache_var = tk.BooleanVar(value=False)
         self._accent = "#3b82f6"
         
         # 应用初始主题
@@ -183,9 +186,16 @@ class ToolkitAppRefactored(
         topmost_check = ttk.Checkbutton(right_box, text="📌 置顶", variable=self.topmost_var)
         topmost_check.pack(side='left')
         
+        # 磁盘缓存选项（默认关闭）
+        cache_check = ttk.Checkbutton(right_box, text="💾 缓存", variable=self.sheet_cache_var)
+        cache_check.pack(side='left', padx=(10, 0))
+        create_tooltip(cache_check, "把大表的解析结果缓存到 ~/.excel_toolkit/cache（最多占用 512MB），"
+                                    "再次读取未修改的文件时更快")
+        
         # 绑定事件
         self.theme_mode_var.trace_add("write", lambda *a: self._apply_theme(self.theme_mode_var.get()))
         self.topmost_var.trace_add("write", lambda *a: self._on_topmost_change())
+        self.sheet_cache_var.trace_add("write", lambda *a: self._on_sheet_cache_change())
         
         # 分隔线
         ttk.Separator(self.master, orient='horizontal').pack(fill='x', padx=10, pady=10)
@@ -333,6 +343,10 @@ class ToolkitAppRefactored(
                 self._trace_persist(self.file1_var)
                 self._trace_persist(self.sheet1_var)
                 self._trace_persist(self.col1_var)
+                self.zip1_var = tk.StringVar(value="")
+                self.zip1_mode_var = tk.StringVar(value="补全")
+                self._trace_persist(self.zip1_var)
+                self._trace_persist(self.zip1_mode_var)
             
             # Tab2 - SKU填充
             if not hasattr(self, 'file2_var'):
@@ -429,6 +443,12 @@ class ToolkitAppRefactored(
                 self._trace_persist(self.file3_var)
                 self._trace_persist(self.col3_var)
                 self._trace_persist(self.sheet3_var)
+                self.scope3_var = tk.StringVar(value="每个工作表单独判断")
+                self._trace_persist(self.scope3_var)
+                self.history3_var = tk.BooleanVar(value=False)
+                self.history3_path_var = tk.StringVar(value=DEFAULT_HISTORY_PATH)
+                self._trace_persist(self.history3_var)
+                self._trace_persist(self.history3_path_var)
             
             # Tab5 - 对比列
             if not hasattr(self, 'file5_x_var'):
@@ -677,6 +697,14 @@ class ToolkitAppRefactored(
     
     # ==================== 主题 ====================
     
+    def _on_sheet_cache_change(self):
+        """缓存选项变化时的回调"""
+        sheet_cache.set_enabled(self.sheet_cache_var.get())
+        try:
+            self._persist_config()
+        except (IOError, OSError) as e:
+            print(f"警告：保存配置失败: {e}")
+    
     def _on_topmost_change(self):
         """置顶状态变化时的回调"""
         try:
@@ -1075,6 +1103,14 @@ Ctrl+Shift+Tab - 上一个标签页
             except Exception:
                 pass
         
+        # 加载缓存选项
+        use_cache = data.get("sheet_cache")
+        if use_cache is not None:
+            try:
+                self.sheet_cache_var.set(bool(use_cache))
+            except Exception:
+                pass
+        
         # 加载所有已注册的变量
         vars_data = data.get("vars", {})
         if hasattr(self, '_persist_vars'):
@@ -1090,6 +1126,7 @@ Ctrl+Shift+Tab - 上一个标签页
         p = self._config_path()
         data = {
             "always_on_top": self.topmost_var.get() if hasattr(self, 'topmost_var') else False,
+            "sheet_cache": self.sheet_cache_var.get() if hasattr(self, 'sheet_cache_var') else False,
         }
         
         # 保存所有已注册的变量
@@ -1,5 +1,6 @@
 from excel_toolkit.excel_lite import ExcelReader, ExcelWriter
 from excel_toolkit.excel_lite import column_index_from_string
+from excel_toolkit.sheet_query import SheetQuery, text_key
 
 
 def process_compare_columns(file_x_path, sheets_x_names, col_x_letter, file_y_path, sheet_y_name, col_y_letter, logger=print, ignore_duplicates=True):
@@ -9,6 +10,13 @@ def process_compare_columns(file_x_path, sheets_x_names, col_x_letter, file_y_pa
     except Exception:
         return f"错误：列号无效。请检查 X 列 '{col_x_letter}' 和 Y 列 '{col_y_letter}' 是否为有效的Excel列号。"
 
+    # 两端的值导入临时 SQLite 库，差集/计数差异由 SQL 完成，内存占用不随行数增长
+    with SheetQuery(temp_file=True) as q:
+        return _compare_columns(q, file_x_path, sheets_x_names, x_col_index, file_y_path, sheet_y_name,
+                                y_col_index, logger, ignore_duplicates)
+
+
+def _compare_columns(q, file_x_path, sheets_x_names, x_col_index, file_y_path, sheet_y_name, y_col_index, logger, ignore_duplicates):
     try:
         logger(f"正在加载表格X: {file_x_path}...")
         wb_X = ExcelReader(file_x_path)
@@ -16,7 +24,6 @@ def process_compare_columns(file_x_path, sheets_x_names, col_x_letter, file_y_pa
         return f"加载表格X失败: {e}"
 
     # 收集X端
-    x_values = set() if ignore_duplicates else {}
     valid_x_sheets = []
     for sname in sheets_x_names or []:
         if sname in wb_X.sheetnames:
@@ -30,23 +37,15 @@ def process_compare_columns(file_x_path, sheets_x_names, col_x_letter, file_y_pa
     for sname in valid_x_sheets:
         ws = wb_X[sname]
         logger(f"  > 读取X的子表: {sname}")
-        for row in ws.iter_rows(min_col=x_col_index, max_col=x_col_index, min_row=2):
-            cell = row[0]
-            val = cell.value
-            if val is None or val == "":
-                continue
-            sval = str(val).strip()
-            if not sval:
-                continue
-            if ignore_duplicates:
-                x_values.add(sval)
-            else:
-                x_values[sval] = x_values.get(sval, 0) + 1
+        q.load_sheet('x', ws, {'v': x_col_index}, key=text_key)
+    wb_X.close()
+    q.create_index('x', ['v'])
+    total_x = q.scalar('SELECT COUNT(*) FROM x')
+    unique_x = q.scalar('SELECT COUNT(DISTINCT v) FROM x')
     if ignore_duplicates:
-        logger(f"X端合计采集 {len(x_values)} 个唯一值。")
+        logger(f"X端合计采集 {unique_x} 个唯一值。")
     else:
-        logger(f"X端合计采集 {sum(x_values.values())} 个值（含重复），唯一值 {len(x_values)} 个。")
-    wb_X.close()
+        logger(f"X端合计采集 {total_x} 个值（含重复），唯一值 {unique_x} 个。")
 
     # Y端
     try:
@@ -58,34 +57,27 @@ def process_compare_columns(file_x_path, sheets_x_names, col_x_letter, file_y_pa
     except Exception as e:
         return f"加载表格Y失败: {e}"
 
-    y_values = set() if ignore_duplicates else {}
     logger(f"  > 读取Y的子表: {sheet_y_name}")
-    for row in ws_Y.iter_rows(min_col=y_col_index, max_col=y_col_index, min_row=2):
-        cell = row[0]
-        val = cell.value
-        if val is None or val == "":
-            continue
-        sval = str(val).strip()
-        if not sval:
-            continue
-        if ignore_duplicates:
-            y_values.add(sval)
-        else:
-            y_values[sval] = y_values.get(sval, 0) + 1
+    q.load_sheet('y', ws_Y, {'v': y_col_index}, key=text_key, index=['v'])
+    total_y = q.scalar('SELECT COUNT(*) FROM y')
+    unique_y = q.scalar('SELECT COUNT(DISTINCT v) FROM y')
     if ignore_duplicates:
-        logger(f"Y端合计采集 {len(y_values)} 个唯一值。")
+        logger(f"Y端合计采集 {unique_y} 个唯一值。")
     else:
-        logger(f"Y端合计采集 {sum(y_values.values())} 个值（含重复），唯一值 {len(y_values)} 个。")
+        logger(f"Y端合计采集 {total_y} 个值（含重复），唯一值 {unique_y} 个。")
     wb_Y.close()
 
     if ignore_duplicates:
-        missing_in_y = x_values - y_values
-        extra_in_y = y_values - x_values
-
-        def log_examples_set(title, items):
-            logger(f"{title}：{len(items)} 个")
+        # 一端有、另一端没有的唯一值（按值排序）
+        missing_sql = 'SELECT DISTINCT v FROM x WHERE NOT EXISTS (SELECT 1 FROM y WHERE y.v = x.v)'
+        extra_sql = 'SELECT DISTINCT v FROM y WHERE NOT EXISTS (SELECT 1 FROM x WHERE x.v = y.v)'
+        missing_in_y = q.scalar(f'SELECT COUNT(*) FROM ({missing_sql})')
+        extra_in_y = q.scalar(f'SELECT COUNT(*) FROM ({extra_sql})')
+
+        def log_examples_set(title, count_items, sql):
+            logger(f"{title}：{count_items} 个")
             count = 0
-            for v in sorted(items):
+            for (v,) in q.query(f'{sql} ORDER BY v LIMIT 20'):
                 logger(f"  - {v}")
                 count += 1
                 if count >= 20:
@@ -93,43 +85,41 @@ def process_compare_columns(file_x_path, sheets_x_names, col_x_letter, file_y_pa
                     break
 
         if missing_in_y:
-            log_examples_set("Y中缺失的值 (存在于X)", missing_in_y)
+            log_examples_set("Y中缺失的值 (存在于X)", missing_in_y, missing_sql)
         if extra_in_y:
-            log_examples_set("Y中的多余值 (不在X)", extra_in_y)
+            log_examples_set("Y中的多余值 (不在X)", extra_in_y, extra_sql)
 
         if not missing_in_y and not extra_in_y:
             return (
                 "对比完成：一致。\n\n"
-                f"X端唯一值: {len(x_values)}；Y端唯一值: {len(y_values)}。\n"
+                f"X端唯一值: {unique_x}；Y端唯一值: {unique_y}。\n"
                 "两个表的指定列数据集合完全相同。"
             )
         else:
             return (
                 "对比完成：存在差异。\n\n"
-                f"X端唯一值: {len(x_values)}；Y端唯一值: {len(y_values)}。\n"
-                f"Y缺失: {len(missing_in_y)}；Y多余: {len(extra_in_y)}。\n"
+                f"X端唯一值: {unique_x}；Y端唯一值: {unique_y}。\n"
+                f"Y缺失: {missing_in_y}；Y多余: {extra_in_y}。\n"
                 "详细差异已在日志中展示部分示例。"
             )
     else:
-        y_counts = y_values
-        x_counts = x_values
-        missing_in_y_counts = {}
-        extra_in_y_counts = {}
-        for v, xc in x_counts.items():
-            yc = y_counts.get(v, 0)
-            if xc > yc:
-                missing_in_y_counts[v] = xc - yc
-        for v, yc in y_counts.items():
-            xc = x_counts.get(v, 0)
-            if yc > xc:
-                extra_in_y_counts[v] = yc - xc
-
-        def log_examples_counts(title, items_dict):
-            logger(f"{title}：{len(items_dict)} 个值存在计数差异")
+        # 两端按值计数，左连接后比较计数
+        q.execute('CREATE TABLE xc AS SELECT v, COUNT(*) AS c FROM x GROUP BY v')
+        q.execute('CREATE TABLE yc AS SELECT v, COUNT(*) AS c FROM y GROUP BY v')
+        q.create_index('xc', ['v'], unique=True)
+        q.create_index('yc', ['v'], unique=True)
+        missing_sql = ('SELECT xc.v AS v, xc.c AS xn, COALESCE(yc.c, 0) AS yn FROM xc LEFT JOIN yc ON yc.v = xc.v '
+                       'WHERE xc.c > COALESCE(yc.c, 0)')
+        extra_sql = ('SELECT yc.v AS v, COALESCE(xc.c, 0) AS xn, yc.c AS yn FROM yc LEFT JOIN xc ON xc.v = yc.v '
+                     'WHERE yc.c > COALESCE(xc.c, 0)')
+        totals_sql = 'SELECT COUNT(*), COALESCE(SUM(ABS(xn - yn)), 0) FROM ({})'
+        missing_count, total_missing = q.fetchone(totals_sql.format(missing_sql))
+        extra_count, total_extra = q.fetchone(totals_sql.format(extra_sql))
+
+        def log_examples_counts(title, count_items, sql):
+            logger(f"{title}：{count_items} 个值存在计数差异")
             count = 0
-            for v in sorted(items_dict.keys()):
-                xc = x_counts.get(v, 0)
-                yc = y_counts.get(v, 0)
+            for v, xc, yc in q.query(f'{sql} ORDER BY v LIMIT 20'):
                 diff = abs(xc - yc)
                 logger(f"  - {v}: X={xc}, Y={yc}, 差={diff}")
                 count += 1
@@ -137,26 +127,22 @@ def process_compare_columns(file_x_path, sheets_x_names, col_x_letter, file_y_pa
                     logger("  ... 其余略")
                     break
 
-        if missing_in_y_counts:
-            log_examples_counts("Y中缺失的值（考虑重复次数）", missing_in_y_counts)
-        if extra_in_y_counts:
-            log_examples_counts("Y中的多余值（考虑重复次数）", extra_in_y_counts)
-
-        total_x = sum(x_counts.values())
-        total_y = sum(y_counts.values())
-        total_missing = sum(missing_in_y_counts.values())
-        total_extra = sum(extra_in_y_counts.values())
+        if missing_count:
+            log_examples_counts("Y中缺失的值（考虑重复次数）", missing_count, missing_sql)
+        if extra_count:
+            log_examples_counts("Y中的多余值（考虑重复次数）", extra_count, extra_sql)
 
         if total_missing == 0 and total_extra == 0:
             return (
                 "对比完成：一致（考虑重复次数）。\n\n"
-                f"X总值: {total_x}；Y总值: {total_y}。唯一值 X={len(x_counts)}，Y={len(y_counts)}。\n"
+                f"X总值: {total_x}；Y总值: {total_y}。唯一值 X={unique_x}，Y={unique_y}。\n"
                 "两个表的指定列数据在计数上完全一致。"
             )
         else:
             return (
                 "对比完成：存在差异（考虑重复次数）。\n\n"
-                f"X总值: {total_x}；Y总值: {total_y}。唯一值 X={len(x_counts)}，Y={len(y_counts)}。\n"
+                f"X总值: {total_x}；Y总值: {total_y}。唯一值 X={unique_x}，Y={unique_y}。\n"
                 f"Y缺失总数: {total_missing}；Y多余总数: {total_extra}。\n"
                 "详细差异已在日志中展示部分示例。"
             )
+
@@ -606,32 +606,19 @@ def export_shipping_config_to_excel(output_file: str, config_name: str = "默认
         if not config:
             return False, "数据库中没有配置数据"
         
-        wb = Workbook()
-        
-        # 子表1: 映射1
-        if config.get("column_mapping_1"):
-            ws1 = wb.active
-            ws1.title = "子表1"
-            ws1.append(["订单列名", "模板列名"])
-            for order_col, template_col in config["column_mapping_1"].items():
-                ws1.append([order_col, template_col])
-        
-        # 子表2: 映射2
-        if config.get("column_mapping_2"):
-            ws2 = wb.create_sheet("子表2")
-            ws2.append(["订单列名", "模板列名"])
-            for order_col, template_col in config["column_mapping_2"].items():
-                ws2.append([order_col, template_col])
-        
-        # 仓库配置子表
-        shipping_map = config.get("shipping_map", {})
-        for wh_name, carrier_mapping in shipping_map.items():
-            ws_wh = wb.create_sheet(wh_name)
-            ws_wh.append(["承运商", "物流渠道"])
-            for carrier, service in carrier_mapping.items():
-                ws_wh.append([carrier, service])
-        
-        wb.save(output_file)
+        with ExcelWriter(output_file) as wb:
+            # 子表1: 映射1
+            if config.get("column_mapping_1"):
+                wb.write_rows("子表1", [["订单列名", "模板列名"], *config["column_mapping_1"].items()])
+            
+            # 子表2: 映射2
+            if config.get("column_mapping_2"):
+                wb.write_rows("子表2", [["订单列名", "模板列名"], *config["column_mapping_2"].items()])
+            
+            # 仓库配置子表
+            shipping_map = config.get("shipping_map", {})
+            for wh_name, carrier_mapping in shipping_map.items():
+                wb.write_rows(wh_name, [["承运商", "物流渠道"], *carrier_mapping.items()])
         return True, f"已导出Excel配置文件: {output_file}"
     
     except Exception as e:
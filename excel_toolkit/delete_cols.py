@@ -2,11 +2,21 @@
 批量删除表格列功能
 
 用于从Excel文件中批量删除指定的列（如D、E列）。
+每个工作表只流式扫描一遍，不加载整个工作簿；批量模式下多个文件在进程池中并行处理。
 """
 
-from openpyxl import load_workbook
-from openpyxl.utils import column_index_from_string
+import concurrent.futures
 import os
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+
+from excel_toolkit.excel_lite import ExcelReader, column_index_from_string, get_column_letter
+
+# Excel 的最大列数（XFD）
+_MAX_COLUMN = 16384
+
+# 批量模式处理的文件类型
+_TABLE_EXTS = ('.xlsx', '.xlsm', '.csv', '.tsv')
 
 
 def parse_column_input(columns_str: str) -> list:
@@ -38,7 +48,6 @@ def parse_column_input(columns_str: str) -> list:
                 if start_idx > end_idx:
                     start_idx, end_idx = end_idx, start_idx
                 for i in range(start_idx, end_idx + 1):
-                    from openpyxl.utils import get_column_letter
                     result.append(get_column_letter(i))
                 # 从大到小排序（便于从后往前删除）
                 result.sort(key=lambda x: column_index_from_string(x), reverse=True)
@@ -66,9 +75,11 @@ def delete_columns(file_path: str, columns: list, logger=None, sheet_name: str =
     """
     从Excel文件中删除指定的列
     
+    所有要删除的列在一遍流式重写中完成，列宽、合并单元格等范围同步左移。
+    
     Args:
         file_path: Excel文件路径
-        columns: 要删除的列列表 (如 ['D', 'E'])，应该已经从大到小排序
+        columns: 要删除的列列表 (如 ['D', 'E'])
         logger: 日志回调函数
         sheet_name: 可选，指定工作表名称（为空则处理所有工作表）
     
@@ -89,59 +100,157 @@ def delete_columns(file_path: str, columns: list, logger=None, sheet_name: str =
     
     # 验证列标识
     for col in columns:
-        if not col.isalpha():
-            raise ValueError(f"无效的列标识: {col}")
-        try:
-            column_index_from_string(col)
-        except ValueError:
+        if not col.isalpha() or not col.isascii() or column_index_from_string(col) > _MAX_COLUMN:
             raise ValueError(f"无效的列标识: {col}")
     
     log(f"正在加载文件: {os.path.basename(file_path)}")
     
-    # 加载工作簿
-    wb = load_workbook(file_path)
+    wb = ExcelReader(file_path)
+    try:
+        # 确定要处理的工作表
+        if sheet_name:
+            if sheet_name not in wb.sheetnames:
+                raise ValueError(f"工作表 '{sheet_name}' 不存在")
+            sheets_to_process = [sheet_name]
+        else:
+            sheets_to_process = wb.sheetnames
+        
+        stats = {
+            'sheets_processed': 0,
+            'columns_deleted': 0
+        }
+        
+        # 不按工作表声明的范围预先筛选（<dimension> 可能过期），超出数据范围的列由重写时识别
+        indexes = sorted({column_index_from_string(col) for col in columns})
+        sheet_columns = {sname: indexes for sname in sheets_to_process}
+        
+        # 保存文件（一次流式重写，完成后读取器被关闭）
+        log("正在删除列并保存文件...")
+        found = wb.delete_cols(sheet_columns)
+    finally:
+        wb.close()
     
-    # 确定要处理的工作表
-    if sheet_name:
-        if sheet_name not in wb.sheetnames:
-            raise ValueError(f"工作表 '{sheet_name}' 不存在")
-        sheets_to_process = [sheet_name]
-    else:
-        sheets_to_process = wb.sheetnames
+    for sname in sheets_to_process:
+        log(f"  处理工作表: {sname}")
+        deleted = set(found.get(sname, ()))
+        for col_idx in indexes:
+            if col_idx in deleted:
+                log(f"    ✓ 已删除列 {get_column_letter(col_idx)}")
+            else:
+                log(f"    ⚠ 列 {get_column_letter(col_idx)} 超出工作表范围，跳过")
+        stats['columns_deleted'] += len(deleted)
+        stats['sheets_processed'] += 1
+    
+    log(f"✅ 保存完成!")
+    
+    return stats
+
+
+def find_table_files(folder: str) -> list:
+    """列出文件夹中可以删除列的表格文件（不含子文件夹和 Excel 的 ~$ 临时文件），按文件名排序"""
+    return sorted(
+        os.path.join(folder, name) for name in os.listdir(folder)
+        if name.lower().endswith(_TABLE_EXTS) and not name.startswith('~$')
+        and os.path.isfile(os.path.join(folder, name))
+    )
+
+
+def _delete_columns_in_worker(file_path: str, columns: list, sheet_name: str = None):
+    """进程池中处理单个文件，返回 (统计信息, 日志列表)"""
+    messages = []
+    stats = delete_columns(file_path, columns, messages.append, sheet_name)
+    return stats, messages
+
+
+def delete_columns_batch(file_paths: list, columns: list, logger=None, sheet_name: str = None,
+                         workers: int = None) -> dict:
+    """
+    对多个文件删除相同的列（如把保存的模板应用到整个文件夹）
+    
+    各文件在进程池中并行处理，每个文件完成后输出其日志（按完成顺序）；单个文件失败不影响其他文件。
+    同时交给进程池的文件不超过进程数，进程池不可用或中途崩溃时，只有尚未交出的文件改为在本进程中
+    顺序处理；已交出的文件可能已经写入，崩溃时记为失败，不会再删除一次列。
     
-    stats = {
+    Args:
+        file_paths: 文件路径列表
+        columns: 要删除的列列表 (如 ['D', 'E'])
+        logger: 日志回调函数
+        sheet_name: 可选，指定工作表名称（为空则处理所有工作表；文件中没有该工作表时记为失败）
+        workers: 进程数，默认取CPU核数
+    
+    Returns:
+        dict: 统计信息 {'files_processed': int, 'files_failed': int,
+                        'sheets_processed': int, 'columns_deleted': int}
+    """
+    def log(msg):
+        if logger:
+            logger(msg)
+        else:
+            print(msg)
+    
+    if not columns:
+        raise ValueError("未指定要删除的列")
+    
+    totals = {
+        'files_processed': 0,
+        'files_failed': 0,
         'sheets_processed': 0,
         'columns_deleted': 0
     }
     
-    # 确保columns是从大到小排序的（从后往前删除，避免列索引变化问题）
-    sorted_columns = sorted(columns, key=lambda x: column_index_from_string(x), reverse=True)
-    
-    for sname in sheets_to_process:
-        ws = wb[sname]
-        log(f"  处理工作表: {sname}")
-        
-        deleted_in_sheet = 0
-        for col in sorted_columns:
-            try:
-                col_idx = column_index_from_string(col)
-                if col_idx <= ws.max_column:
-                    ws.delete_cols(col_idx)
-                    deleted_in_sheet += 1
-                    log(f"    ✓ 已删除列 {col}")
-                else:
-                    log(f"    ⚠ 列 {col} 超出工作表范围，跳过")
-            except Exception as e:
-                log(f"    ✗ 删除列 {col} 失败: {e}")
-        
-        stats['columns_deleted'] += deleted_in_sheet
-        stats['sheets_processed'] += 1
+    def record(file_path, result=None, error=None):
+        if error is not None:
+            totals['files_failed'] += 1
+            log(f"✗ {os.path.basename(file_path)}: {error}")
+            return
+        stats, messages = result
+        for msg in messages:
+            log(msg)
+        totals['files_processed'] += 1
+        totals['sheets_processed'] += stats['sheets_processed']
+        totals['columns_deleted'] += stats['columns_deleted']
     
-    # 保存文件
-    log(f"正在保存文件...")
-    wb.save(file_path)
-    wb.close()
+    pending = deque(file_paths)
+    # 已交给进程池、尚无结果的文件 {future: 文件路径}
+    running = {}
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    if workers > 1:
+        try:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                while pending or running:
+                    while pending and len(running) < workers:
+                        # 提交成功后才移出 pending，提交失败的文件仍可顺序处理
+                        future = executor.submit(_delete_columns_in_worker, pending[0], columns, sheet_name)
+                        running[future] = pending.popleft()
+                    done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                    broken = False
+                    for future in done:
+                        file_path = running.pop(future)
+                        try:
+                            result = future.result()
+                        except BrokenProcessPool:
+                            broken = True
+                            record(file_path, error="处理进程异常退出，文件可能已被修改，请检查后单独处理")
+                        except Exception as e:
+                            record(file_path, error=e)
+                        else:
+                            record(file_path, result)
+                    if broken:
+                        break
+        except (OSError, RuntimeError):
+            # 打包环境等无法启动子进程时，尚未交出的文件回退为顺序处理
+            pass
+        # 进程池崩溃时仍在处理中的文件无法确认是否已写入，记为失败而不重试
+        for file_path in running.values():
+            record(file_path, error="处理进程异常退出，文件可能已被修改，请检查后单独处理")
+        running.clear()
     
-    log(f"✅ 保存完成!")
+    for file_path in pending:
+        try:
+            result = _delete_columns_in_worker(file_path, columns, sheet_name)
+        except Exception as e:
+            record(file_path, error=e)
+        else:
+            record(file_path, result)
     
-    return stats
+    return totals
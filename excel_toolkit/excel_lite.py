@@ -4,15 +4,38 @@
 轻量级Excel处理模块
 替代openpyxl，避免numpy依赖，减小打包体积
 """
+import bisect
+import codecs
+import concurrent.futures
+import csv
+import datetime
+import mmap
 import os
+import posixpath
+import re
+import shutil
+import sys
+import tempfile
+import warnings
 import zipfile
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Any, Optional, Union, Tuple
+from array import array
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Union, Tuple, Callable
 import xlrd
 import xlsxwriter
 from defusedxml import ElementTree as SafeET
 
 
+# SpreadsheetML 命名空间
+_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+
+# 包关系命名空间
+_PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+
 class ExcelLiteError(Exception):
     """Excel处理异常"""
     pass
@@ -36,6 +59,414 @@ def get_column_letter(col_idx: int) -> str:
     return result
 
 
+# 列字母 -> 列索引 的缓存（解析单元格引用时的热点）
+_COLUMN_INDEX_CACHE: Dict[str, int] = {}
+
+
+def _column_from_ref(cell_ref: str) -> int:
+    """从单元格引用（如 'AB12'）中取出列索引（1基）"""
+    letters = cell_ref.rstrip('0123456789')
+    col = _COLUMN_INDEX_CACHE.get(letters)
+    if col is None:
+        col = column_index_from_string(letters) if letters.isalpha() else 0
+        _COLUMN_INDEX_CACHE[letters] = col
+    return col
+
+
+def _parse_dimension_ref(ref: str) -> Optional[Tuple[int, int]]:
+    """解析 dimension 引用（如 'A1:K200'），返回 (最大行, 最大列)"""
+    last = ref.split(':')[-1].strip().replace('$', '')
+    if not last:
+        return None
+    col = _column_from_ref(last)
+    digits = last[len(last.rstrip('0123456789')):]
+    if not col or not digits:
+        return None
+    return int(digits), col
+
+
+# 无 <dimension> 时按原始字节扫描行号/单元格引用，不做XML解析
+_ROW_TAG_PATTERN = re.compile(rb'<(?:[\w.-]+:)?row\b(?:[^>]*?\sr="(\d+)")?')
+_CELL_REF_PATTERN = re.compile(rb'<(?:[\w.-]+:)?c\b[^>]*?\sr="([A-Z]+)\d+"')
+_SHEET_DATA_END_PATTERN = re.compile(rb'</(?:[\w.-]+:)?sheetData>')
+
+
+def _resolve_rel_target(target: str) -> str:
+    """把 workbook.xml.rels 中的 Target 解析为zip内路径"""
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join('xl', target))
+
+
+class _Column:
+    """列式存储中的一列：类型化数组 + 空值位图 + 少量类型不符的例外值
+    
+    kind 取值：'q' 整数(array('q'))，'d' 浮点(array('d'))，'s' 驻留字符串，'o' 任意对象。
+    第1行（通常是表头）不参与类型判定，直接记为例外值。
+    """
+    
+    __slots__ = ('kind', 'values', 'nulls', 'ints', 'exceptions', 'size')
+    
+    def __init__(self, size: int = 0):
+        self.kind = None
+        self.values = None
+        self.nulls = bytearray()
+        self.ints = None  # 'd' 列中原本为整数的位图
+        self.exceptions = {}
+        self.size = 0
+        for _ in range(size):
+            self.append('')
+    
+    def append(self, value):
+        idx = self.size
+        self.size += 1
+        if not idx & 7:
+            self.nulls.append(0)
+            if self.ints is not None:
+                self.ints.append(0)
+        
+        if value == '' or value is None:
+            self.nulls[idx >> 3] |= 1 << (idx & 7)
+            value = None
+        elif idx == 0:
+            self.exceptions[idx] = value
+            value = None
+        else:
+            if self.kind is None:
+                self._choose_kind(value, idx)
+            if not self._fits(value, idx):
+                self.exceptions[idx] = value
+                value = None
+                if len(self.exceptions) > (self.size >> 2) + 16:
+                    self._to_objects()
+                    return
+        
+        if self.values is not None:
+            if value is None:
+                self.values.append('' if self.kind in ('s', 'o') else 0)
+            else:
+                self.values.append(value)
+    
+    def _choose_kind(self, value, idx: int):
+        """根据首个非空数据值确定列类型，并为之前的行补占位"""
+        value_type = type(value)
+        if value_type is int and -(1 << 63) <= value < (1 << 63):
+            self.kind, self.values = 'q', array('q', bytes(8 * idx))
+        elif value_type is float:
+            self.kind, self.values = 'd', array('d', bytes(8 * idx))
+        elif value_type is str:
+            self.kind, self.values = 's', [''] * idx
+        else:
+            self.kind, self.values = 'o', [''] * idx
+    
+    def _fits(self, value, idx: int) -> bool:
+        """检查值是否符合列类型；整数列遇到浮点时提升为浮点列"""
+        value_type = type(value)
+        kind = self.kind
+        if kind == 's':
+            return value_type is str
+        if kind == 'o':
+            return True
+        if kind == 'q':
+            if value_type is int and -(1 << 63) <= value < (1 << 63):
+                return True
+            if value_type is float:
+                self._promote_to_float(idx)
+                return True
+            return False
+        # kind == 'd'
+        if value_type is float:
+            return True
+        if value_type is int and -(1 << 53) <= value <= (1 << 53):
+            if self.ints is None:
+                self.ints = bytearray(len(self.nulls))
+            self.ints[idx >> 3] |= 1 << (idx & 7)
+            return True
+        return False
+    
+    def _promote_to_float(self, idx: int):
+        """整数列提升为浮点列，idx 之前的整数用位图标记以便还原类型"""
+        self.ints = bytearray(b'\xff' * (idx >> 3))
+        self.ints.append((1 << (idx & 7)) - 1)
+        self.values = array('d', self.values)
+        self.kind = 'd'
+    
+    def _to_objects(self):
+        """例外值过多时退化为普通对象列"""
+        values = [self.get(idx) for idx in range(self.size)]
+        self.kind, self.values = 'o', values
+        self.ints = None
+        self.exceptions = {}
+        self.nulls = bytearray(len(self.nulls))
+        for idx, value in enumerate(values):
+            if value == '':
+                self.nulls[idx >> 3] |= 1 << (idx & 7)
+    
+    def get(self, idx: int) -> Any:
+        if self.exceptions and idx in self.exceptions:
+            return self.exceptions[idx]
+        if self.nulls[idx >> 3] & (1 << (idx & 7)) or self.values is None:
+            return ''
+        value = self.values[idx]
+        if self.ints is not None and self.ints[idx >> 3] & (1 << (idx & 7)):
+            return int(value)
+        return value
+
+
+class _ColumnarSheetData:
+    """工作表数据的列式存储
+    
+    数值列用 array('q')/array('d')，文本列存驻留字符串，并配合空值位图，
+    相比行列表占用内存小得多，按列扫描也更紧凑。
+    对外表现为行的序列：len()、下标取行（返回新列表）、迭代，与 List[List[Any]] 一致。
+    """
+    
+    def __init__(self):
+        self.columns: List[_Column] = []
+        self.row_lengths = array('I')
+        self.width = 0
+    
+    @classmethod
+    def from_rows(cls, rows) -> '_ColumnarSheetData':
+        """从 (行号, 行数据) 流构建，缺失的行补为空行"""
+        data = cls()
+        for row_number, row_data in rows:
+            while len(data) < row_number - 1:
+                data.append([])
+            data.append(row_data)
+        return data
+    
+    def append(self, row_data: List[Any]):
+        columns = self.columns
+        row_count = len(self.row_lengths)
+        while len(columns) < len(row_data):
+            columns.append(_Column(row_count))
+        
+        intern = sys.intern
+        for col_idx, column in enumerate(columns):
+            value = row_data[col_idx] if col_idx < len(row_data) else ''
+            if type(value) is str and value:
+                value = intern(value)
+            column.append(value)
+        
+        self.row_lengths.append(len(row_data))
+        if len(row_data) > self.width:
+            self.width = len(row_data)
+    
+    def __len__(self) -> int:
+        return len(self.row_lengths)
+    
+    def __getitem__(self, row_idx: int) -> List[Any]:
+        return self.row_slice(row_idx, 0, self.row_lengths[row_idx])
+    
+    def __iter__(self):
+        for row_idx in range(len(self.row_lengths)):
+            yield self[row_idx]
+    
+    def value(self, row_idx: int, col_idx: int) -> Any:
+        """取单个值（0基），超出该行长度时返回 ''"""
+        if col_idx >= self.row_lengths[row_idx]:
+            return ''
+        return self.columns[col_idx].get(row_idx)
+    
+    def row_slice(self, row_idx: int, start_col: int, end_col: int) -> List[Any]:
+        """取一行中 [start_col, end_col) 的值（0基），超出行长度的部分补 ''"""
+        row_len = self.row_lengths[row_idx]
+        columns = self.columns
+        return [columns[col_idx].get(row_idx) if col_idx < row_len else ''
+                for col_idx in range(start_col, end_col)]
+
+
+class _RowIndex:
+    """xlsx 工作表中各 <row> 元素在（解压后）XML里的字节偏移，按行号升序
+    
+    第一行之前的字节（worksheet/sheetData 开始标签等）作为解析前缀，
+    与目标行之后的XML拼接即可从任意行开始解析。
+    注意 zip 成员是 deflate 压缩流，seek 到某个偏移仍要解压之前的全部数据：
+    索引省掉的是之前各行的XML解析，而不是解压，并非真正的随机访问。
+    """
+    
+    __slots__ = ('rows', 'offsets')
+    
+    def __init__(self):
+        self.rows = array('I')
+        self.offsets = array('Q')
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+    
+    def position(self, row_number: int) -> int:
+        """行号不小于 row_number 的第一个 <row> 在索引中的位置"""
+        return bisect.bisect_left(self.rows, row_number)
+
+
+def _normalize_header(value: Any) -> str:
+    """默认的表头规范化：转为文本并去掉首尾空白"""
+    return str(value).strip() if value is not None else ''
+
+
+# 可作为列字母解析的写法（A ~ ZZZ）
+_COLUMN_LETTERS_PATTERN = re.compile(r'[A-Za-z]{1,3}')
+
+
+class HeaderIndex:
+    """表头索引：规范化后的表头名 -> 列号（1基），同名表头取第一列
+    
+    get() 只按表头名查找；resolve() 还接受列字母（如 'C'）和按优先顺序排列的别名列表。
+    """
+    
+    def __init__(self, headers: List[Any], normalize=_normalize_header):
+        self.normalize = normalize
+        self.columns: Dict[str, int] = {}
+        for col, header in enumerate(headers, start=1):
+            name = normalize(header)
+            if name and name not in self.columns:
+                self.columns[name] = col
+    
+    def __len__(self) -> int:
+        return len(self.columns)
+    
+    def __iter__(self):
+        return iter(self.columns)
+    
+    def __contains__(self, name) -> bool:
+        return self.normalize(name) in self.columns
+    
+    def __getitem__(self, name) -> int:
+        return self.columns[self.normalize(name)]
+    
+    def names(self) -> List[str]:
+        """按列顺序返回所有（非空）表头名"""
+        return list(self.columns)
+    
+    def get(self, name, default: Optional[int] = None) -> Optional[int]:
+        """按表头名查找列号"""
+        if name is None:
+            return default
+        return self.columns.get(self.normalize(name), default)
+    
+    def resolve(self, spec, letters: bool = True) -> Optional[int]:
+        """解析列：先按表头名，再按列字母（letters=True 时）；列表/元组按顺序取第一个能解析的别名
+        
+        整数直接视为列号。无法解析时返回 None。
+        """
+        if isinstance(spec, (list, tuple)):
+            for alias in spec:
+                col = self.resolve(alias, letters)
+                if col is not None:
+                    return col
+            return None
+        if spec is None or isinstance(spec, bool):
+            return None
+        if isinstance(spec, int):
+            return spec if spec >= 1 else None
+        col = self.columns.get(self.normalize(spec))
+        if col is None and letters and isinstance(spec, str):
+            text = spec.strip()
+            if _COLUMN_LETTERS_PATTERN.fullmatch(text):
+                col = column_index_from_string(text.upper())
+        return col
+
+
+def _index_key(value: Any) -> Optional[str]:
+    """KeyIndex 默认的键规范化：空值返回 None（该行不入索引），其余转文本"""
+    if value is None or value == '':
+        return None
+    return str(value)
+
+
+class KeyIndex:
+    """键 -> 行号列表 的哈希索引（一列或多列组合键）
+    
+    单列索引的键是规范化后的值，多列索引的键是各列规范化值的元组；
+    任一键列为空（规范化为 None）的行不入索引。只出现一次的键只存行号，
+    出现多次时行号存为 array('I')，大表上也比 {键: [行号...]} 省内存。
+    """
+    
+    __slots__ = ('positions', 'normalize', '_postings')
+    
+    def __init__(self, positions: Tuple[int, ...] = (0,), normalize=None):
+        """
+        Args:
+            positions: 键列在每行值中的下标
+            normalize: 键列值的规范化函数，返回 None 表示空值；默认 _index_key
+        """
+        self.positions = tuple(positions)
+        self.normalize = normalize or _index_key
+        self._postings: Dict[Any, Any] = {}
+    
+    def update(self, numbered_rows) -> 'KeyIndex':
+        """加入 (行号, 行值) 序列，行号需递增"""
+        postings = self._postings
+        normalize = self.normalize
+        positions = self.positions
+        single = len(positions) == 1
+        position = positions[0]
+        for row_number, values in numbered_rows:
+            if single:
+                key = normalize(values[position]) if position < len(values) else None
+                if key is None:
+                    continue
+            else:
+                key = tuple(normalize(values[p]) if p < len(values) else None for p in positions)
+                if None in key:
+                    continue
+            rows = postings.get(key)
+            if rows is None:
+                postings[key] = row_number
+            elif type(rows) is int:
+                postings[key] = array('I', (rows, row_number))
+            else:
+                rows.append(row_number)
+        return self
+    
+    def _key(self, key):
+        """把查询键按同一规则规范化"""
+        if len(self.positions) == 1:
+            return self.normalize(key)
+        return tuple(self.normalize(value) for value in key)
+    
+    def __len__(self) -> int:
+        return len(self._postings)
+    
+    def __iter__(self):
+        return iter(self._postings)
+    
+    def __contains__(self, key) -> bool:
+        return self._key(key) in self._postings
+    
+    def keys(self):
+        """所有键（按首次出现的顺序）"""
+        return self._postings.keys()
+    
+    def items(self):
+        """产出 (键, 行号数组)，按首次出现的顺序"""
+        for key, rows in self._postings.items():
+            yield key, array('I', (rows,)) if type(rows) is int else rows
+    
+    def lookup(self, key) -> array:
+        """键所在的行号（升序）；多列索引传入各列值的元组。不存在时返回空数组"""
+        rows = self._postings.get(self._key(key))
+        if rows is None:
+            return array('I')
+        return array('I', (rows,)) if type(rows) is int else rows
+    
+    def duplicates(self):
+        """产出出现不止一次的 (键, 行号数组)，按首次出现的顺序"""
+        for key, rows in self._postings.items():
+            if type(rows) is not int:
+                yield key, rows
+    
+    def difference(self, other: 'KeyIndex') -> List[Any]:
+        """本索引有、other 中没有的键（按首次出现的顺序）"""
+        other_postings = other._postings
+        return [key for key in self._postings if key not in other_postings]
+    
+    def counts(self) -> Dict[Any, int]:
+        """{键: 出现次数}"""
+        return {key: 1 if type(rows) is int else len(rows) for key, rows in self._postings.items()}
+
+
 class ExcelWorksheet:
     """轻量级工作表类"""
     
@@ -45,34 +476,89 @@ class ExcelWorksheet:
         self._data = None
         self._max_row = None
         self._max_col = None
+        # 已修改的单元格 {行: {列: 值}}（1基），读取时覆盖原值
+        self._patches: Dict[int, Dict[int, Any]] = {}
+        # 待写入的填充色 {行: {列: 'RRGGBB'}}，由 ExcelReader.save() 写出
+        self._fills: Dict[int, Dict[int, str]] = {}
+        # fill_rows() 共用的 {列: 颜色} 字典 {(列, 颜色): 字典}
+        self._fill_templates: Dict[Tuple[Tuple[int, ...], str], Dict[int, str]] = {}
+        # 表头索引缓存 {(行, 规范化函数): HeaderIndex}
+        self._header_indexes: Dict[Tuple[int, Any], HeaderIndex] = {}
     
     @property
     def rows(self):
         """返回所有行的迭代器（兼容openpyxl）"""
         self._load_data()
-        for row_data in self._data:
+        for row_number, row_data in enumerate(self._data, start=1):
+            if self._patches:
+                row_data = self._apply_patches(row_number, 1, list(row_data))
             yield [ExcelCell(value) for value in row_data]
     
     @property
     def max_row(self) -> int:
-        """获取最大行数"""
+        """获取最大行数（未加载数据时取扫描得到的范围）"""
         if self._max_row is None:
-            self._load_data()
+            self._load_extent()
+        if self._patches:
+            return max(self._max_row or 0, max(self._patches))
         return self._max_row or 0
     
     @property
     def max_column(self) -> int:
-        """获取最大列数"""
+        """获取最大列数（未加载数据时取扫描得到的范围）"""
         if self._max_col is None:
-            self._load_data()
+            self._load_extent()
+        if self._patches:
+            return max(self._max_col or 0, max(max(cols) for cols in self._patches.values()))
         return self._max_col or 0
     
+    def _load_extent(self):
+        """不加载单元格数据，只取得最大行/列；无法取得时回退为完整加载"""
+        extent = None
+        if self._data is None:
+            extent = self.reader.get_sheet_extent(self.title)
+        if extent is None:
+            self._load_data()
+        else:
+            self._max_row, self._max_col = extent
+    
+    def _apply_patches(self, row_number: int, start_col: int, row_values: List[Any]) -> List[Any]:
+        """把已修改的值覆盖到一行（row_values[0] 对应 start_col）"""
+        patched = self._patches.get(row_number)
+        if patched:
+            end_col = start_col + len(row_values)
+            for col, value in patched.items():
+                if start_col <= col < end_col:
+                    row_values[col - start_col] = value
+        return row_values
+    
     def _load_data(self):
         """加载工作表数据"""
         if self._data is None:
-            self._data = self.reader.get_sheet_data(self.title)
-            self._max_row = len(self._data)
-            self._max_col = max(len(row) for row in self._data) if self._data else 0
+            if self.reader.columnar:
+                self._set_data(self.reader.get_sheet_columns(self.title))
+            else:
+                self._set_data(self.reader.get_sheet_data(self.title))
+    
+    def _use_cache(self, full: bool):
+        """启用磁盘缓存时优先使用缓存；整表读取未命中时解析并写入缓存"""
+        if self._data is not None or not self.reader.cache:
+            return
+        if full:
+            self._load_data()
+        else:
+            data = self.reader._load_cached_sheet(self.title)
+            if data is not None:
+                self._set_data(data)
+    
+    def _set_data(self, data):
+        """设置已解析的工作表数据（行列表或列式存储）"""
+        self._data = data
+        if isinstance(data, _ColumnarSheetData):
+            self._max_col = data.width
+        else:
+            self._max_col = max(len(row) for row in data) if data else 0
+        self._max_row = len(data)
     
     def __getitem__(self, row_index):
         """支持 worksheet[row_number] 语法访问行"""
@@ -92,70 +578,660 @@ class ExcelWorksheet:
             # 确保行数据长度与最大列数一致
             while len(row_data) < (self._max_col or 0):
                 row_data.append('')
+            if self._patches:
+                row_data = self._apply_patches(row_index, 1, list(row_data))
             
             return [ExcelCell(value) for value in row_data]
         else:
             raise TypeError("行索引必须是整数")
     
     def iter_rows(self, min_row=1, max_row=None, min_col=1, max_col=None, values_only=False):
-        """迭代行数据"""
-        self._load_data()
+        """迭代行数据
+        
+        指定 max_row 时读到该行即停止解析，不会加载整表。
+        """
+        self._use_cache(full=not max_row)
+        if self._data is None and not self._patches and self.reader.file_ext in _STREAMING_EXTS:
+            # 尚未加载时直接流式读取，不缓存整表；指定列范围时只解析这些列
+            width = max_col
+            if not width and (values_only or max_row):
+                # 只读前若干行时不为求列宽而扫描整表
+                extent = self.reader.get_sheet_extent(self.title, scan=not max_row)
+                width = extent[1] if extent else None
+            if width:
+                rows = self._iter_values_streaming(min_row, max_row, min_col, width, pad=not max_col)
+            elif max_row:
+                # 没有声明范围时按窗口内最宽的行补齐
+                rows = [list(row) for row in self._iter_values_streaming(min_row, max_row, min_col, 0, pad=True)]
+                window_width = max((len(row) for row in rows), default=0)
+                rows = [tuple(row + [''] * (window_width - len(row))) for row in rows]
+            else:
+                rows = None
+            if rows is not None:
+                if values_only:
+                    yield from rows
+                else:
+                    for row_values in rows:
+                        yield [ExcelCell(value) for value in row_values]
+                return
         
-        if not self._data:
+        if self._data is None and not self._patches and max_row:
+            # 只需要前若干行时只读取这些行，不缓存整表
+            data = self.reader.get_sheet_data(self.title, max_row)
+            data_width = max((len(row) for row in data), default=0)
+        else:
+            self._load_data()
+            data = self._data
+            data_width = self._max_col or 0
+        
+        if not data and not self._patches:
             return  # 空数据，直接返回
         
+        # 含写入补丁时行列范围以 max_row/max_column 为准
+        last_row = self.max_row if self._patches else len(data)
         start_row = (min_row - 1) if min_row else 0
-        end_row = (max_row - 1) if max_row else len(self._data) - 1
+        end_row = (max_row - 1) if max_row else last_row - 1
         start_col = (min_col - 1) if min_col else 0
         
         # 计算最大列数
         if max_col:
             end_col = max_col - 1
+        elif self._patches:
+            end_col = self.max_column - 1
         else:
-            # 找出所有行中的最大列数
-            max_cols_in_data = max(len(row) for row in self._data) if self._data else 0
-            end_col = max_cols_in_data - 1 if max_cols_in_data > 0 else 0
+            # 所有行中的最大列数
+            end_col = data_width - 1 if data_width else 0
         
-        for row_idx in range(start_row, min(end_row + 1, len(self._data))):
-            row_data = self._data[row_idx]
-            if values_only:
-                # 返回值的元组
+        columnar = isinstance(data, _ColumnarSheetData)
+        data_rows = len(data)
+        for row_idx in range(start_row, min(end_row + 1, last_row)):
+            if row_idx >= data_rows:
+                row_values = [''] * (end_col - start_col + 1)
+            elif columnar:
+                row_values = data.row_slice(row_idx, start_col, end_col + 1)
+            else:
+                row_data = data[row_idx]
                 row_values = []
                 for col_idx in range(start_col, end_col + 1):
                     row_values.append(row_data[col_idx] if col_idx < len(row_data) else '')
+            if self._patches:
+                row_values = self._apply_patches(row_idx + 1, start_col + 1, row_values)
+            if values_only:
+                # 返回值的元组
                 yield tuple(row_values)
             else:
                 # 返回单元格对象列表
-                cells = []
-                for col_idx in range(start_col, end_col + 1):
-                    value = row_data[col_idx] if col_idx < len(row_data) else ''
-                    cells.append(ExcelCell(value))
-                yield cells
+                yield [ExcelCell(value) for value in row_values]
+    
+    def head(self, n: int = 5, min_col: int = 1, max_col: int = None) -> List[Tuple[Any, ...]]:
+        """读取前 n 行的值，读满即停止解析"""
+        return list(self.iter_rows(min_row=1, max_row=n, min_col=min_col, max_col=max_col, values_only=True))
+    
+    def headers(self, row: int = 1) -> List[Any]:
+        """读取表头行（默认第1行）的值，只解析到该行为止"""
+        for values in self.iter_rows(min_row=row, max_row=row, values_only=True):
+            return list(values)
+        return []
+    
+    def header_index(self, row: int = 1, normalize=None) -> HeaderIndex:
+        """获取表头索引（表头名/列字母 -> 列号），同一 (行, 规范化函数) 只构建一次
+        
+        Args:
+            row: 表头所在行
+            normalize: 表头规范化函数，默认转文本并去掉首尾空白；
+                需要复用缓存时请传同一个函数对象（而不是每次新建 lambda）
+        """
+        normalize = normalize or _normalize_header
+        key = (row, normalize)
+        index = self._header_indexes.get(key)
+        if index is None:
+            index = self._header_indexes[key] = HeaderIndex(self.headers(row), normalize)
+        return index
+    
+    def build_index(self, key_cols, normalize=None, min_row: int = 2, max_row: int = None,
+                    header_row: int = 1) -> KeyIndex:
+        """按一列或多列建立键 -> 行号 的索引
+        
+        尚未加载的工作表直接逐行读取键列（iter_sheet_columns，只解码键列本身），不创建单元格对象。
+        
+        Args:
+            key_cols: 键列（表头名、列字母或列号），或其列表（组合键）
+            normalize: 键列值的规范化函数，返回 None 的行不入索引；默认空值跳过、其余转文本
+            min_row: 数据起始行
+            max_row: 数据结束行，默认到最后一行
+            header_row: 表头所在行（按表头名定位列时使用）
+        """
+        if isinstance(key_cols, (str, int)):
+            key_cols = [key_cols]
+        headers = self.header_index(header_row)
+        cols = []
+        for spec in key_cols:
+            col = headers.resolve(spec)
+            if col is None:
+                raise ExcelLiteError(f"工作表 '{self.title}' 中找不到列: {spec}")
+            cols.append(col)
+        
+        self._use_cache(full=not max_row)
+        if self._data is None and not self._patches and self.reader.file_ext in _STREAMING_EXTS:
+            index = KeyIndex(range(len(cols)), normalize)
+            return index.update(self.reader.iter_sheet_columns(self.title, cols, min_row, max_row))
+        min_col = min(cols)
+        max_col = max(cols)
+        index = KeyIndex([col - min_col for col in cols], normalize)
+        rows = enumerate(self.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col,
+                                        values_only=True), start=min_row)
+        return index.update(rows)
+    
+    def row(self, row: int, min_col: int = 1, max_col: int = None) -> List[Any]:
+        """读取第 row 行的值；xlsx 借助行偏移索引跳到该行开始解析（之前的数据仍需解压，但不解析）"""
+        self._ensure_row_index()
+        for values in self.iter_rows(min_row=row, max_row=row, min_col=min_col, max_col=max_col, values_only=True):
+            return list(values)
+        return []
+    
+    def tail(self, n: int = 5, min_col: int = 1, max_col: int = None) -> List[Tuple[Any, ...]]:
+        """读取最后 n 行的值；xlsx 借助行偏移索引只解析末尾的行（之前的数据仍需解压）"""
+        self._ensure_row_index()
+        last_row = self.max_row
+        if last_row < 1 or n < 1:
+            return []
+        return list(self.iter_rows(min_row=max(last_row - n + 1, 1), max_row=last_row,
+                                   min_col=min_col, max_col=max_col, values_only=True))
+    
+    def last_data_row(self, min_col: int = 1, max_col: int = None) -> int:
+        """最后一个含非空值的行号（只看 min_col~max_col），没有数据时返回 0
+        
+        从末尾开始按逐步扩大的窗口向前查找，带格式的空行很多时也只解析末尾部分。
+        """
+        self._ensure_row_index()
+        end_row = self.max_row
+        window = 64
+        while end_row >= 1:
+            start_row = max(end_row - window + 1, 1)
+            found = 0
+            rows = self.iter_rows(min_row=start_row, max_row=end_row, min_col=min_col, max_col=max_col, values_only=True)
+            for row_number, values in enumerate(rows, start=start_row):
+                if any(value is not None and str(value).strip() for value in values):
+                    found = row_number
+            if found:
+                return found
+            end_row = start_row - 1
+            window *= 4
+        return 0
+    
+    def _ensure_row_index(self):
+        """尚未加载数据的xlsx工作表：准备行偏移索引，供按行号定位"""
+        if self._data is None and not self._patches and self.reader.file_ext in ['.xlsx', '.xlsm']:
+            self.reader.get_row_index(self.title)
+    
+    def _iter_values_streaming(self, min_row, max_row, min_col, max_col, pad=False):
+        """流式产出值元组；pad=True 时按声明范围补齐列，但不截断更宽的行"""
+        start_row = min_row or 1
+        start_col = min_col or 1
+        width = max(max_col - start_col + 1, 0)
+        empty_row = ('',) * width
+        next_row = 1
+        
+        rows = self.reader.iter_sheet_rows(self.title, max_row, start_col, None if pad else max_col, min_row=start_row)
+        while True:
+            try:
+                row_number, row_values = next(rows)
+            except StopIteration as stop:
+                # 因读到窗口之后的行而停止时，窗口末尾缺失的行同样按空行产出
+                if stop.value:
+                    for next_row in range(max(next_row, start_row), max_row + 1):
+                        yield empty_row
+                return
+            # 缺失的行按空行产出
+            while next_row < row_number:
+                if next_row >= start_row:
+                    yield empty_row
+                next_row += 1
+            next_row = row_number + 1
+            if row_number < start_row:
+                continue
+            
+            if len(row_values) < width:
+                row_values.extend([''] * (width - len(row_values)))
+            yield tuple(row_values)
+    
+    def cell(self, row: int, column: int, value: Any = None):
+        """获取单元格；传入 value 时写入该值（兼容openpyxl的 ws.cell(row, column, value)）"""
+        if value is not None:
+            self._patches.setdefault(row, {})[column] = value
+            if self._header_indexes:
+                # 改写了表头行时丢弃该行的表头索引
+                for key in [key for key in self._header_indexes if key[0] == row]:
+                    del self._header_indexes[key]
+            return ExcelCell(value)
+        return ExcelCell(self.value(row, column))
     
-    def cell(self, row: int, column: int):
-        """获取单元格"""
+    def fill(self, row: int, column: int, color: str):
+        """设置单元格纯色填充（如 'FFF59E'），保存时写入"""
+        cols = self._fills.get(row)
+        if cols is None:
+            self._fills[row] = {column: color}
+        elif cols.get(column) != color:
+            # fill_rows() 让多行共用同一个字典，修改前先复制
+            self._fills[row] = {**cols, column: color}
+    
+    def fill_rows(self, rows, columns, color: str) -> int:
+        """给多行的同一组列设置相同的纯色填充，返回设置的单元格数
+        
+        没有其他填充的行共用同一个 {列: 颜色} 字典，大量行被标记时也不会逐行分配字典。
+        """
+        key = (tuple(columns), color)
+        shared = self._fill_templates.get(key)
+        if shared is None:
+            shared = self._fill_templates[key] = dict.fromkeys(columns, color)
+        fills = self._fills
+        count = 0
+        for row in rows:
+            cols = fills.get(row)
+            fills[row] = shared if cols is None else {**cols, **shared}
+            count += 1
+        return count * len(shared)
+    
+    def value(self, row: int, column: int) -> Any:
+        """直接获取单元格的值（1基），不创建单元格对象"""
+        if self._patches:
+            patched = self._patches.get(row)
+            if patched and column in patched:
+                return patched[column]
+        if self._data is None:
+            self._load_data()
+        data = self._data
+        if 1 <= row <= len(data) and column >= 1:
+            if isinstance(data, _ColumnarSheetData):
+                return data.value(row - 1, column - 1)
+            row_data = data[row - 1]
+            if column <= len(row_data):
+                return row_data[column - 1]
+        return ''
+    
+    def column_values(self, column: int, min_row: int = 1, max_row: int = None) -> List[Any]:
+        """获取一整列的值列表（1基，列表第0项对应 min_row），不创建单元格对象
+        
+        工作表尚未加载时只流式解析这一列，不缓存整表。
+        """
+        start_row = min_row or 1
+        self._use_cache(full=True)
+        if self._data is None and not self._patches and self.reader.file_ext in _STREAMING_EXTS:
+            return [row[0] for row in self._iter_values_streaming(start_row, max_row, column, column)]
+        
         self._load_data()
-        if 1 <= row <= len(self._data) and 1 <= column <= len(self._data[row-1]):
-            return ExcelCell(self._data[row-1][column-1])
-        return ExcelCell('')
+        data = self._data
+        last_row = self.max_row if self._patches else len(data)
+        end_row = min(max_row, last_row) if max_row else last_row
+        data_end = min(end_row, len(data))
+        col_idx = column - 1
+        if isinstance(data, _ColumnarSheetData):
+            values = [data.value(row_idx, col_idx) for row_idx in range(start_row - 1, data_end)]
+        else:
+            values = [data[row_idx][col_idx] if col_idx < len(data[row_idx]) else ''
+                      for row_idx in range(start_row - 1, data_end)]
+        if end_row > data_end:
+            values.extend([''] * (end_row - max(data_end, start_row - 1)))
+        if self._patches:
+            for row, patched in self._patches.items():
+                if column in patched and start_row <= row <= end_row:
+                    values[row - start_row] = patched[column]
+        return values
 
 
 class ExcelCell:
-    """轻量级单元格类"""
+    """轻量级单元格类（只读）
+    
+    使用 __slots__ 且不可修改，空单元格共用同一个实例。
+    写入请使用 ExcelWorksheet.cell(row, column, value=...)。
+    """
+    
+    __slots__ = ('value',)
+    _empty = None
+    
+    def __new__(cls, value=''):
+        if value == '' and cls._empty is not None:
+            return cls._empty
+        cell = object.__new__(cls)
+        object.__setattr__(cell, 'value', value)
+        return cell
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("ExcelCell 为只读，写入请使用 ExcelWorksheet.cell(row, column, value=...)")
+    
+    def __repr__(self):
+        return f"ExcelCell({self.value!r})"
+
+
+ExcelCell._empty = ExcelCell('')
+
+
+# 流式解析时每次从zip成员读取的字节数
+_STREAM_CHUNK_SIZE = 1 << 16
+
+
+def _convert_cell_value(cell_type: str, value: Optional[str], shared_strings: List[str]) -> Any:
+    """按单元格类型转换原始文本值"""
+    if value is None:
+        return ''
+    
+    if cell_type == 's':  # 共享字符串
+        try:
+            idx = int(value)
+            if 0 <= idx < len(shared_strings):
+                return shared_strings[idx]
+        except (ValueError, IndexError):
+            pass
+    elif cell_type == 'b':  # 布尔值
+        return value == '1'
+    elif cell_type in ('n', ''):  # 数字
+        try:
+            if '.' in value:
+                return float(value)
+            else:
+                return int(value)
+        except ValueError:
+            pass
+    
+    return value
+
+
+def _make_safe_parser(target):
+    """创建 defusedxml 解析器，并把 expat 的元素回调直接接到 target 上
+    
+    defusedxml 的DTD/实体防护挂在同一个 expat 对象上，不受影响；
+    跳过 ElementTree 的标签名规范化与建树，大表解析快数倍。
+    """
+    parser = SafeET.XMLParser(target=target)
+    expat_parser = parser.parser
+    expat_parser.ordered_attributes = 0
+    expat_parser.StartElementHandler = target.start
+    expat_parser.EndElementHandler = target.end
+    # 文本回调只在需要取值时由 target 临时挂上
+    expat_parser.CharacterDataHandler = None
+    target.expat_parser = expat_parser
+    return parser
+
+
+class _SheetXMLTarget:
+    """工作表XML解析回调（不构建元素树，直接把 <row> 转为行数据）
+    
+    通过 _make_safe_parser 挂到 defusedxml 的解析器上，保留其对实体/DTD的安全限制。
+    解析出的行暂存在 rows 中，由调用方按块取走。
+    指定 min_col/max_col（1基）时只解码该范围内的单元格，行数据从 min_col 开始。
+    """
+    
+    # expat 直接回调的标签名形如 'http://...main}row'
+    _ROW = f'{_NS[1:]}row'
+    _CELL = f'{_NS[1:]}c'
+    _VALUE = f'{_NS[1:]}v'
+    _TEXT = f'{_NS[1:]}t'
+    _DIMENSION = f'{_NS[1:]}dimension'
+    _SHEET_DATA = f'{_NS[1:]}sheetData'
+    
+    def __init__(self, shared_strings: List[str], min_col: int = None, max_col: int = None):
+        self.shared_strings = shared_strings
+        self.min_col = (min_col - 1) if min_col and min_col > 1 else 0
+        self.max_col = (max_col - 1) if max_col else None
+        self.rows = []
+        self.expat_parser = None
+        # 不为 None 时记录每个 <row> 的字节偏移（_RowIndex）
+        self.row_index = None
+        self.dimension = None
+        self.sheet_data_started = False
+        self.finished = False
+        self._row_number = 0
+        self._cells = None
+        self._col = -1
+        self._type = ''
+        self._value = None
+        self._text = None
+        self._in_range = False
+    
+    def start(self, tag, attrib):
+        if tag == self._CELL:
+            cell_ref = attrib.get('r')
+            # 解析单元格引用（如A1, B2），缺省时顺延上一列
+            col = _column_from_ref(cell_ref) - 1 if cell_ref else self._col + 1
+            self._col = col
+            # 先按引用判断是否在投影范围内，范围外的单元格不取值不转换
+            self._in_range = col >= self.min_col and (self.max_col is None or col <= self.max_col)
+            self._type = attrib.get('t', '')
+            self._value = None
+        elif tag == self._VALUE or (tag == self._TEXT and self._type == 'inlineStr'):
+            if self._in_range:
+                self._text = []
+                self.expat_parser.CharacterDataHandler = self._text.append
+        elif tag == self._ROW:
+            r = attrib.get('r')
+            self._row_number = int(r) if r else self._row_number + 1
+            self._cells = {}
+            self._col = -1
+            if self.row_index is not None:
+                self.row_index.rows.append(self._row_number)
+                self.row_index.offsets.append(self.expat_parser.CurrentByteIndex)
+        elif tag == self._DIMENSION:
+            self.dimension = _parse_dimension_ref(attrib.get('ref', ''))
+        elif tag == self._SHEET_DATA:
+            self.sheet_data_started = True
+    
+    def end(self, tag):
+        if tag == self._CELL:
+            if self._in_range and self._cells is not None:
+                if self._type == 'inlineStr':  # 内联字符串：<is><t>text</t></is>
+                    value = self._value or ''
+                else:
+                    value = _convert_cell_value(self._type, self._value, self.shared_strings)
+                self._cells[self._col] = value
+            self._type = ''
+            self._in_range = False
+        elif tag == self._VALUE:
+            if self._text is not None:
+                self._value = ''.join(self._text)
+                self._text = None
+                self.expat_parser.CharacterDataHandler = None
+        elif tag == self._TEXT and self._text is not None:
+            # 富文本内联字符串由多个 <t> 拼接
+            self._value = (self._value or '') + ''.join(self._text)
+            self._text = None
+            self.expat_parser.CharacterDataHandler = None
+        elif tag == self._ROW:
+            cells = self._cells
+            max_col = max(cells) if cells else self.min_col - 1
+            self.rows.append((self._row_number, [cells.get(col_idx, '') for col_idx in range(self.min_col, max_col + 1)]))
+            self._cells = None
+        elif tag == self._SHEET_DATA:
+            self.finished = True
+    
+    def close(self):
+        return None
+
+
+def _shared_string_text(si) -> str:
+    """取出共享字符串条目 <si> 的文本"""
+    # 尝试直接获取 <t> 元素
+    text_elem = si.find(f'{_NS}t')
+    if text_elem is not None and text_elem.text:
+        return text_elem.text
+    
+    # 处理富文本格式：<si><r><t>text1</t></r><r><t>text2</t></r></si>
+    text_parts = []
+    for r_elem in si.findall(f'{_NS}r'):
+        t_elem = r_elem.find(f'{_NS}t')
+        if t_elem is not None and t_elem.text:
+            text_parts.append(t_elem.text)
+    if text_parts:
+        return ''.join(text_parts)
+    
+    # 最后尝试获取所有 <t> 元素
+    return ''.join(t.text or '' for t in si.iter(f'{_NS}t'))
+
+
+# sharedStrings.xml 超过该大小（解压后字节数）时改为按需解码
+_LAZY_SHARED_STRINGS_THRESHOLD = 8 << 20
+# 按需解码时缓存的已解码字符串条数
+_SHARED_STRINGS_CACHE_SIZE = 1 << 16
+
+# <si> 条目起始位置（兼容带前缀的写法如 <x:si>）
+_SI_START_PATTERN = re.compile(rb'<(?:[\w.-]+:)?si[\s/>]')
+# 最常见的纯文本条目 <si><t>text</t></si>，可跳过XML解析直接取值
+_SI_PLAIN_PATTERN = re.compile(rb'<si>\s*<t(?: xml:space="preserve")?>([^<&\r]*)</t>\s*</si>\s*')
+
+
+class _LazySharedStrings:
+    """按需解码的共享字符串表
+    
+    首遍只用正则记录每个 <si> 在解压后XML中的字节偏移，XML本身落到临时文件并 mmap，
+    单元格真正引用某个索引时才解码该条目，并用LRU缓存解码结果。
+    支持 len() 与下标访问，可直接替代字符串列表。
+    """
+    
+    def __init__(self, stream, cache_size: int = _SHARED_STRINGS_CACHE_SIZE):
+        self._file = tempfile.TemporaryFile()
+        shutil.copyfileobj(stream, self._file, 1 << 20)
+        self._file.flush()
+        self._buffer = None
+        self._offsets = array('Q')
+        self._end = 0
+        self._wrapper = (b'', b'')
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        
+        if self._file.tell() == 0:
+            return
+        self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets.extend(m.start() for m in _SI_START_PATTERN.finditer(self._buffer))
+        # 最后一个条目截止到根元素的结束标签
+        self._end = self._buffer.rfind(b'</')
+        
+        if self._offsets:
+            # 片段单独解析时需要补上命名空间声明
+            first = self._buffer[self._offsets[0]:self._offsets[0] + 64]
+            prefix = first[1:first.index(b'si')]
+            xmlns = b'xmlns' + (b':' + prefix[:-1] if prefix else b'')
+            self._wrapper = (b'<sst ' + xmlns + b'="' + _NS[1:-1].encode() + b'">', b'</sst>')
+    
+    def __len__(self) -> int:
+        return len(self._offsets)
+    
+    def __getitem__(self, idx: int) -> str:
+        value = self._cache.get(idx)
+        if value is not None:
+            self._cache.move_to_end(idx)
+            return value
+        
+        if idx < 0:
+            raise IndexError(idx)
+        start = self._offsets[idx]
+        end = self._offsets[idx + 1] if idx + 1 < len(self._offsets) else self._end
+        fragment = self._buffer[start:end]
+        
+        plain = _SI_PLAIN_PATTERN.fullmatch(fragment)
+        if plain:
+            value = plain.group(1).decode('utf-8')
+        else:
+            root = SafeET.fromstring(self._wrapper[0] + fragment + self._wrapper[1])
+            si = next(iter(root), None)
+            value = _shared_string_text(si) if si is not None else ''
+        
+        self._cache[idx] = value
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return value
     
-    def __init__(self, value):
-        self.value = value
+    def close(self):
+        """释放 mmap 与临时文件"""
+        self._cache.clear()
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+        self._file.close()
+
+
+def _xls_date_value(value: float, datemode: int) -> Any:
+    """把xls日期序列值转换为 datetime，无法转换时保留原值"""
+    try:
+        return datetime.datetime(*xlrd.xldate_as_tuple(value, datemode))
+    except Exception:
+        return value
+
+
+# 工作表XML合计小于该大小（解压后字节数）时不启用多进程，进程启动开销反而更大
+_PARALLEL_MIN_BYTES = 4 << 20
+
+# 支持逐行流式读取的格式
+_STREAMING_EXTS = ('.xlsx', '.xlsm', '.csv', '.tsv')
+# CSV/TSV 作为单个工作表读取
+_CSV_EXTS = ('.csv', '.tsv')
+# CSV 读取缓冲区大小
+_CSV_BUFFER_SIZE = 1 << 20
+# 编码识别时读取的字节数
+_CSV_SNIFF_SIZE = 1 << 16
+
+# 工作进程内的读取器缓存 {(文件路径, 修改时间, 是否列式): ExcelReader}，同一进程内共享字符串只解析一次
+_WORKER_READERS: Dict[Tuple[str, float, bool], 'ExcelReader'] = {}
+
+
+def _copy_file_mode(src: str, dst: str):
+    """把 src 的权限位（尽量也包括属主）复制到 dst；src 不存在时按 umask 设置 dst 的权限"""
+    try:
+        stat = os.stat(src)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(dst, 0o666 & ~umask)
+        return
+    shutil.copymode(src, dst)
+    if hasattr(os, 'chown'):
+        try:
+            os.chown(dst, stat.st_uid, stat.st_gid)
+        except OSError:
+            # 非 root 用户无法改为其他属主，保留当前用户
+            pass
+
+
+def _parse_sheet_in_worker(file_path: str, mtime: float, sheet_name: str, columnar: bool):
+    """工作进程入口：自行打开zip解析一个工作表，返回可pickle的行列表或列式存储"""
+    key = (file_path, mtime, columnar)
+    reader = _WORKER_READERS.get(key)
+    if reader is None:
+        for old_reader in _WORKER_READERS.values():
+            old_reader.close()
+        _WORKER_READERS.clear()
+        reader = _WORKER_READERS[key] = ExcelReader(file_path, columnar=columnar)
+    if columnar:
+        return reader.get_sheet_columns(sheet_name)
+    return reader.get_sheet_data(sheet_name)
 
 
 class ExcelReader:
     """轻量级Excel读取器"""
     
-    def __init__(self, file_path: str, read_only: bool = False, data_only: bool = False):
+    def __init__(self, file_path: str, read_only: bool = False, data_only: bool = False,
+                 columnar: bool = False, cache: bool = False):
         self.file_path = file_path
+        # 为 True 时工作表数据以列式紧凑存储（适合数值为主的大表）
+        self.columnar = columnar
+        # 为 True 时整表读取结果缓存到磁盘（~/.excel_toolkit/cache），文件未修改时直接 mmap 缓存
+        self.cache = cache
         self.file_ext = os.path.splitext(file_path)[1].lower()
         self._workbook = None
         self._sheet_names = None
         self._worksheets = None
+        # xlsx 元数据缓存：在读取器生命周期内只打开/解析一次
+        self._zip_file = None
+        self._sheet_paths = None
+        self._shared_strings_path = None
+        self._styles_path = None
+        self._shared_strings = None
+        # 只读前若干行（表头、预览）时使用的按需解码共享字符串表
+        self._window_shared_strings = None
+        # 工作表范围缓存 {工作表名: (最大行, 最大列)}
+        self._sheet_extents: Dict[str, Tuple[int, int]] = {}
+        # 行偏移索引缓存 {工作表名: _RowIndex}，整表流式读取或扫描时建立
+        self._row_indexes: Dict[str, _RowIndex] = {}
+        # CSV/TSV 的 (编码, 分隔符)，首次读取时识别
+        self._csv_format = None
         # 兼容参数，暂时不使用
         self.read_only = read_only
         self.data_only = data_only
@@ -170,20 +1246,272 @@ class ExcelReader:
         """支持 wb[sheet_name] 语法"""
         if sheet_name not in self.sheetnames:
             raise KeyError(f"工作表 '{sheet_name}' 不存在")
-        return ExcelWorksheet(self, sheet_name)
+        return self.worksheets[self.sheetnames.index(sheet_name)]
     
     @property
     def worksheets(self):
-        """获取所有工作表对象列表"""
+        """获取所有工作表对象列表（同名工作表始终返回同一对象）"""
         if self._worksheets is None:
             self._worksheets = [ExcelWorksheet(self, name) for name in self.sheetnames]
         return self._worksheets
     
+    def load_sheets(self, names: Optional[List[str]] = None, workers: Optional[int] = None) -> Dict[str, 'ExcelWorksheet']:
+        """一次加载多个工作表，xlsx的各工作表在多个进程中并行解析
+        
+        每个工作进程自行打开zip并解析共享字符串，结果以行列表（或列式存储）
+        pickle 回传后直接填充到对应的 ExcelWorksheet。
+        工作表较小、只有一个工作表、非xlsx文件或进程池不可用时按顺序加载。
+        
+        Args:
+            names: 要加载的工作表名称，默认全部
+            workers: 进程数，默认取CPU核数
+        
+        Returns:
+            {工作表名: ExcelWorksheet}
+        """
+        names = list(self.sheetnames if names is None else names)
+        sheets = {name: self[name] for name in names}
+        pending = [name for name in names if sheets[name]._data is None]
+        if self.cache:
+            # 磁盘缓存命中的工作表直接使用，不再分派给工作进程
+            for name in list(pending):
+                data = self._load_cached_sheet(name)
+                if data is not None:
+                    sheets[name]._set_data(data)
+                    pending.remove(name)
+        workers = min(workers or os.cpu_count() or 1, len(pending))
+        
+        if workers > 1 and self.file_ext in ['.xlsx', '.xlsm']:
+            zip_file = self._get_zip()
+            total_size = sum(zip_file.getinfo(self._get_sheet_path(name)).file_size for name in pending)
+            if total_size >= _PARALLEL_MIN_BYTES:
+                try:
+                    mtime = os.path.getmtime(self.file_path)
+                    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                        futures = {
+                            name: executor.submit(_parse_sheet_in_worker, self.file_path, mtime, name, self.columnar)
+                            for name in pending
+                        }
+                        for name, future in futures.items():
+                            data = future.result()
+                            sheets[name]._set_data(data)
+                            if self.cache:
+                                self._store_cached_sheet(name, data if isinstance(data, _ColumnarSheetData)
+                                                         else _ColumnarSheetData.from_rows(enumerate(data, start=1)))
+                except (OSError, RuntimeError):
+                    # 打包环境等无法启动子进程时回退为顺序加载
+                    pass
+        
+        for name in pending:
+            sheets[name]._load_data()
+        return sheets
+    
+    def save(self, file_path: Optional[str] = None, logger: Optional[Callable[[str], None]] = None):
+        """把 ws.cell(..., value=...) 与 ws.fill(...) 的修改写回xlsx文件
+        
+        只重写有改动的工作表XML（设置了填充色时还有 styles.xml），其余zip成员
+        按原始压缩数据拷贝。先写入同目录下的临时文件，完成后再替换目标文件。
+        CSV/TSV 按原编码和分隔符逐行重写，填充色无法保存，丢弃时给出警告。
+        
+        Args:
+            file_path: 保存路径，默认覆盖原文件
+            logger: 接收警告信息的日志函数，默认通过 warnings 模块发出
+        """
+        if self.file_ext not in ['.xlsx', '.xlsm'] and self.file_ext not in _CSV_EXTS:
+            raise ExcelLiteError(f"不支持保存该文件格式: {self.file_ext}")
+        
+        target = os.path.abspath(file_path or self.file_path)
+        sheet_patches = {
+            ws.title: (ws._patches, ws._fills)
+            for ws in (self._worksheets or []) if ws._patches or ws._fills
+        }
+        if not sheet_patches and target == os.path.abspath(self.file_path):
+            return
+        
+        filled = sum(len(cols) for patches, fills in sheet_patches.values() for cols in fills.values())
+        if filled and self.file_ext in _CSV_EXTS:
+            message = f"⚠ {os.path.basename(self.file_path)} 是CSV/TSV文件，无法保存填充色，已忽略 {filled} 个单元格的填充"
+            if logger:
+                logger(message)
+            else:
+                warnings.warn(message, stacklevel=2)
+        
+        def write(temp_path):
+            if self.file_ext in _CSV_EXTS:
+                patches = sheet_patches[self.sheetnames[0]][0] if sheet_patches else {}
+                self._write_csv(temp_path, patches)
+            else:
+                from excel_toolkit.xlsx_patch import write_patched_workbook
+                write_patched_workbook(self._get_zip(), temp_path,
+                                       {self._get_sheet_path(name): patches for name, patches in sheet_patches.items()},
+                                       self._styles_path or 'xl/styles.xml')
+        
+        self._write_replace(target, write)
+    
+    def transform_column(self, sheet_name: str, column, fn, dst_column: int = None,
+                         min_row: int = 2, file_path: Optional[str] = None) -> int:
+        """流式单列变换：逐行把 column 列的值交给 fn，fn 返回非 None 时写入 dst_column 列
+        
+        不加载工作表，也不在内存中累积修改：边解析边把改动的行写进新文件，
+        其余行与未改动列（含格式）按原样保留。完成后读取器被关闭。返回改动的单元格数。
+        
+        Args:
+            sheet_name: 工作表名称
+            column: 源列号（1基）；也可以是列号的元组，fn 按顺序收到各列的值
+            fn: 值变换函数，返回 None 表示该行保持不变
+            dst_column: 写入的列号，默认写回（第一个）源列
+            min_row: 从该行开始变换（默认跳过表头）
+            file_path: 保存路径，默认覆盖原文件
+        """
+        return self.transform_columns([sheet_name], column, fn, dst_column, min_row, file_path)[sheet_name]
+    
+    def transform_columns(self, sheet_names: List[str], column, fn, dst_column: int = None,
+                          min_row: int = 2, file_path: Optional[str] = None) -> Dict[str, int]:
+        """对多个工作表做同一个流式单列变换（只重写一次文件），返回 {工作表: 改动的单元格数}"""
+        if self.file_ext not in ['.xlsx', '.xlsm'] and self.file_ext not in _CSV_EXTS:
+            raise ExcelLiteError(f"不支持保存该文件格式: {self.file_ext}")
+        if any(ws._patches or ws._fills for ws in self._worksheets or []):
+            raise ExcelLiteError("工作表有尚未保存的修改，请先调用 save()")
+        for name in sheet_names:
+            if name not in self.sheetnames:
+                raise ExcelLiteError(f"工作表 '{name}' 不存在")
+        columns = (column,) if isinstance(column, int) else tuple(column)
+        
+        counts = {}
+        
+        def write(temp_path):
+            if self.file_ext in _CSV_EXTS:
+                counts.update((name, self._transform_csv(temp_path, columns, fn, dst_column, min_row))
+                              for name in sheet_names[:1])
+                return
+            from excel_toolkit.xlsx_patch import _ColumnTransform, write_transformed_workbook
+            shared_strings = self._get_shared_strings()
+            transforms = {name: _ColumnTransform(columns, fn, shared_strings, dst_column, min_row)
+                          for name in sheet_names}
+            write_transformed_workbook(self._get_zip(), temp_path,
+                                       {self._get_sheet_path(name): t for name, t in transforms.items()})
+            counts.update((name, t.changed) for name, t in transforms.items())
+        
+        self._write_replace(os.path.abspath(file_path or self.file_path), write)
+        return counts
+    
+    def insert_rows(self, sheet_name: str, insertions: Dict[int, List[List[Any]]], fill: Optional[str] = None,
+                    file_path: Optional[str] = None) -> int:
+        """一次性插入多组新行（流式重写工作表），返回插入的行数
+        
+        与逐次调用 openpyxl 的 insert_rows 不同，所有插入点在一遍扫描中完成：插入点之前的行
+        原样拷贝，之后的行改写行号下移，耗时与工作表大小成正比，与插入次数无关。
+        完成后读取器被关闭。
+        
+        Args:
+            sheet_name: 工作表名称
+            insertions: {行号: [新行的值列表, ...]}，新行按顺序插在该行之后（0 表示插在最前面），
+                值从A列开始依次写入；行号为插入前的原行号
+            fill: 新行单元格的填充色（如 'FF00B0F0'），CSV/TSV 忽略
+            file_path: 保存路径，默认覆盖原文件
+        """
+        if self.file_ext not in ['.xlsx', '.xlsm'] and self.file_ext not in _CSV_EXTS:
+            raise ExcelLiteError(f"不支持保存该文件格式: {self.file_ext}")
+        if any(ws._patches or ws._fills for ws in self._worksheets or []):
+            raise ExcelLiteError("工作表有尚未保存的修改，请先调用 save()")
+        if sheet_name not in self.sheetnames:
+            raise ExcelLiteError(f"工作表 '{sheet_name}' 不存在")
+        if any(row < 0 for row in insertions):
+            raise ExcelLiteError("插入位置的行号不能为负数")
+        total = sum(len(rows) for rows in insertions.values())
+        if not total:
+            return 0
+        
+        def write(temp_path):
+            if self.file_ext in _CSV_EXTS:
+                self._insert_csv_rows(temp_path, insertions)
+                return
+            from excel_toolkit.xlsx_patch import _RowInserter, write_inserted_workbook
+            write_inserted_workbook(self._get_zip(), temp_path,
+                                    {self._get_sheet_path(sheet_name): _RowInserter(insertions, fill)},
+                                    self._styles_path or 'xl/styles.xml')
+        
+        self._write_replace(os.path.abspath(file_path or self.file_path), write)
+        return total
+    
+    def delete_cols(self, sheet_columns: Dict[str, List[int]], file_path: Optional[str] = None) -> Dict[str, List[int]]:
+        """一次性删除多个工作表中的多列（流式重写），其后的列整体左移
+        
+        与逐列调用 openpyxl 的 delete_cols 不同，每个工作表只扫描一遍，同时改写列宽、
+        合并单元格等范围；其余工作表与zip成员原样拷贝。完成后读取器被关闭。
+        返回 {工作表: 实际有单元格被删除的列号（升序）}；没有单元格的列不报错，照常处理范围。
+        
+        Args:
+            sheet_columns: {工作表名称: [要删除的列号（1基）, ...]}
+            file_path: 保存路径，默认覆盖原文件
+        """
+        if self.file_ext not in ['.xlsx', '.xlsm'] and self.file_ext not in _CSV_EXTS:
+            raise ExcelLiteError(f"不支持保存该文件格式: {self.file_ext}")
+        if any(ws._patches or ws._fills for ws in self._worksheets or []):
+            raise ExcelLiteError("工作表有尚未保存的修改，请先调用 save()")
+        for name, columns in sheet_columns.items():
+            if name not in self.sheetnames:
+                raise ExcelLiteError(f"工作表 '{name}' 不存在")
+            if any(col < 1 for col in columns):
+                raise ExcelLiteError("列号必须从1开始")
+        found = {name: [] for name in sheet_columns}
+        sheet_columns = {name: columns for name, columns in sheet_columns.items() if columns}
+        if not sheet_columns:
+            return found
+        
+        def write(temp_path):
+            if self.file_ext in _CSV_EXTS:
+                name = self.sheetnames[0]
+                found[name] = self._drop_csv_cols(temp_path, sheet_columns[name])
+                return
+            from excel_toolkit.xlsx_patch import _ColumnDropper, write_dropped_workbook
+            droppers = {name: _ColumnDropper(columns) for name, columns in sheet_columns.items()}
+            write_dropped_workbook(self._get_zip(), temp_path,
+                                   {self._get_sheet_path(name): dropper for name, dropper in droppers.items()})
+            found.update((name, sorted(dropper.found)) for name, dropper in droppers.items())
+        
+        self._write_replace(os.path.abspath(file_path or self.file_path), write)
+        return found
+    
+    def _write_replace(self, target: str, write):
+        """write(临时文件路径) 写出新文件后替换 target；失败时删除临时文件
+        
+        target 是符号链接时替换其指向的文件；新文件沿用原文件的权限（尽量也沿用属主），
+        新建的文件按 umask 设置权限，而不是 mkstemp 的 0600。
+        """
+        target = os.path.realpath(target)
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(target))
+        os.close(fd)
+        try:
+            write(temp_path)
+            _copy_file_mode(target, temp_path)
+            # 释放原文件句柄后再替换（覆盖原文件时必需）
+            self.close()
+            os.replace(temp_path, target)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
     def close(self):
         """关闭工作簿"""
         if self._workbook and hasattr(self._workbook, 'release_resources'):
             self._workbook.release_resources()
         self._workbook = None
+        for shared_strings in (self._shared_strings, self._window_shared_strings):
+            if isinstance(shared_strings, _LazySharedStrings):
+                shared_strings.close()
+        if self._zip_file is not None:
+            self._zip_file.close()
+        self._zip_file = None
+        self._sheet_paths = None
+        self._shared_strings_path = None
+        self._styles_path = None
+        self._shared_strings = None
+        self._window_shared_strings = None
+        self._sheet_extents = {}
+        self._row_indexes = {}
+        self._csv_format = None
     
     @property
     def sheetnames(self) -> List[str]:
@@ -194,8 +1522,7 @@ class ExcelReader:
         if self.file_ext == '.xls':
             # 使用xlrd读取旧版Excel
             try:
-                wb = xlrd.open_workbook(self.file_path)
-                self._sheet_names = wb.sheet_names()
+                self._sheet_names = self._get_xls_book().sheet_names()
                 return self._sheet_names
             except Exception as e:
                 raise ExcelLiteError(f"无法读取.xls文件: {e}")
@@ -207,217 +1534,643 @@ class ExcelReader:
                 return self._sheet_names
             except Exception as e:
                 raise ExcelLiteError(f"无法读取.xlsx文件: {e}")
+        
+        elif self.file_ext in _CSV_EXTS:
+            # CSV/TSV 只有一个工作表，以文件名（不含扩展名）命名
+            self._sheet_names = [os.path.splitext(os.path.basename(self.file_path))[0]]
+            return self._sheet_names
         else:
             raise ExcelLiteError(f"不支持的文件格式: {self.file_ext}")
     
     def _get_xlsx_sheet_names(self) -> List[str]:
         """从xlsx文件中提取工作表名称"""
+        return list(self._get_sheet_paths())
+    
+    def _get_zip(self) -> zipfile.ZipFile:
+        """获取（缓存的）zip文件句柄"""
+        if self._zip_file is None:
+            self._zip_file = zipfile.ZipFile(self.file_path, 'r')
+        return self._zip_file
+    
+    def _get_sheet_paths(self) -> Dict[str, str]:
+        """解析 workbook.xml 及其关系文件，得到 {工作表名: zip内XML路径}（有序）"""
+        if self._sheet_paths is not None:
+            return self._sheet_paths
+        
         try:
-            with zipfile.ZipFile(self.file_path, 'r') as zip_file:
-                # 读取workbook.xml获取工作表信息
-                workbook_xml = zip_file.read('xl/workbook.xml')
-                root = SafeET.fromstring(workbook_xml)
-                
-                # 查找所有工作表
-                sheets = []
-                for sheet in root.findall('.//{http://schemas.openxmlformats.org/spreadsheetml/2006/main}sheet'):
-                    name = sheet.get('name')
-                    if name:
-                        sheets.append(name)
-                
-                return sheets
+            zip_file = self._get_zip()
+            root = SafeET.fromstring(zip_file.read('xl/workbook.xml'))
+            
+            # 关系ID -> 目标文件
+            targets = {}
+            try:
+                rels_root = SafeET.fromstring(zip_file.read('xl/_rels/workbook.xml.rels'))
+                for rel in rels_root.iter(f'{_PKG_REL_NS}Relationship'):
+                    target = _resolve_rel_target(rel.get('Target', ''))
+                    targets[rel.get('Id')] = target
+                    if rel.get('Type', '').endswith('/sharedStrings'):
+                        self._shared_strings_path = target
+                    elif rel.get('Type', '').endswith('/styles'):
+                        self._styles_path = target
+            except KeyError:
+                pass
+            
+            sheet_paths = {}
+            sheet_index = 1
+            for sheet in root.iter(f'{_NS}sheet'):
+                name = sheet.get('name')
+                if name:
+                    # 关系文件缺失时退回按顺序命名的 sheetN.xml
+                    path = targets.get(sheet.get(f'{_REL_NS}id'))
+                    sheet_paths[name] = path or f'xl/worksheets/sheet{sheet_index}.xml'
+                sheet_index += 1
         except Exception as e:
             raise ExcelLiteError(f"解析xlsx文件失败: {e}")
+        
+        self._sheet_paths = sheet_paths
+        return sheet_paths
     
     def get_sheet_data(self, sheet_name: str, max_rows: int = None) -> List[List[Any]]:
-        """获取工作表数据"""
+        """获取工作表数据
+        
+        启用磁盘缓存时，命中的整表读取直接返回 mmap 的列式数据（同样按行下标访问）。
+        """
+        if self.cache and not max_rows:
+            data = self._load_cached_sheet(sheet_name)
+            if data is not None:
+                return data
+        
         if self.file_ext == '.xls':
-            return self._get_xls_sheet_data(sheet_name, max_rows)
+            data = self._get_xls_sheet_data(sheet_name, max_rows)
         elif self.file_ext in ['.xlsx', '.xlsm']:
-            return self._get_xlsx_sheet_data(sheet_name, max_rows)
+            data = self._get_xlsx_sheet_data(sheet_name, max_rows)
+        elif self.file_ext in _CSV_EXTS:
+            data = [row for _, row in self._iter_csv_rows(sheet_name, max_rows)]
         else:
             raise ExcelLiteError(f"不支持的文件格式: {self.file_ext}")
+        
+        if self.cache and not max_rows:
+            self._store_cached_sheet(sheet_name, _ColumnarSheetData.from_rows(enumerate(data, start=1)))
+        return data
+    
+    def _load_cached_sheet(self, sheet_name: str) -> Optional['_ColumnarSheetData']:
+        """从磁盘缓存读取工作表，未命中时返回 None"""
+        from excel_toolkit import sheet_cache
+        return sheet_cache.load_sheet(self.file_path, sheet_name)
+    
+    def _store_cached_sheet(self, sheet_name: str, data: '_ColumnarSheetData'):
+        """把解析结果写入磁盘缓存"""
+        from excel_toolkit import sheet_cache
+        sheet_cache.store_sheet(self.file_path, sheet_name, data)
+    
+    def get_sheet_columns(self, sheet_name: str) -> '_ColumnarSheetData':
+        """获取工作表数据（列式存储）"""
+        if self.cache:
+            data = self._load_cached_sheet(sheet_name)
+            if data is None:
+                data = self._parse_sheet_columns(sheet_name)
+                self._store_cached_sheet(sheet_name, data)
+            return data
+        return self._parse_sheet_columns(sheet_name)
+    
+    def _parse_sheet_columns(self, sheet_name: str) -> '_ColumnarSheetData':
+        """解析工作表为列式存储"""
+        if self.file_ext == '.xls':
+            return _ColumnarSheetData.from_rows(enumerate(self._get_xls_sheet_data(sheet_name), start=1))
+        elif self.file_ext in _STREAMING_EXTS:
+            # 直接由行流构建，不经过行列表
+            return _ColumnarSheetData.from_rows(self.iter_sheet_rows(sheet_name))
+        else:
+            raise ExcelLiteError(f"不支持的文件格式: {self.file_ext}")
+    
+    def _get_xls_book(self):
+        """获取（缓存的）xlrd工作簿，按需加载工作表"""
+        if self._workbook is None:
+            self._workbook = xlrd.open_workbook(self.file_path, on_demand=True)
+        return self._workbook
     
     def _get_xls_sheet_data(self, sheet_name: str, max_rows: int = None) -> List[List[Any]]:
         """从xls文件读取数据"""
         try:
-            wb = xlrd.open_workbook(self.file_path)
+            wb = self._get_xls_book()
             if sheet_name not in wb.sheet_names():
                 raise ExcelLiteError(f"工作表 '{sheet_name}' 不存在")
             
             sheet = wb.sheet_by_name(sheet_name)
-            data = []
-            
-            end_row = min(sheet.nrows, max_rows) if max_rows else sheet.nrows
-            
-            for row_idx in range(end_row):
-                row_data = []
+            try:
+                end_row = min(sheet.nrows, max_rows) if max_rows else sheet.nrows
+                
+                # 整行批量取值
+                data = [sheet.row_values(row_idx) for row_idx in range(end_row)]
+                
+                # 按列批量转换日期：只处理含日期单元格的列
                 for col_idx in range(sheet.ncols):
-                    cell = sheet.cell(row_idx, col_idx)
-                    value = cell.value
-                    
-                    # 处理日期类型
-                    if cell.ctype == xlrd.XL_CELL_DATE:
-                        try:
-                            import datetime
-                            date_tuple = xlrd.xldate_as_tuple(value, wb.datemode)
-                            value = datetime.datetime(*date_tuple)
-                        except:
-                            pass
-                    
-                    row_data.append(value)
-                data.append(row_data)
-            
-            return data
+                    col_types = sheet.col_types(col_idx, 0, end_row)
+                    if xlrd.XL_CELL_DATE not in col_types:
+                        continue
+                    for row_idx, ctype in enumerate(col_types):
+                        if ctype == xlrd.XL_CELL_DATE:
+                            data[row_idx][col_idx] = _xls_date_value(data[row_idx][col_idx], wb.datemode)
+                
+                return data
+            finally:
+                # 用完即卸载，避免多表文件常驻内存
+                wb.unload_sheet(sheet_name)
+        except ExcelLiteError:
+            raise
         except Exception as e:
             raise ExcelLiteError(f"读取xls工作表失败: {e}")
     
     def _get_xlsx_sheet_data(self, sheet_name: str, max_rows: int = None) -> List[List[Any]]:
         """从xlsx文件读取数据（简化版本，只读取值）"""
+        data = []
+        for row_number, row_data in self.iter_sheet_rows(sheet_name, max_rows):
+            # 补齐中间缺失的空行，保证行号与Excel一致
+            while len(data) < row_number - 1:
+                data.append([])
+            data.append(row_data)
+        return data
+    
+    def iter_sheet_rows(self, sheet_name: str, max_rows: int = None, min_col: int = None, max_col: int = None,
+                        min_row: int = None):
+        """流式逐行读取xlsx（或CSV/TSV）工作表，产出 (行号, 行数据)
+        
+        直接从zip成员流增量解析，每行处理完即释放，内存占用不随行数增长。
+        指定 min_col/max_col 时只解码该列范围，行数据的第0项对应 min_col。
+        指定 min_row 且xlsx已有行偏移索引时直接定位到该行开始解析；没有索引时仍从头读取，
+        由调用方按行号跳过之前的行。从头读完整表时顺便建立行偏移索引。
+        """
+        if min_row and min_row > 1 and self.file_ext in ['.xlsx', '.xlsm']:
+            index = self._row_indexes.get(sheet_name)
+            if index is None and self.cache:
+                index = self.get_row_index(sheet_name, scan=False)
+            if index:
+                return (yield from self._iter_rows_from(sheet_name, index, min_row, max_rows, min_col, max_col))
+        if self.file_ext in _CSV_EXTS:
+            return (yield from self._iter_csv_rows(sheet_name, max_rows, min_col, max_col))
         try:
-            with zipfile.ZipFile(self.file_path, 'r') as zip_file:
-                # 获取工作表ID
-                sheet_id = self._get_sheet_id(zip_file, sheet_name)
-                if not sheet_id:
-                    raise ExcelLiteError(f"工作表 '{sheet_name}' 不存在")
-                
-                # 读取工作表数据
-                sheet_xml_path = f'xl/worksheets/sheet{sheet_id}.xml'
-                sheet_xml = zip_file.read(sheet_xml_path)
-                
-                # 读取共享字符串
-                shared_strings = self._get_shared_strings(zip_file)
-                
-                # 解析工作表数据
-                return self._parse_sheet_xml(sheet_xml, shared_strings, max_rows)
-                
+            sheet_xml_path = self._get_sheet_path(sheet_name)
+            shared_strings = self._shared_strings_for(max_rows)
+            
+            row_index = None
+            if not max_rows and sheet_name not in self._row_indexes:
+                row_index = _RowIndex()
+            with self._get_zip().open(sheet_xml_path) as stream:
+                stopped = yield from self._iter_sheet_xml(stream, shared_strings, max_rows, min_col, max_col,
+                                                          row_index=row_index)
+            if row_index is not None:
+                self._set_row_index(sheet_name, row_index)
+            return stopped
+        except ExcelLiteError:
+            raise
         except Exception as e:
             raise ExcelLiteError(f"读取xlsx工作表失败: {e}")
     
-    def _get_sheet_id(self, zip_file: zipfile.ZipFile, sheet_name: str) -> Optional[str]:
-        """获取工作表ID（基于在workbook.xml中的顺序）"""
-        workbook_xml = zip_file.read('xl/workbook.xml')
-        root = SafeET.fromstring(workbook_xml)
+    def iter_sheet_columns(self, sheet_name: str, columns: List[int], min_row: int = 1, max_row: int = None):
+        """流式读取工作表中指定的几列（可不相邻），产出 (行号, [各列的值])，值按 columns 的顺序
         
-        sheet_index = 1  # 工作表文件从sheet1.xml开始
-        for sheet in root.findall('.//{http://schemas.openxmlformats.org/spreadsheetml/2006/main}sheet'):
-            if sheet.get('name') == sheet_name:
-                return str(sheet_index)
-            sheet_index += 1
-        return None
+        xlsx 按单元格引用直接在原始字节中定位这几列，不解析其他单元格，只取键列时比
+        iter_sheet_rows 快数倍；没有这些列单元格的行值为空串，空行可能不产出。
+        其他格式回退为 iter_sheet_rows。
+        """
+        columns = list(columns)
+        if self.file_ext in ['.xlsx', '.xlsm']:
+            from excel_toolkit.xlsx_patch import iter_column_values
+            try:
+                shared_strings = self._get_shared_strings()
+                with self._get_zip().open(self._get_sheet_path(sheet_name)) as stream:
+                    yield from iter_column_values(stream, columns, shared_strings, min_row, max_row)
+                return
+            except ExcelLiteError:
+                raise
+            except Exception as e:
+                raise ExcelLiteError(f"读取xlsx工作表失败: {e}")
+        
+        min_col = min(columns)
+        offsets = [col - min_col for col in columns]
+        for row_number, values in self.iter_sheet_rows(sheet_name, max_row, min_col, max(columns), min_row=min_row):
+            if row_number < min_row:
+                continue
+            width = len(values)
+            yield row_number, [values[offset] if offset < width else '' for offset in offsets]
     
-    def _get_shared_strings(self, zip_file: zipfile.ZipFile) -> List[str]:
-        """获取共享字符串表"""
+    def _iter_rows_from(self, sheet_name: str, index: _RowIndex, min_row: int, max_rows: int = None,
+                        min_col: int = None, max_col: int = None):
+        """借助行偏移索引跳过 min_row 之前的XML解析，从该行开始解析
+        
+        ZipExtFile.seek 在压缩流中向前定位时会解压并丢弃之前的数据，解压耗时不变，
+        只省掉之前各行的XML解析与值转换。
+        """
+        position = index.position(min_row)
+        if position >= len(index):
+            return False
         try:
-            shared_strings_xml = zip_file.read('xl/sharedStrings.xml')
-            root = SafeET.fromstring(shared_strings_xml)
-            
-            ns = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
-            strings = []
-            
-            for si in root.findall(f'.//{ns}si'):
-                # 尝试直接获取 <t> 元素
-                text_elem = si.find(f'{ns}t')
-                if text_elem is not None and text_elem.text:
-                    strings.append(text_elem.text)
-                else:
-                    # 处理富文本格式：<si><r><t>text1</t></r><r><t>text2</t></r></si>
-                    text_parts = []
-                    for r_elem in si.findall(f'{ns}r'):
-                        t_elem = r_elem.find(f'{ns}t')
-                        if t_elem is not None and t_elem.text:
-                            text_parts.append(t_elem.text)
-                    
-                    if text_parts:
-                        strings.append(''.join(text_parts))
-                    else:
-                        # 最后尝试获取所有 <t> 元素
-                        all_t = si.findall(f'.//{ns}t')
-                        if all_t:
-                            strings.append(''.join(t.text or '' for t in all_t))
-                        else:
-                            strings.append('')
-            
-            return strings
-        except:
-            return []
+            shared_strings = self._shared_strings_for(max_rows)
+            with self._get_zip().open(self._get_sheet_path(sheet_name)) as stream:
+                # 第一行之前的XML（含命名空间声明）作为前缀，再从目标行的偏移继续
+                prefix = stream.read(index.offsets[0])
+                stream.seek(index.offsets[position])
+                return (yield from self._iter_sheet_xml(stream, shared_strings, max_rows, min_col, max_col,
+                                                        prefix=prefix, first_row=index.rows[position]))
+        except ExcelLiteError:
+            raise
+        except Exception as e:
+            raise ExcelLiteError(f"读取xlsx工作表失败: {e}")
     
-    def _parse_sheet_xml(self, sheet_xml: bytes, shared_strings: List[str], max_rows: int = None) -> List[List[Any]]:
-        """解析工作表XML数据"""
-        root = SafeET.fromstring(sheet_xml)
-        data = []
+    def get_row_index(self, sheet_name: str, scan: bool = True) -> Optional[_RowIndex]:
+        """获取xlsx工作表的行偏移索引
         
-        rows = root.findall('.//{http://schemas.openxmlformats.org/spreadsheetml/2006/main}row')
+        依次使用内存中的索引、磁盘缓存（cache=True 时）；都没有且 scan=True 时
+        按原始字节扫描 <row> 标签建立（不解析单元格）。非xlsx文件返回 None。
+        """
+        index = self._row_indexes.get(sheet_name)
+        if index is not None or self.file_ext not in ['.xlsx', '.xlsm']:
+            return index
+        if self.cache:
+            from excel_toolkit import sheet_cache
+            index = sheet_cache.load_row_index(self.file_path, sheet_name)
+            if index is not None:
+                self._row_indexes[sheet_name] = index
+                return index
+        if not scan:
+            return None
+        try:
+            index = self._scan_row_index(sheet_name)
+        except Exception:
+            return None
+        self._set_row_index(sheet_name, index)
+        return index
+    
+    def _set_row_index(self, sheet_name: str, index: _RowIndex):
+        """保存行偏移索引；启用磁盘缓存时一并写入"""
+        self._row_indexes[sheet_name] = index
+        if self.cache:
+            from excel_toolkit import sheet_cache
+            sheet_cache.store_row_index(self.file_path, sheet_name, index)
+    
+    def _get_csv_format(self) -> Tuple[str, str]:
+        """识别CSV/TSV的编码与分隔符，返回 (编码, 分隔符)
         
-        for row_idx, row in enumerate(rows):
-            if max_rows and row_idx >= max_rows:
-                break
-                
-            row_data = []
-            cells = row.findall('.//{http://schemas.openxmlformats.org/spreadsheetml/2006/main}c')
-            
-            # 获取当前行的最大列数
-            max_col = 0
-            cell_dict = {}
-            
-            for cell in cells:
-                cell_ref = cell.get('r', '')
-                if cell_ref:
-                    # 解析单元格引用（如A1, B2）
-                    col_str = ''.join(c for c in cell_ref if c.isalpha())
-                    col_idx = column_index_from_string(col_str) - 1
-                    max_col = max(max_col, col_idx)
-                    
-                    # 获取单元格值
-                    value = self._get_cell_value(cell, shared_strings)
-                    cell_dict[col_idx] = value
-            
-            # 构建行数据
-            for col_idx in range(max_col + 1):
-                row_data.append(cell_dict.get(col_idx, ''))
-            
-            data.append(row_data)
+        带BOM时按BOM识别；开头部分能按UTF-8解码时用UTF-8，否则按GB18030（兼容GBK）读取。
+        .tsv 固定用制表符，.csv 按表头行中出现最多的 , / 制表符 / ; 判断。
+        """
+        if self._csv_format is not None:
+            return self._csv_format
+        try:
+            with open(self.file_path, 'rb') as f:
+                sample = f.read(_CSV_SNIFF_SIZE)
+        except OSError as e:
+            raise ExcelLiteError(f"无法读取CSV文件: {e}")
         
-        return data
+        if sample.startswith(codecs.BOM_UTF8):
+            encoding = 'utf-8-sig'
+        elif sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            encoding = 'utf-16'
+        else:
+            try:
+                # 样本末尾可能截断在多字节字符中间，使用增量解码器
+                codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+                encoding = 'utf-8'
+            except UnicodeDecodeError:
+                encoding = 'gb18030'
+        
+        if self.file_ext == '.tsv':
+            delimiter = '\t'
+        else:
+            header = sample.decode(encoding, errors='ignore').lstrip('\ufeff').split('\n', 1)[0]
+            counts = {candidate: header.count(candidate) for candidate in (',', '\t', ';')}
+            delimiter = max(counts, key=counts.get) if any(counts.values()) else ','
+        self._csv_format = (encoding, delimiter)
+        return self._csv_format
     
-    def _get_cell_value(self, cell_elem, shared_strings: List[str]) -> Any:
-        """获取单元格值"""
-        cell_type = cell_elem.get('t', '')
-        value_elem = cell_elem.find('.//{http://schemas.openxmlformats.org/spreadsheetml/2006/main}v')
+    def _iter_csv_rows(self, sheet_name: str, max_rows: int = None, min_col: int = None, max_col: int = None):
+        """用 csv 模块逐行读取CSV/TSV，产出 (行号, 行数据)；值一律保持为文本
         
-        if value_elem is None:
-            return ''
+        编码只按文件开头识别；按UTF-8读到后面才遇到无法解码的字节时，改用GB18030
+        从头重新读取，跳过已产出的行继续。因遇到 max_rows 之后的行而提前停止时返回 True。
+        """
+        if sheet_name not in self.sheetnames:
+            raise ExcelLiteError(f"工作表 '{sheet_name}' 不存在")
+        start_col = (min_col or 1) - 1
+        produced = 0
+        while True:
+            encoding, delimiter = self._get_csv_format()
+            try:
+                with open(self.file_path, 'r', encoding=encoding, newline='', buffering=_CSV_BUFFER_SIZE) as f:
+                    for row_number, row_data in enumerate(csv.reader(f, delimiter=delimiter), start=1):
+                        if row_number <= produced:
+                            continue
+                        if max_rows and row_number > max_rows:
+                            return True
+                        if start_col or max_col:
+                            row_data = row_data[start_col:max_col]
+                        produced = row_number
+                        yield row_number, row_data
+                return
+            except UnicodeDecodeError as e:
+                if encoding != 'utf-8':
+                    raise ExcelLiteError(f"读取CSV文件失败（编码 {encoding}）: {e}")
+                self._csv_format = ('gb18030', delimiter)
+            except (OSError, csv.Error) as e:
+                raise ExcelLiteError(f"读取CSV文件失败（编码 {encoding}）: {e}")
+    
+    def _rewrite_csv(self, out_path: str, rewrite):
+        """按原编码和分隔符把 rewrite(csv.writer) 的输出写入 out_path，返回其结果
         
-        value = value_elem.text or ''
+        读取中途编码由UTF-8改为GB18030时，已写出的内容编码不对，按新编码重写一遍。
+        """
+        while True:
+            encoding, delimiter = self._get_csv_format()
+            with open(out_path, 'w', encoding=encoding, newline='', buffering=_CSV_BUFFER_SIZE) as f:
+                result = rewrite(csv.writer(f, delimiter=delimiter))
+            if self._csv_format[0] == encoding:
+                return result
+    
+    def _write_csv(self, out_path: str, patches: Dict[int, Dict[int, Any]]):
+        """按原编码和分隔符重写CSV/TSV，把已修改的值覆盖到对应行"""
+        def rewrite(writer):
+            last_row = 0
+            for last_row, row_data in self._iter_csv_rows(self.sheetnames[0]):
+                patched = patches.get(last_row)
+                if patched:
+                    row_data.extend([''] * (max(patched) - len(row_data)))
+                    for col, value in patched.items():
+                        row_data[col - 1] = value
+                writer.writerow(row_data)
+            # 写入超出原数据范围的新行
+            for row_number in range(last_row + 1, max(patches, default=0) + 1):
+                patched = patches.get(row_number, {})
+                row_data = [''] * max(patched, default=0)
+                for col, value in patched.items():
+                    row_data[col - 1] = value
+                writer.writerow(row_data)
         
-        if cell_type == 's':  # 共享字符串
-            try:
-                idx = int(value)
-                if 0 <= idx < len(shared_strings):
-                    return shared_strings[idx]
-            except (ValueError, IndexError):
-                pass
-        elif cell_type == 'b':  # 布尔值
-            return value == '1'
-        elif cell_type in ('n', ''):  # 数字
-            try:
-                if '.' in value:
-                    return float(value)
-                else:
-                    return int(value)
-            except ValueError:
-                pass
+        self._rewrite_csv(out_path, rewrite)
+    
+    def _transform_csv(self, out_path: str, columns: Tuple[int, ...], fn, dst_column: int = None,
+                       min_row: int = 2) -> int:
+        """CSV/TSV 的流式单列变换，返回改动的单元格数"""
+        dst_column = dst_column or columns[0]
         
-        return value
+        def rewrite(writer):
+            changed = 0
+            for row_number, row_data in self._iter_csv_rows(self.sheetnames[0]):
+                if row_number >= min_row:
+                    width = len(row_data)
+                    value = fn(*[row_data[col - 1] if col <= width else '' for col in columns])
+                    if value is not None:
+                        if dst_column > width:
+                            row_data.extend([''] * (dst_column - width))
+                        row_data[dst_column - 1] = value
+                        changed += 1
+                writer.writerow(row_data)
+            return changed
+        
+        return self._rewrite_csv(out_path, rewrite)
+    
+    def _insert_csv_rows(self, out_path: str, insertions: Dict[int, List[List[Any]]]):
+        """CSV/TSV 的流式插入行"""
+        def rewrite(writer):
+            writer.writerows(insertions.get(0, ()))
+            last_row = 0
+            for last_row, row_data in self._iter_csv_rows(self.sheetnames[0]):
+                writer.writerow(row_data)
+                writer.writerows(insertions.get(last_row, ()))
+            # 插入点超出原数据范围时追加在末尾
+            for row_number in sorted(insertions):
+                if row_number > last_row:
+                    writer.writerows(insertions[row_number])
+        
+        self._rewrite_csv(out_path, rewrite)
+    
+    def _drop_csv_cols(self, out_path: str, columns: List[int]) -> List[int]:
+        """CSV/TSV 的流式删除列，返回在数据范围内的被删除列号"""
+        dropped = {col - 1 for col in columns}
+        
+        def rewrite(writer):
+            width = 0
+            for _, row_data in self._iter_csv_rows(self.sheetnames[0]):
+                width = max(width, len(row_data))
+                writer.writerow([value for index, value in enumerate(row_data) if index not in dropped])
+            return width
+        
+        width = self._rewrite_csv(out_path, rewrite)
+        return sorted(col for col in set(columns) if col <= width)
+    
+    def get_sheet_dimension(self, sheet_name: str) -> Optional[Tuple[int, int]]:
+        """读取工作表 <dimension> 声明的范围，返回 (最大行, 最大列)
+        
+        只解析到 <sheetData> 之前，不读取单元格数据；没有声明时返回 None。
+        """
+        if self.file_ext not in ['.xlsx', '.xlsm']:
+            return None
+        try:
+            with self._get_zip().open(self._get_sheet_path(sheet_name)) as stream:
+                target = _SheetXMLTarget([])
+                parser = _make_safe_parser(target)
+                while not target.sheet_data_started:
+                    chunk = stream.read(4096)
+                    if not chunk:
+                        break
+                    parser.feed(chunk)
+                return target.dimension
+        except Exception:
+            return None
+        return None
+    
+    def get_sheet_extent(self, sheet_name: str, scan: bool = True) -> Optional[Tuple[int, int]]:
+        """获取工作表范围 (最大行, 最大列)，每个工作表只扫描一次
+        
+        按原始字节扫描 <row r> 与单元格引用求出，不解析单元格数据；<dimension>
+        声明可能过时（小于实际数据），只在 scan=False 时作为未扫描前的估计返回，
+        不会被缓存为工作表范围。非xlsx文件返回 None。
+        """
+        extent = self._sheet_extents.get(sheet_name)
+        if extent is not None:
+            return extent
+        if self.file_ext not in ['.xlsx', '.xlsm']:
+            return None
+        if not scan:
+            return self.get_sheet_dimension(sheet_name)
+        try:
+            extent = self._scan_sheet_extent(sheet_name)
+        except Exception:
+            return None
+        self._sheet_extents[sheet_name] = extent
+        return extent
+    
+    def _scan_sheet_extent(self, sheet_name: str) -> Tuple[int, int]:
+        """扫描工作表XML的原始字节求出最后一行的行号和最大列"""
+        max_row = 0
+        max_col = 0
+        row_number = 0
+        pending = b''
+        with self._get_zip().open(self._get_sheet_path(sheet_name)) as stream:
+            while True:
+                chunk = stream.read(_STREAM_CHUNK_SIZE)
+                buffer = pending + chunk
+                end = _SHEET_DATA_END_PATTERN.search(buffer)
+                if end is not None:
+                    buffer = buffer[:end.start()]
+                    chunk = b''
+                if chunk:
+                    # 最后一个 '<' 之后的内容可能是不完整的标签，留到下一块
+                    cut = buffer.rfind(b'<')
+                    pending = buffer[cut:] if cut >= 0 else b''
+                    buffer = buffer[:cut] if cut >= 0 else buffer
+                for match in _ROW_TAG_PATTERN.finditer(buffer):
+                    number = match.group(1)
+                    row_number = int(number) if number else row_number + 1
+                if row_number > max_row:
+                    max_row = row_number
+                for letters in set(_CELL_REF_PATTERN.findall(buffer)):
+                    col = _column_from_ref(letters.decode('ascii'))
+                    if col > max_col:
+                        max_col = col
+                if not chunk:
+                    break
+        return max_row, max_col
+    
+    def _scan_row_index(self, sheet_name: str) -> _RowIndex:
+        """按原始字节扫描 <row> 标签建立行偏移索引（不解析单元格）"""
+        index = _RowIndex()
+        row_pattern = None
+        row_number = 0
+        pending = b''
+        base = 0  # buffer 第一个字节在XML中的偏移
+        with self._get_zip().open(self._get_sheet_path(sheet_name)) as stream:
+            while True:
+                chunk = stream.read(_STREAM_CHUNK_SIZE)
+                buffer = pending + chunk
+                if row_pattern is None:
+                    first = _ROW_TAG_PATTERN.search(buffer)
+                    if first is None and chunk:
+                        pending = buffer
+                        continue
+                    # 按实际的标签写法（可能带命名空间前缀）生成以字面量开头的模式，比通用模式快得多
+                    tag = buffer[first.start():first.start() + first.group(0).index(b'row') + 3] if first else b'<row'
+                    row_pattern = re.compile(re.escape(tag) + rb'\b(?:[^>]*?\sr="(\d+)")?')
+                end = _SHEET_DATA_END_PATTERN.search(buffer) if b'sheetData>' in buffer else None
+                if end is not None:
+                    buffer = buffer[:end.start()]
+                    chunk = b''
+                cut = len(buffer)
+                if chunk:
+                    # 最后一个 '<' 之后的内容可能是不完整的标签，留到下一块
+                    cut = buffer.rfind(b'<')
+                    cut = cut if cut >= 0 else len(buffer)
+                for match in row_pattern.finditer(buffer, 0, cut):
+                    number = match.group(1)
+                    row_number = int(number) if number else row_number + 1
+                    index.rows.append(row_number)
+                    index.offsets.append(base + match.start())
+                pending = buffer[cut:]
+                base += cut
+                if not chunk:
+                    break
+        return index
+    
+    def _get_sheet_path(self, sheet_name: str) -> str:
+        """获取工作表在zip中的XML路径"""
+        path = self._get_sheet_paths().get(sheet_name)
+        if not path:
+            raise ExcelLiteError(f"工作表 '{sheet_name}' 不存在")
+        return path
+    
+    def _shared_strings_for(self, max_rows: int = None):
+        """读取共享字符串；只读前若干行且整表尚未解析时按需解码"""
+        if self._shared_strings is None and max_rows:
+            if self._window_shared_strings is None:
+                self._window_shared_strings = self._load_shared_strings(lazy=True)
+            return self._window_shared_strings
+        return self._get_shared_strings()
+    
+    def _get_shared_strings(self) -> List[str]:
+        """获取共享字符串表（每个读取器只解析一次）"""
+        if self._shared_strings is None:
+            self._shared_strings = self._load_shared_strings()
+        return self._shared_strings
+    
+    def _load_shared_strings(self, lazy: bool = False):
+        """解析共享字符串表
+        
+        体积较大（或 lazy=True）时返回按需解码的 _LazySharedStrings，否则一次性解析为列表。
+        工作簿没有共享字符串表时返回空列表；表存在但读取失败时抛出 ExcelLiteError，
+        不能按空表继续，否则单元格会被读成字符串的下标（启用磁盘缓存时还会被缓存）。
+        """
+        zip_file = self._get_zip()
+        self._get_sheet_paths()
+        shared_strings_path = self._shared_strings_path or 'xl/sharedStrings.xml'
+        try:
+            info = zip_file.getinfo(shared_strings_path)
+        except KeyError:
+            return []
+        try:
+            if lazy or info.file_size >= _LAZY_SHARED_STRINGS_THRESHOLD:
+                with zip_file.open(info) as stream:
+                    return _LazySharedStrings(stream)
+            
+            root = SafeET.fromstring(zip_file.read(info))
+            return [_shared_string_text(si) for si in root.iter(f'{_NS}si')]
+        except Exception as e:
+            raise ExcelLiteError(f"读取共享字符串表失败: {e}")
+    
+    def _iter_sheet_xml(self, stream, shared_strings: List[str], max_rows: int = None,
+                        min_col: int = None, max_col: int = None, row_index: _RowIndex = None,
+                        prefix: bytes = b'', first_row: int = None):
+        """增量解析工作表XML流，逐行产出 (行号, 行数据)
+        
+        row_index 不为 None 时记录每个 <row> 的字节偏移。stream 已定位到某一行时，
+        prefix 传入第一行之前的XML，first_row 传入该行行号（用于无 r 属性的行）。
+        因遇到 max_rows 之后的行而提前停止时返回 True。
+        """
+        target = _SheetXMLTarget(shared_strings, min_col, max_col)
+        parser = _make_safe_parser(target)
+        target.row_index = row_index
+        if prefix:
+            parser.feed(prefix)
+            if first_row:
+                target._row_number = first_row - 1
+        
+        while True:
+            chunk = stream.read(_STREAM_CHUNK_SIZE)
+            if chunk:
+                parser.feed(chunk)
+            else:
+                parser.close()
+            
+            # 每块解析出的行立即产出并释放
+            rows, target.rows = target.rows, []
+            for row_number, row_data in rows:
+                if max_rows and row_number > max_rows:
+                    return True
+                yield row_number, row_data
+            
+            if not chunk or target.finished:
+                return
+
+
+# xlsx 工作表的行数上限（xlsxwriter 行号从 0 开始）
+_XLSX_MAX_ROWS = 1048576
 
 
 class ExcelWriter:
     """轻量级Excel写入器"""
     
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, constant_memory: bool = False):
+        """
+        Args:
+            file_path: 输出文件路径
+            constant_memory: 启用 xlsxwriter 的 constant_memory 模式：每写完一行即刷到临时文件，
+                内存占用与行数无关。此模式下每个工作表必须按行号递增的顺序写入，
+                已写过的行之后不能再修改（适合 write_rows 一次性输出大量结果）
+        """
         self.file_path = file_path
-        self.workbook = xlsxwriter.Workbook(file_path)
+        self.constant_memory = constant_memory
+        self.workbook = xlsxwriter.Workbook(file_path, {'constant_memory': constant_memory})
         self.worksheets = {}
+        # 样式属性 -> Format，相同样式只注册一次，避免 styles.xml 中出现大量重复格式
+        self._formats = {}
     
     def __enter__(self):
         return self
@@ -430,6 +2183,7 @@ class ExcelWriter:
         if self.workbook:
             self.workbook.close()
             self.workbook = None
+            self._formats = {}
     
     def create_sheet(self, sheet_name: str):
         """创建工作表"""
@@ -440,13 +2194,49 @@ class ExcelWriter:
         self.worksheets[sheet_name] = worksheet
         return worksheet
     
-    def write_data(self, sheet_name: str, data: List[List[Any]], start_row: int = 0, start_col: int = 0):
-        """写入数据到工作表"""
+    def get_format(self, properties: Optional[Dict[str, Any]] = None, **kwargs):
+        """按样式属性获取（缓存的）单元格格式，如 get_format(bg_color='#FFFF00', bold=True)"""
+        props = dict(properties or {}, **kwargs)
+        if not props:
+            return None
+        key = tuple(sorted(props.items()))
+        format_obj = self._formats.get(key)
+        if format_obj is None:
+            format_obj = self.workbook.add_format(props)
+            self._formats[key] = format_obj
+        return format_obj
+    
+    def write_row(self, sheet_name: str, row: int, values, start_col: int = 0, cell_format=None):
+        """写入一整行（row、start_col 从 0 开始）"""
+        if row >= _XLSX_MAX_ROWS:
+            raise ExcelLiteError(f"超出xlsx工作表的最大行数 {_XLSX_MAX_ROWS}")
         worksheet = self.create_sheet(sheet_name)
+        worksheet.write_row(row, start_col, values, cell_format)
+    
+    def write_rows(self, sheet_name: str, rows, start_row: int = 0, start_col: int = 0,
+                   cell_format=None) -> int:
+        """逐行写入数据，返回写入的行数
         
-        for row_idx, row_data in enumerate(data):
-            for col_idx, value in enumerate(row_data):
-                worksheet.write(start_row + row_idx, start_col + col_idx, value)
+        rows 可以是列表，也可以是生成器等迭代器；按行消费，配合 constant_memory
+        可以输出百万行级别的结果而内存占用保持不变。
+        
+        Args:
+            rows: 每行为值的序列
+            cell_format: 所有单元格使用的格式（get_format 的返回值），默认无格式
+        """
+        worksheet = self.create_sheet(sheet_name)
+        write_row = worksheet.write_row
+        row = start_row
+        for values in rows:
+            if row >= _XLSX_MAX_ROWS:
+                raise ExcelLiteError(f"超出xlsx工作表的最大行数 {_XLSX_MAX_ROWS}")
+            write_row(row, start_col, values, cell_format)
+            row += 1
+        return row - start_row
+    
+    def write_data(self, sheet_name: str, data: List[List[Any]], start_row: int = 0, start_col: int = 0):
+        """写入数据到工作表"""
+        self.write_rows(sheet_name, data, start_row, start_col)
     
     def set_cell_value(self, sheet_name: str, row: int, col: int, value: Any):
         """设置单元格值"""
@@ -456,8 +2246,7 @@ class ExcelWriter:
     def set_cell_color(self, sheet_name: str, row: int, col: int, color: str):
         """设置单元格背景色"""
         worksheet = self.create_sheet(sheet_name)
-        format_obj = self.workbook.add_format({'bg_color': color})
-        worksheet.write(row, col, '', format_obj)
+        worksheet.write(row, col, '', self.get_format(bg_color=color))
 
 
 # 兼容性函数，保持与原openpyxl代码的接口一致
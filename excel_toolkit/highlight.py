@@ -1,25 +1,32 @@
-from typing import Callable, Dict
-from excel_toolkit.excel_lite import column_index_from_string
+from typing import Callable, Dict, List, Optional, Sequence
+from excel_toolkit.excel_lite import ExcelReader, column_index_from_string
 import os
-
-# 导入openpyxl用于读写Excel文件（需要支持PatternFill格式）
-try:
-    import openpyxl
-    from openpyxl.styles import PatternFill
-    _OPENPYXL_AVAILABLE = True
-except ImportError:
-    _OPENPYXL_AVAILABLE = False
-    openpyxl = None
-    PatternFill = None
+import re
 
 # 常量定义
 YELLOW_HIGHLIGHT = "FFFFFF00"
 ORANGE_HIGHLIGHT = "FFFFC000"
 
+# 相邻的重复组交替使用的颜色
+_HIGHLIGHT_COLORS = (YELLOW_HIGHLIGHT, ORANGE_HIGHLIGHT)
+
+# 判断重复的范围：每个工作表内单独判断 / 所有选中的工作表合在一起判断
+SCOPE_SHEET = 'sheet'
+SCOPE_WORKBOOK = 'workbook'
+
+# 与历史文件重复的单元格颜色
+HISTORY_HIGHLIGHT = "FFFF9999"
+
+# 能写回填充色的格式
+_SUPPORTED_EXTS = ('.xlsx', '.xlsm')
+
+# 组合键列之间的分隔符（如 'A,C'、'A+C'）
+_COLUMN_SEPARATORS = re.compile(r'[,，+\s]+')
+
 
 def _check_file_locked(file_path: str) -> bool:
     """检查文件是否被其他程序锁定（如Excel/WPS）
-    
+
     Returns:
         True 如果文件被锁定，False 如果可以访问
     """
@@ -31,110 +38,255 @@ def _check_file_locked(file_path: str) -> bool:
         return True
 
 
+def parse_key_columns(column_letter: str) -> List[int]:
+    """解析键列：'A' -> [1]；'A,C' 或 'A+C' -> [1, 3]（组合键）
+
+    Raises:
+        ValueError: 列号无效
+    """
+    parts = [part for part in _COLUMN_SEPARATORS.split(str(column_letter).strip()) if part]
+    if not parts:
+        raise ValueError(f"列号 '{column_letter}' 无效")
+    cols = []
+    for part in parts:
+        col = column_index_from_string(part.upper()) if part.isascii() and part.isalpha() else 0
+        if not 1 <= col <= 16384:
+            raise ValueError(f"列号 '{column_letter}' 无效")
+        if col not in cols:
+            cols.append(col)
+    return cols
+
+
+def _open_workbook(file_path: str) -> ExcelReader:
+    """检查并打开要高亮的文件"""
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"文件未找到: {file_path}")
+    if os.path.splitext(file_path)[1].lower() not in _SUPPORTED_EXTS:
+        raise ValueError(f"只支持高亮 .xlsx/.xlsm 文件: {os.path.basename(file_path)}")
+    # 先检查文件是否被锁定
+    if _check_file_locked(file_path):
+        raise PermissionError(f"文件被占用，请先关闭 Excel/WPS 后再试: {os.path.basename(file_path)}")
+    try:
+        return ExcelReader(file_path)
+    except Exception as e:
+        raise Exception(f"加载文件失败: {e}")
+
+
 def highlight_duplicates(
-    file_name: str, 
-    column_letter: str, 
+    file_name: str,
+    column_letter: str,
     logger: Callable[[str], None] = print,
-    sheet_name: str = None
+    sheet_name: str = None,
+    scope: str = SCOPE_SHEET,
+    other_files: Optional[Sequence[str]] = None
 ) -> Dict[str, int]:
     """高亮Excel文件中指定列的重复项
-    
+
+    边读边建 键 -> 行号 的紧凑索引（只解析键列），再把填充色交给 ExcelReader.save()
+    按行流式写回，不加载整个工作簿，大表也只占用与不同键数量相当的内存。
+
     Args:
         file_name: Excel文件路径
-        column_letter: 要检查的列号（如 'A', 'B'）
+        column_letter: 要检查的列号（如 'A', 'B'）；多列组合键用逗号或加号分隔（如 'A,C'）
         logger: 日志输出函数
         sheet_name: 工作表名称，如果为None则处理所有工作表
-    
+        scope: SCOPE_SHEET 每个工作表内单独判断；SCOPE_WORKBOOK 所有选中的工作表合在一起判断
+        other_files: 一起判断重复的其他文件（同样高亮并保存）；指定时所有文件的
+            选中工作表合在一起判断
+
     Returns:
-        Dict with keys: 'sheets_processed', 'cells_highlighted'
-        
+        Dict with keys: 'sheets_processed', 'cells_highlighted', 'files_processed', 'duplicate_keys'
+
     Raises:
         FileNotFoundError, ValueError, PermissionError, Exception
     """
-    if not _OPENPYXL_AVAILABLE:
-        raise ImportError("需要openpyxl库来处理Excel文件，请安装: pip install openpyxl")
-    
-    yellow_fill = PatternFill(start_color=YELLOW_HIGHLIGHT, end_color=YELLOW_HIGHLIGHT, fill_type="solid")
-    orange_fill = PatternFill(start_color=ORANGE_HIGHLIGHT, end_color=ORANGE_HIGHLIGHT, fill_type="solid")
-    colors = [yellow_fill, orange_fill]
-    
-    logger(f"准备加载文件: {os.path.basename(file_name)}")
-    
-    if not os.path.exists(file_name):
-        raise FileNotFoundError(f"文件未找到: {file_name}")
-
-    # 先检查文件是否被锁定
-    if _check_file_locked(file_name):
-        raise PermissionError(f"文件被占用，请先关闭 Excel/WPS 后再试: {os.path.basename(file_name)}")
+    if scope not in (SCOPE_SHEET, SCOPE_WORKBOOK):
+        raise ValueError(f"未知的高亮范围: {scope}")
+    col_indexes = parse_key_columns(column_letter)
+    file_names = [file_name, *(other_files or [])]
+    if other_files:
+        scope = SCOPE_WORKBOOK
 
+    readers = []
     try:
-        logger("正在加载Excel文件，请稍候...")
-        wb = openpyxl.load_workbook(file_name)
-        logger("文件加载完成。")
-    except Exception as e:
-        raise Exception(f"加载文件失败: {e}")
-        
-    try:
-        col_index = column_index_from_string(column_letter)
-    except ValueError:
-        wb.close()
-        raise ValueError(f"列号 '{column_letter}' 无效")
-        
-    total_sheets_processed = 0
-    total_cells_highlighted = 0
-    
-    # 如果指定了工作表，只处理该工作表；否则处理所有工作表
-    if sheet_name:
-        if sheet_name not in wb.sheetnames:
+        for path in file_names:
+            logger(f"准备加载文件: {os.path.basename(path)}")
+            readers.append(_open_workbook(path))
+
+        # 收集要处理的工作表 [(文件序号, 工作表)]
+        targets = []
+        for file_no, wb in enumerate(readers):
+            if sheet_name:
+                if sheet_name not in wb.sheetnames:
+                    if file_no == 0:
+                        raise ValueError(f"工作表 '{sheet_name}' 不存在")
+                    logger(f"  > 警告：文件 {os.path.basename(file_names[file_no])} 中没有工作表 '{sheet_name}'，已跳过。")
+                    continue
+                sheets = [wb[sheet_name]]
+            else:
+                sheets = wb.worksheets
+            targets.extend((file_no, ws) for ws in sheets if ws.max_row > 1)
+
+        where = f"工作表 '{sheet_name}'" if sheet_name else "所有工作表"
+        if scope == SCOPE_WORKBOOK and len(targets) > 1:
+            logger(f"开始检查{where}之间的重复项（{len(file_names)} 个文件），高亮 {column_letter} 列...")
+            sheet_cells, duplicate_keys = _highlight_across(targets, col_indexes, logger)
+        else:
+            logger(f"开始处理{where}，高亮 {column_letter} 列...")
+            sheet_cells, duplicate_keys = _highlight_each(targets, col_indexes, logger)
+
+        total_cells_highlighted = sum(sheet_cells.values())
+        total_sheets_processed = sum(1 for count in sheet_cells.values() if count)
+        changed_files = sorted({file_no for (file_no, _), count in sheet_cells.items() if count})
+
+        for file_no in changed_files:
+            path = file_names[file_no]
+            try:
+                readers[file_no].save(logger=logger)
+            except PermissionError:
+                raise PermissionError(f"无法保存文件 '{path}'。请检查文件是否已在 Excel/WPS 中打开。")
+            except Exception as e:
+                raise Exception(f"保存文件时发生未知错误: {e}")
+            if len(file_names) > 1:
+                logger(f"  > 已保存: {os.path.basename(path)}")
+
+        return {
+            'sheets_processed': total_sheets_processed,
+            'cells_highlighted': total_cells_highlighted,
+            'files_processed': len(changed_files),
+            'duplicate_keys': duplicate_keys
+        }
+    finally:
+        for wb in readers:
             wb.close()
-            raise ValueError(f"工作表 '{sheet_name}' 不存在")
-        worksheets_to_process = [wb[sheet_name]]
-        logger(f"开始处理工作表 '{sheet_name}'，高亮 {column_letter} 列...")
-    else:
-        worksheets_to_process = wb.worksheets
-        logger(f"开始遍历所有工作表，高亮 {column_letter} 列...")
-    
-    for ws in worksheets_to_process:
-        if ws.max_row <= 1:
-            continue
-            
-        logger(f"  > 正在处理工作表: {ws.title}")
-        value_rows = {}
-        
-        # 第一遍遍历：收集数据
-        for row in ws.iter_rows(min_col=col_index, max_col=col_index, min_row=2):
-            cell = row[0]
-            if cell.value is None or cell.value == "":
-                continue
-            value = str(cell.value)
-            if value not in value_rows:
-                value_rows[value] = []
-            value_rows[value].append(cell.row)
-            
-        color_index = 0
-        sheet_cells_count = 0
-        
-        # 第二遍遍历：高亮重复项
-        for value, rows in value_rows.items():
-            if len(rows) > 1:
-                current_color = colors[color_index]
-                for row_num in rows:
-                    ws.cell(row=row_num, column=col_index).fill = current_color
-                    sheet_cells_count += 1
-                color_index = 1 - color_index
-                
-        if sheet_cells_count > 0:
-            total_sheets_processed += 1
-            total_cells_highlighted += sheet_cells_count
-            
+
+
+def highlight_history_duplicates(
+    file_name: str,
+    column_letter: str,
+    history_path: str,
+    logger: Callable[[str], None] = print,
+    sheet_name: str = None,
+    update_history: bool = True
+) -> Dict[str, int]:
+    """高亮在历史文件中出现过的值（如以往各月已发过的订单号、跟踪号）
+
+    当前文件的键先导入临时表，与持久化的历史索引做一次连接查询，命中的行标红保存；
+    之后（update_history=True 时）把当前文件的键记入历史，同一文件再次运行时替换其旧记录，
+    不会与自己比对。
+
+    Args:
+        file_name: Excel文件路径
+        column_letter: 要检查的列号；多列组合键用逗号或加号分隔（如 'A,C'）
+        history_path: 历史索引文件（SQLite），不存在时自动创建
+        logger: 日志输出函数
+        sheet_name: 工作表名称，如果为None则处理所有工作表
+        update_history: 比对后把当前文件记入历史
+
+    Returns:
+        Dict with keys: 'sheets_processed', 'cells_highlighted', 'keys_indexed', 'history_sources'
+    """
+    from excel_toolkit.key_history import KeyHistory
+
+    col_indexes = parse_key_columns(column_letter)
+    logger(f"准备加载文件: {os.path.basename(file_name)}")
+    wb = _open_workbook(file_name)
     try:
-        wb.save(file_name)
-        wb.close()
+        if sheet_name:
+            if sheet_name not in wb.sheetnames:
+                raise ValueError(f"工作表 '{sheet_name}' 不存在")
+            sheets = [wb[sheet_name]]
+        else:
+            sheets = [ws for ws in wb.worksheets if ws.max_row > 1]
+
+        with KeyHistory(history_path) as history:
+            history_sources = len(history.sources())
+            logger(f"历史索引: {history_sources} 个工作表，{history.key_count()} 个键")
+            sheet_cells = {}
+            staged = []
+            examples = 0
+            for ws in sheets:
+                logger(f"  > 正在比对工作表: {ws.title}")
+                table = history.stage(wb.iter_sheet_columns(ws.title, col_indexes, min_row=2))
+                staged.append((ws.title, table))
+                rows = []
+                for row_number, key, path, sheet, source_row in history.matches(table, (file_name, ws.title)):
+                    rows.append(row_number)
+                    if examples < 20:
+                        logger(f"    - 第 {row_number} 行 {key.replace(chr(31), ' + ')}：已出现在 "
+                               f"{os.path.basename(path)} [{sheet}] 第 {source_row} 行")
+                        examples += 1
+                    elif examples == 20:
+                        logger("    ... 其余略")
+                        examples += 1
+                sheet_cells[ws.title] = ws.fill_rows(rows, col_indexes, HISTORY_HIGHLIGHT)
+
+            total_cells_highlighted = sum(sheet_cells.values())
+            if total_cells_highlighted:
+                try:
+                    wb.save(logger=logger)
+                except PermissionError:
+                    raise PermissionError(f"无法保存文件 '{file_name}'。请检查文件是否已在 Excel/WPS 中打开。")
+                except Exception as e:
+                    raise Exception(f"保存文件时发生未知错误: {e}")
+
+            keys_indexed = 0
+            for title, table in staged:
+                if update_history:
+                    keys_indexed += history.commit(table, file_name, title, column_letter)
+                history.drop(table)
+            if update_history:
+                logger(f"已把 {keys_indexed} 个键记入历史索引")
+
         return {
-            'sheets_processed': total_sheets_processed,
-            'cells_highlighted': total_cells_highlighted
+            'sheets_processed': sum(1 for count in sheet_cells.values() if count),
+            'cells_highlighted': total_cells_highlighted,
+            'keys_indexed': keys_indexed,
+            'history_sources': history_sources
         }
-    except PermissionError:
-        raise PermissionError(f"无法保存文件 '{file_name}'。请检查文件是否已在 Excel/WPS 中打开。")
-    except Exception as e:
-        raise Exception(f"保存文件时发生未知错误: {e}")
\ No newline at end of file
+    finally:
+        wb.close()
+
+
+def _highlight_each(targets, col_indexes: List[int], logger) -> tuple:
+    """每个工作表单独判断：一遍读取建索引后直接标记重复行"""
+    sheet_cells = {}
+    duplicate_keys = 0
+    for file_no, ws in targets:
+        logger(f"  > 正在处理工作表: {ws.title}")
+        index = ws.build_index(col_indexes)
+        count = 0
+        for group_no, (_, rows) in enumerate(index.duplicates()):
+            count += ws.fill_rows(rows, col_indexes, _HIGHLIGHT_COLORS[group_no % 2])
+            duplicate_keys += 1
+        sheet_cells[(file_no, ws.title)] = count
+    return sheet_cells, duplicate_keys
+
+
+def _highlight_across(targets, col_indexes: List[int], logger) -> tuple:
+    """多个工作表合在一起判断：第一遍只统计各键的出现次数，第二遍再按工作表标记"""
+    counts: Dict[object, int] = {}
+    for file_no, ws in targets:
+        logger(f"  > 正在统计工作表: {ws.title}")
+        for key, rows in ws.build_index(col_indexes).items():
+            counts[key] = counts.get(key, 0) + len(rows)
+
+    # 重复组按首次出现的顺序交替着色
+    key_colors = {}
+    for key, count in counts.items():
+        if count > 1:
+            key_colors[key] = _HIGHLIGHT_COLORS[len(key_colors) % 2]
+    del counts
+    logger(f"  > 共发现 {len(key_colors)} 组重复值")
+
+    sheet_cells = {}
+    for file_no, ws in targets:
+        count = 0
+        if key_colors:
+            logger(f"  > 正在标记工作表: {ws.title}")
+            for key, rows in ws.build_index(col_indexes).items():
+                color = key_colors.get(key)
+                if color is not None:
+                    count += ws.fill_rows(rows, col_indexes, color)
+        sheet_cells[(file_no, ws.title)] = count
+    return sheet_cells, len(key_colors)
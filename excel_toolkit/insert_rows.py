@@ -1,16 +1,9 @@
-from excel_toolkit.excel_lite import ExcelReader, ExcelWriter
+from excel_toolkit.excel_lite import ExcelReader
 import os
-from typing import Dict, Callable, Optional
+from typing import Dict, Callable
 
-# 导入openpyxl用于写入Excel文件
-try:
-    import openpyxl
-    from openpyxl.styles import PatternFill
-    _OPENPYXL_AVAILABLE = True
-except ImportError:
-    _OPENPYXL_AVAILABLE = False
-    openpyxl = None
-    PatternFill = None
+# 插入行的填充色（蓝色）
+INSERT_HIGHLIGHT = "FF00B0F0"
 
 
 def _check_file_locked(file_path: str) -> bool:
@@ -37,17 +30,15 @@ def process_insert_rows(
     """
     对比两个表格，将X中有但Y中没有的行插入到Y中。
     
+    缺失的行插在Y中同一商品号的最后一行之后；所有插入点先算好，再一遍流式重写表格Y，
+    耗时与表格Y的大小成正比，与插入的行数无关。
+    
     Returns:
         Dict with keys: 'inserted_rows', 'missing_count'
         
     Raises:
         FileNotFoundError, PermissionError, Exception
     """
-    if not _OPENPYXL_AVAILABLE:
-        raise ImportError("需要openpyxl库来处理Excel文件，请安装: pip install openpyxl")
-    
-    blue_fill = PatternFill(start_color="FF00B0F0", end_color="FF00B0F0", fill_type="solid")
-    
     if not os.path.exists(file_x_path):
         raise FileNotFoundError(f"表格X未找到: {file_x_path}")
     if not os.path.exists(file_y_path):
@@ -68,27 +59,18 @@ def process_insert_rows(
         ws_X = wb_X[sheet_x_name]
         logger(f"从表格X的 '{sheet_x_name}' 子表中读取数据...")
         
-        x_pairs = set()
-        # iter_rows with values_only=True is faster
-        for row in ws_X.iter_rows(min_row=2, min_col=1, max_col=2, values_only=True):
-            pid_raw = row[0]
-            iid_raw = row[1]
-            if pid_raw is None or pid_raw == "":
-                continue
-            if iid_raw is None or iid_raw == "":
-                continue
-            x_pairs.add((str(pid_raw), str(iid_raw)))
-            
+        # 商品号+ID 组合键，任一为空的行不计入
+        x_index = ws_X.build_index([1, 2])
         wb_X.close()
-        logger(f"从表格X中读取了 {len(x_pairs)} 个唯一的“商品号-ID”组合。")
+        logger(f"从表格X中读取了 {len(x_index)} 个唯一的“商品号-ID”组合。")
         
     except Exception as e:
         raise Exception(f"读取表格X失败: {e}")
 
-    # 2. 读取表格Y (目标) - 需要写入，使用openpyxl
+    # 2. 读取表格Y (目标) - 只读取前两列建立索引，插入时流式重写
     try:
         logger(f"正在加载表格Y (目标): {file_y_path}...")
-        wb_Y = openpyxl.load_workbook(file_y_path)
+        wb_Y = ExcelReader(file_y_path)
         if sheet_y_name not in wb_Y.sheetnames:
              wb_Y.close()
              raise ValueError(f"表格Y中未找到子表: '{sheet_y_name}'")
@@ -96,71 +78,44 @@ def process_insert_rows(
         ws_Y = wb_Y[sheet_y_name]
         logger(f"从表格Y的 '{sheet_y_name}' 子表中读取数据...")
         
-        y_pairs = set()
-        last_row_map = {}
+        y_index = ws_Y.build_index([1, 2])
         
-        # 这里不能用 values_only=True 因为我们需要 row index
-        # 但是我们可以优化：只读取前两列
-        for r in range(2, ws_Y.max_row + 1):
-            pid_raw = ws_Y.cell(row=r, column=1).value
-            iid_raw = ws_Y.cell(row=r, column=2).value
-            
-            if pid_raw is None or pid_raw == "":
-                continue
-            if iid_raw is None or iid_raw == "":
-                continue
-                
-            pid = str(pid_raw)
-            iid = str(iid_raw)
-            y_pairs.add((pid, iid))
-            last_row_map[pid] = r
+        # 每个商品号在Y中的最后一行
+        last_row_map = {}
+        for (pid, iid), rows in y_index.items():
+            if rows[-1] > last_row_map.get(pid, 0):
+                last_row_map[pid] = rows[-1]
             
-        logger(f"从表格Y中读取了 {len(y_pairs)} 个“商品号-ID”组合。")
+        logger(f"从表格Y中读取了 {len(y_index)} 个“商品号-ID”组合。")
 
-        missing_pairs = x_pairs - y_pairs
+        # 按X中的出现顺序
+        missing_pairs = x_index.difference(y_index)
         if not missing_pairs:
             wb_Y.close()
             return {'inserted_rows': 0, 'missing_count': 0}
             
         logger(f"找到了 {len(missing_pairs)} 个缺失的行。")
 
-        missing_grouped = {}
+        # {插入在其后的行号: [新行, ...]}，同一商品号的缺失行保持X中的顺序
+        insertions = {}
+        skipped = set()
         for pair in missing_pairs:
             pid = pair[0]
-            if pid not in missing_grouped:
-                missing_grouped[pid] = []
-            missing_grouped[pid].append(pair)
-
-        def get_row_key(pid): return last_row_map.get(pid, 0)
-        sorted_pids_to_insert = sorted(missing_grouped.keys(), key=get_row_key, reverse=True)
-
-        logger("开始在表格Y中插入行...")
-        total_inserted = 0
-        
-        for pid in sorted_pids_to_insert:
             insertion_row = last_row_map.get(pid)
             if not insertion_row:
-                logger(f"警告：商品号 '{pid}' 在表格Y中不存在，无法为其插入新行。")
+                if pid not in skipped:
+                    skipped.add(pid)
+                    logger(f"警告：商品号 '{pid}' 在表格Y中不存在，无法为其插入新行。")
                 continue
-                
-            pairs_to_add = missing_grouped[pid]
-            # 倒序插入，保持顺序
-            for pair in reversed(pairs_to_add):
-                ws_Y.insert_rows(insertion_row + 1)
-                c1 = ws_Y.cell(row=insertion_row + 1, column=1)
-                c2 = ws_Y.cell(row=insertion_row + 1, column=2)
-                c1.value = pair[0]
-                c2.value = pair[1]
-                c1.fill = blue_fill
-                c2.fill = blue_fill
-                total_inserted += 1
-                
+            insertions.setdefault(insertion_row, []).append(list(pair))
+
+        total_inserted = sum(len(rows) for rows in insertions.values())
         if total_inserted == 0:
             wb_Y.close()
             return {'inserted_rows': 0, 'missing_count': len(missing_pairs)}
 
-        wb_Y.save(file_y_path)
-        wb_Y.close()
+        logger(f"开始在表格Y中插入行（{len(insertions)} 个位置）...")
+        wb_Y.insert_rows(sheet_y_name, insertions, fill=INSERT_HIGHLIGHT)
         return {'inserted_rows': total_inserted, 'missing_count': len(missing_pairs)}
         
     except PermissionError:
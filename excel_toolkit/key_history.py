@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨文件的历史键索引
+把各个文件中某一列（或组合列）的键持久化到本地 SQLite 文件，新文件只需与索引做一次
+批量连接查询，就能找出在以往任何文件中出现过的订单号、跟踪号等，不必把历史文件合并
+到一个工作簿里重新比对。每加入一个文件只写入该文件自己的键，耗时与该文件大小成正比。
+
+    with KeyHistory(DEFAULT_HISTORY_PATH) as history:
+        staged = history.stage(reader.iter_sheet_columns('Sheet1', [1], min_row=2))
+        for row, key, source_path, source_sheet, source_row in history.matches(staged, exclude=(path, 'Sheet1')):
+            ...
+        history.commit(staged, path, 'Sheet1', 'A')
+
+表结构：
+    sources  (id, path, sheet, columns, rows, indexed_at)   每个已索引的 文件+工作表
+    keys     (h, source, row) WITHOUT ROWID，主键 (h, source)
+             h 为规范化键的 blake2b 前 8 字节（有符号64位整数），按哈希前缀聚簇；
+             只存哈希不存原文，索引体积与键长度无关，误判概率约为 键数²/2⁶⁵，可忽略
+"""
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+# 默认的历史索引文件（与配置目录 ~/.excel_toolkit 同级）
+DEFAULT_HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".excel_toolkit", "history", "keys.sqlite")
+
+# executemany 每批写入的行数
+_BATCH_SIZE = 50000
+
+# 组合键各列之间的分隔符
+_KEY_SEPARATOR = '\x1f'
+
+_SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS sources (
+        id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL,
+        sheet TEXT NOT NULL,
+        columns TEXT NOT NULL,
+        rows INTEGER NOT NULL DEFAULT 0,
+        indexed_at TEXT NOT NULL,
+        UNIQUE (path, sheet)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS keys (
+        h INTEGER NOT NULL,
+        source INTEGER NOT NULL,
+        row INTEGER NOT NULL,
+        PRIMARY KEY (h, source)
+    ) WITHOUT ROWID''',
+)
+
+
+def history_key(values: Sequence[Any]) -> Optional[str]:
+    """一行的键列值 -> 规范化的键文本（去掉首尾空白；任一列为空时返回 None，不参与比对）"""
+    parts = []
+    for value in values:
+        if value is None:
+            return None
+        if isinstance(value, float) and value.is_integer():
+            # 数字单元格里的单号：12345.0 与文本 '12345' 视为同一个键
+            value = int(value)
+        text = str(value).strip()
+        if not text:
+            return None
+        parts.append(text)
+    return _KEY_SEPARATOR.join(parts)
+
+
+def key_hash(key: str) -> int:
+    """键文本 -> 64位哈希前缀（SQLite INTEGER 范围内的有符号整数）"""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+
+def _source_path(path: str) -> str:
+    """索引中记录的文件路径：绝对路径，Windows 下不区分大小写"""
+    return os.path.normcase(os.path.abspath(path))
+
+
+class KeyHistory:
+    """持久化的键 -> 来源文件 索引"""
+
+    def __init__(self, db_path: str = DEFAULT_HISTORY_PATH, cache_mb: int = 64):
+        """
+        Args:
+            db_path: 索引文件路径，不存在时自动创建
+            cache_mb: SQLite 页缓存大小（MB）
+        """
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        # 持久化数据：WAL 日志 + NORMAL 同步，批量写入快且断电时不损坏
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA temp_store=MEMORY')
+        self.conn.execute(f'PRAGMA cache_size={-int(cache_mb) * 1024}')
+        with self.conn:
+            for statement in _SCHEMA:
+                self.conn.execute(statement)
+        self._staged = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """关闭连接"""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def sources(self) -> List[Dict[str, Any]]:
+        """已索引的来源（按加入顺序）"""
+        cursor = self.conn.execute('SELECT id, path, sheet, columns, rows, indexed_at FROM sources ORDER BY id')
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor]
+
+    def key_count(self) -> int:
+        """索引中的键数（同一个键出现在多个来源时分别计数）"""
+        return self.conn.execute('SELECT COUNT(*) FROM keys').fetchone()[0]
+
+    def _source_id(self, path: str, sheet: str) -> Optional[int]:
+        row = self.conn.execute('SELECT id FROM sources WHERE path = ? AND sheet = ?',
+                                (_source_path(path), sheet)).fetchone()
+        return row[0] if row else None
+
+    def stage(self, numbered_rows: Iterable[Tuple[int, Sequence[Any]]]) -> str:
+        """把一个工作表的键导入临时表，返回临时表名（供 matches()/commit() 使用）
+
+        Args:
+            numbered_rows: (行号, [键列的值]) 序列，如 ExcelReader.iter_sheet_columns() 的结果；
+                分批消费，不会整体读入内存
+        """
+        self._staged += 1
+        table = f'staged_{self._staged}'
+        self.conn.execute(f'CREATE TEMP TABLE {table} (h INTEGER NOT NULL, row INTEGER NOT NULL, key TEXT NOT NULL)')
+        insert = f'INSERT INTO temp.{table} VALUES (?, ?, ?)'
+
+        batch = []
+        with self.conn:
+            for row_number, values in numbered_rows:
+                key = history_key(values)
+                if key is None:
+                    continue
+                batch.append((key_hash(key), row_number, key))
+                if len(batch) >= _BATCH_SIZE:
+                    self.conn.executemany(insert, batch)
+                    batch = []
+            if batch:
+                self.conn.executemany(insert, batch)
+        self.conn.execute(f'CREATE INDEX temp.ix_{table} ON {table} (h)')
+        return table
+
+    def staged_count(self, table: str) -> int:
+        """临时表中的键数"""
+        return self.conn.execute(f'SELECT COUNT(*) FROM temp.{table}').fetchone()[0]
+
+    def matches(self, table: str, exclude: Optional[Tuple[str, str]] = None
+                ) -> Iterator[Tuple[int, str, str, str, int]]:
+        """一次连接查询找出临时表中已在历史里出现过的行（按行号排序）
+
+        Args:
+            table: stage() 返回的临时表名
+            exclude: 不参与比对的来源 (文件路径, 工作表)，通常是当前文件自己（重复运行时）
+
+        Yields:
+            (行号, 键, 最早来源的文件路径, 工作表, 该来源中的行号)
+        """
+        exclude_id = self._source_id(*exclude) if exclude else None
+        cursor = self.conn.execute(
+            f'''SELECT n.row, n.key, s.path, s.sheet, k.row
+                FROM temp.{table} n
+                JOIN keys k ON k.h = n.h AND k.source = (
+                    SELECT MIN(source) FROM keys WHERE h = n.h AND source IS NOT ?)
+                JOIN sources s ON s.id = k.source
+                ORDER BY n.row''',
+            (exclude_id,))
+        try:
+            while True:
+                batch = cursor.fetchmany(_BATCH_SIZE)
+                if not batch:
+                    return
+                yield from batch
+        finally:
+            cursor.close()
+
+    def commit(self, table: str, path: str, sheet: str, columns: str = '') -> int:
+        """把临时表中的键记入历史（同一 文件+工作表 再次加入时替换其旧键），返回记入的键数"""
+        path = _source_path(path)
+        with self.conn:
+            source_id = self._source_id(path, sheet)
+            if source_id is not None:
+                self.conn.execute('DELETE FROM keys WHERE source = ?', (source_id,))
+            count = self.conn.execute(f'SELECT COUNT(DISTINCT h) FROM temp.{table}').fetchone()[0]
+            indexed_at = time.strftime('%Y-%m-%d %H:%M:%S')
+            if source_id is None:
+                source_id = self.conn.execute(
+                    'INSERT INTO sources (path, sheet, columns, rows, indexed_at) VALUES (?, ?, ?, ?, ?)',
+                    (path, sheet, columns, count, indexed_at)).lastrowid
+            else:
+                self.conn.execute('UPDATE sources SET columns = ?, rows = ?, indexed_at = ? WHERE id = ?',
+                                  (columns, count, indexed_at, source_id))
+            # 同一文件内重复的键只记第一次出现的行；按哈希排序写入，B 树按顺序追加页
+            self.conn.execute(
+                f'INSERT OR IGNORE INTO keys (h, source, row) '
+                f'SELECT h, ?, MIN(row) FROM temp.{table} GROUP BY h ORDER BY h',
+                (source_id,))
+        return count
+
+    def drop(self, table: str):
+        """删除临时表"""
+        self.conn.execute(f'DROP TABLE IF EXISTS temp.{table}')
+
+    def remove(self, path: str, sheet: Optional[str] = None) -> int:
+        """从历史中移除某个文件（或其中一个工作表）的键，返回移除的来源数"""
+        path = _source_path(path)
+        if sheet is None:
+            ids = [row[0] for row in self.conn.execute('SELECT id FROM sources WHERE path = ?', (path,))]
+        else:
+            source_id = self._source_id(path, sheet)
+            ids = [source_id] if source_id is not None else []
+        with self.conn:
+            for source_id in ids:
+                self.conn.execute('DELETE FROM keys WHERE source = ?', (source_id,))
+                self.conn.execute('DELETE FROM sources WHERE id = ?', (source_id,))
+        return len(ids)
@@ -693,50 +693,26 @@ def load_sku_full_name_map_from_excel(
         raise FileNotFoundError(f"SKU映射Excel不存在: {excel_path}")
 
     try:
-        from excel_toolkit.excel_lite import ExcelReader, ExcelWriter
-        from excel_toolkit.excel_lite import column_index_from_string
+        from excel_toolkit.excel_lite import ExcelReader
     except Exception as e:
         raise RuntimeError(f"读取SKU映射Excel需要 openpyxl: {e}")
 
-    def _resolve_col(headers, col_spec: Optional[str]) -> Optional[int]:
-        if not col_spec:
-            return None
-        spec = str(col_spec).strip()
-        if not spec:
-            return None
-        if spec.isalpha() and len(spec) <= 3:
-            try:
-                return column_index_from_string(spec.upper())
-            except Exception:
-                return None
-        if spec in headers:
-            return headers.index(spec) + 1
-        return None
-
     wb = ExcelReader(excel_path, read_only=True, data_only=True)
     try:
         ws = wb[sheet_name] if sheet_name and sheet_name in wb.sheetnames else wb.worksheets[0]
 
-        header_row = None
-        for row in ws.iter_rows(min_row=1, max_row=1, values_only=True):
-            header_row = list(row)
-            break
-        headers = [str(h).strip() if h is not None else "" for h in (header_row or [])]
-
-        col_short = _resolve_col(headers, sku_short_col)
-        col_full = _resolve_col(headers, sku_full_col)
+        # 指定的列可以是表头名或列字母；未指定或无法定位时按常见表头名查找
+        header_index = ws.header_index()
+        col_short = header_index.resolve(sku_short_col)
+        col_full = header_index.resolve(sku_full_col)
 
         if col_short is None:
-            for key in ["SKU简称", "简称", "Short", "short", "sku_short", "SKU_SHORT", "SKU"]:
-                if key in headers:
-                    col_short = headers.index(key) + 1
-                    break
+            col_short = header_index.resolve(
+                ["SKU简称", "简称", "Short", "short", "sku_short", "SKU_SHORT", "SKU"], letters=False)
 
         if col_full is None:
-            for key in ["SKU全称", "全称", "Full", "full", "sku_full", "SKU_FULL", "商品名称", "品名", "名称"]:
-                if key in headers:
-                    col_full = headers.index(key) + 1
-                    break
+            col_full = header_index.resolve(
+                ["SKU全称", "全称", "Full", "full", "sku_full", "SKU_FULL", "商品名称", "品名", "名称"], letters=False)
 
         if col_short is None or col_full is None:
             raise ValueError(
@@ -2,6 +2,19 @@ from excel_toolkit.excel_lite import ExcelReader, ExcelWriter
 from excel_toolkit.excel_lite import column_index_from_string
 
 
+PREFIX_CARRIERS = {'9': 'usps', 'G': 'GOFO', 'U': 'UniUni'}
+
+
+def carrier_for_tracking(value):
+    """按运单号首字符识别承运商，无法识别时返回 None"""
+    if value is None or value == "":
+        return None
+    s = str(value).strip()
+    if not s:
+        return None
+    return PREFIX_CARRIERS.get(s[0].upper())
+
+
 def process_prefix_fill(file_name, src_col_letter, dst_col_letter, logger=print):
     try:
         wb = ExcelReader(file_name)
@@ -14,40 +27,20 @@ def process_prefix_fill(file_name, src_col_letter, dst_col_letter, logger=print)
     except Exception:
         wb.close(); return f"错误：列号无效。请检查源列 '{src_col_letter}' 与目标列 '{dst_col_letter}' 是否为有效Excel列号。"
 
-    total_sheets_processed = 0
-    total_cells_filled = 0
     logger(f"开始遍历所有工作表，读取 {src_col_letter} 列，根据前缀填充 {dst_col_letter} 列...")
+    sheet_names = []
     for ws in wb.worksheets:
         if ws.max_row <= 1:
             continue
         logger(f"  > 正在处理工作表: {ws.title}")
-        sheet_count = 0
-        for r in range(2, ws.max_row + 1):
-            src_val = ws.cell(row=r, column=src_idx).value
-            if src_val is None or src_val == "":
-                continue
-            s = str(src_val).strip()
-            if not s:
-                continue
-            first = s[0]
-            if first.isalpha():
-                first = first.upper()
-            if first == '9':
-                ws.cell(row=r, column=dst_idx).value = 'usps'
-                sheet_count += 1
-            elif first == 'G':
-                ws.cell(row=r, column=dst_idx).value = 'GOFO'
-                sheet_count += 1
-            elif first == 'U':
-                ws.cell(row=r, column=dst_idx).value = 'UniUni'
-                sheet_count += 1
-        if sheet_count > 0:
-            total_sheets_processed += 1
-            total_cells_filled += sheet_count
+        sheet_names.append(ws.title)
 
     try:
-        wb.save(file_name)
+        # 所有工作表在一遍流式重写中完成，内存占用与行数无关
+        counts = wb.transform_columns(sheet_names, src_idx, carrier_for_tracking, dst_column=dst_idx)
         wb.close()
+        total_sheets_processed = sum(1 for count in counts.values() if count > 0)
+        total_cells_filled = sum(counts.values())
         if total_sheets_processed > 0:
             return (
                 "前缀填充完成！\n\n"
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工作表解析结果的磁盘缓存
+按 (文件路径, 大小, 修改时间, 工作表名) 缓存解析后的列式数据，
+再次打开未修改的文件时直接 mmap 缓存文件，无需重新解析XML。
+
+缓存文件格式：
+    头部  b'XLC1' + <QQ>(目录偏移, 目录长度)
+    数据段 row_lengths、各列的数值数组/位图/字符串，按8字节对齐，可直接 mmap 后按类型读取
+    目录  pickle 的 {'width', 'rows', 'row_lengths', 'columns'}，记录每段的 (偏移, 长度)
+
+xlsx 工作表的行偏移索引单独缓存（.xri）：b'XRI1' + <Q>(行数) + 行号 array('I') + 偏移 array('Q')
+"""
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+from array import array
+from typing import Any, Dict, Optional, Tuple
+
+from excel_toolkit.excel_lite import _Column, _ColumnarSheetData, _RowIndex
+
+
+# 缓存目录（与配置目录 ~/.excel_toolkit 同级）
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".excel_toolkit", "cache")
+
+# 缓存目录总大小上限，超出时按最近使用时间淘汰
+DEFAULT_CACHE_SIZE = 512 << 20
+
+# 各工具是否使用磁盘缓存；默认关闭，由界面顶栏的“缓存”选项开启
+_enabled = False
+
+_MAGIC = b'XLC1'
+_HEADER = struct.Struct('<4sQQ')
+_CACHE_SUFFIX = '.xlc'
+
+_ROW_INDEX_MAGIC = b'XRI1'
+_ROW_INDEX_HEADER = struct.Struct('<4sQ')
+_ROW_INDEX_SUFFIX = '.xri'
+
+
+class _MappedStrings:
+    """mmap 中的字符串列：UTF-8 数据 + 偏移数组，下标访问时才解码"""
+
+    __slots__ = ('offsets', 'blob')
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx: int) -> str:
+        return str(self.blob[self.offsets[idx]:self.offsets[idx + 1]], 'utf-8', 'surrogatepass')
+
+
+def is_enabled() -> bool:
+    """各工具打开读取器时是否启用磁盘缓存（ExcelReader(..., cache=is_enabled())）"""
+    return _enabled
+
+
+def set_enabled(enabled: bool):
+    """开启/关闭各工具的磁盘缓存；关闭后不再写入新的缓存，已有缓存文件保留"""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def cache_path(file_path: str, sheet_name: str, suffix: str = _CACHE_SUFFIX) -> Optional[str]:
+    """计算缓存文件路径；源文件不存在时返回 None"""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    key = f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}|{sheet_name}"
+    return os.path.join(CACHE_DIR, hashlib.sha1(key.encode('utf-8')).hexdigest() + suffix)
+
+
+def load_sheet(file_path: str, sheet_name: str) -> Optional[_ColumnarSheetData]:
+    """读取缓存；未命中或缓存损坏时返回 None"""
+    path = cache_path(file_path, sheet_name)
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, directory_offset, directory_size = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC:
+            return None
+        directory = pickle.loads(buffer[directory_offset:directory_offset + directory_size])
+        view = memoryview(buffer)
+        data = _ColumnarSheetData()
+        data.width = directory['width']
+        data.row_lengths = _segment(view, directory['row_lengths'], 'I')
+        data.columns = [_load_column(view, entry) for entry in directory['columns']]
+        # 更新修改时间，作为LRU淘汰依据
+        os.utime(path)
+        return data
+    except Exception:
+        return None
+
+
+def store_sheet(file_path: str, sheet_name: str, data: _ColumnarSheetData,
+                max_size: int = DEFAULT_CACHE_SIZE):
+    """写入缓存（失败时静默跳过），随后按大小上限淘汰旧缓存"""
+    path = cache_path(file_path, sheet_name)
+    if path is None:
+        return
+    _write_atomic(path, lambda f: _write_sheet(f, data))
+    evict(max_size)
+
+
+def load_row_index(file_path: str, sheet_name: str) -> Optional[_RowIndex]:
+    """读取行偏移索引缓存；未命中或损坏时返回 None"""
+    path = cache_path(file_path, sheet_name, _ROW_INDEX_SUFFIX)
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            magic, count = _ROW_INDEX_HEADER.unpack(f.read(_ROW_INDEX_HEADER.size))
+            if magic != _ROW_INDEX_MAGIC:
+                return None
+            index = _RowIndex()
+            index.rows.fromfile(f, count)
+            index.offsets.fromfile(f, count)
+        os.utime(path)
+        return index
+    except Exception:
+        return None
+
+
+def store_row_index(file_path: str, sheet_name: str, index: _RowIndex):
+    """写入行偏移索引缓存（失败时静默跳过）"""
+    path = cache_path(file_path, sheet_name, _ROW_INDEX_SUFFIX)
+    if path is None:
+        return
+
+    def write(f):
+        f.write(_ROW_INDEX_HEADER.pack(_ROW_INDEX_MAGIC, len(index.rows)))
+        index.rows.tofile(f)
+        index.offsets.tofile(f)
+
+    _write_atomic(path, write)
+
+
+def _write_atomic(path: str, write):
+    """先写临时文件再替换，避免其他进程读到写了一半的缓存"""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=CACHE_DIR)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    except Exception:
+        return
+
+
+def evict(max_size: int = DEFAULT_CACHE_SIZE):
+    """缓存目录超过 max_size 时，按最近使用时间从旧到新删除"""
+    try:
+        entries = []
+        for entry in os.scandir(CACHE_DIR):
+            if entry.name.endswith((_CACHE_SUFFIX, _ROW_INDEX_SUFFIX)):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except OSError:
+        return
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_size:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            # 其他进程正在使用（Windows 下已映射的文件无法删除），跳过
+            pass
+
+
+def clear_cache():
+    """清空缓存目录"""
+    evict(0)
+
+
+def _segment(view: memoryview, location: Optional[Tuple[int, int]], type_code: str = 'B'):
+    if location is None:
+        return None
+    offset, size = location
+    segment = view[offset:offset + size]
+    return segment.cast(type_code) if type_code != 'B' else segment
+
+
+def _load_column(view: memoryview, entry: Dict[str, Any]) -> _Column:
+    column = _Column.__new__(_Column)
+    column.kind = entry['kind']
+    column.size = entry['size']
+    column.nulls = _segment(view, entry['nulls'])
+    column.ints = _segment(view, entry['ints'])
+    column.exceptions = entry['exceptions']
+    kind = column.kind
+    if kind in ('q', 'd'):
+        column.values = _segment(view, entry['values'], kind)
+    elif kind == 's':
+        column.values = _MappedStrings(_segment(view, entry['offsets'], 'Q'), _segment(view, entry['values']))
+    else:
+        column.values = entry['objects']
+    return column
+
+
+def _write_sheet(f, data: _ColumnarSheetData):
+    f.write(_HEADER.pack(_MAGIC, 0, 0))
+
+    def write_segment(payload: bytes) -> Tuple[int, int]:
+        offset = f.tell()
+        f.write(payload)
+        padding = -f.tell() % 8
+        if padding:
+            f.write(b'\0' * padding)
+        return offset, len(payload)
+
+    columns = []
+    row_lengths = write_segment(array('I', data.row_lengths).tobytes())
+    for column in data.columns:
+        entry = {
+            'kind': column.kind,
+            'size': column.size,
+            'nulls': write_segment(bytes(column.nulls)),
+            'ints': write_segment(bytes(column.ints)) if column.ints is not None else None,
+            'exceptions': dict(column.exceptions),
+            'values': None,
+            'offsets': None,
+            'objects': None,
+        }
+        if column.kind in ('q', 'd'):
+            entry['values'] = write_segment(array(column.kind, column.values).tobytes())
+        elif column.kind == 's':
+            encoded = [value.encode('utf-8', 'surrogatepass') for value in column.values]
+            offsets = array('Q', [0])
+            position = 0
+            for item in encoded:
+                position += len(item)
+                offsets.append(position)
+            entry['offsets'] = write_segment(offsets.tobytes())
+            entry['values'] = write_segment(b''.join(encoded))
+        elif column.kind == 'o':
+            entry['objects'] = list(column.values)
+        columns.append(entry)
+
+    directory = pickle.dumps({'width': data.width, 'rows': len(data.row_lengths),
+                              'row_lengths': row_lengths, 'columns': columns},
+                             protocol=pickle.HIGHEST_PROTOCOL)
+    directory_offset = f.tell()
+    f.write(directory)
+    f.seek(0)
+    f.write(_HEADER.pack(_MAGIC, directory_offset, len(directory)))
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工作表 SQL 查询模块
+把工作表中选定的列批量导入 SQLite（内存或临时文件），在键列上建索引后用SQL做
+连接、差集、计数等查询，结果以游标分批流式返回，大表也不必在 Python 中构建嵌套字典。
+
+    with SheetQuery(temp_file=True) as q:
+        q.load_sheet('orders', ws_orders, {'sku': 'SKU', 'qty': '数量'}, index=['sku'])
+        q.load_sheet('skus', ws_db, {'sku': 'SKU', 'wt': '单件重量'}, index=['sku'])
+        for row_number, qty, wt in q.query(
+                'SELECT o._row, o.qty, s.wt FROM orders o JOIN skus s ON s.sku = o.sku'):
+            ...
+"""
+import os
+import sqlite3
+import tempfile
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from excel_toolkit.excel_lite import ExcelLiteError
+
+
+# executemany 每批插入的行数
+_BATCH_SIZE = 50000
+
+# query() 每次从游标取出的行数
+_FETCH_SIZE = 10000
+
+# 导入工作表时记录原行号的列名
+ROW_COLUMN = '_row'
+
+
+def _quote(name: str) -> str:
+    """SQL 标识符加引号"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def text_key(value: Any) -> Optional[str]:
+    """常用的键规范化：转文本并去掉首尾空白，空值返回 None（不参与连接）"""
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def _empty_to_none(value: Any) -> Any:
+    """空单元格存为 NULL"""
+    return None if value == '' else value
+
+
+class SheetQuery:
+    """基于 SQLite 的工作表查询引擎"""
+
+    def __init__(self, temp_file: bool = False, cache_mb: int = 64):
+        """
+        Args:
+            temp_file: 为 True 时数据库放在临时文件中（关闭时删除），内存占用只取决于页缓存；
+                默认放在内存中
+            cache_mb: SQLite 页缓存大小（MB）
+        """
+        self._temp_path = None
+        if temp_file:
+            fd, self._temp_path = tempfile.mkstemp(suffix='.sqlite')
+            os.close(fd)
+        self.conn = sqlite3.connect(self._temp_path or ':memory:')
+        # 只是一次性的中间结果：不需要日志与落盘同步
+        self.conn.execute('PRAGMA journal_mode=OFF')
+        self.conn.execute('PRAGMA synchronous=OFF')
+        self.conn.execute('PRAGMA temp_store=MEMORY')
+        self.conn.execute(f'PRAGMA cache_size={-int(cache_mb) * 1024}')
+        self._tables: Dict[str, List[str]] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """关闭连接并删除临时文件"""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if self._temp_path and os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+        self._temp_path = None
+
+    def load_rows(self, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]],
+                  index: Optional[Sequence[Union[str, Sequence[str]]]] = None) -> int:
+        """批量导入行（表不存在时先建表，已存在时追加），返回导入的行数
+
+        Args:
+            table: 表名
+            columns: 列名
+            rows: 行的可迭代对象，每行的值与 columns 一一对应；按批次消费，不会整体读入内存
+            index: 要建索引的列；每一项为列名或组合索引的列名序列
+        """
+        columns = list(columns)
+        existing = self._tables.get(table)
+        if existing is None:
+            # 不声明列类型：SQLite 按值原样保存（数字仍是数字，文本仍是文本）
+            self.conn.execute(f'CREATE TABLE {_quote(table)} ({", ".join(_quote(c) for c in columns)})')
+        elif existing != columns:
+            raise ExcelLiteError(f"表 '{table}' 的列与已导入的数据不一致")
+        insert = f'INSERT INTO {_quote(table)} VALUES ({", ".join("?" * len(columns))})'
+
+        count = 0
+        batch = []
+        with self.conn:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= _BATCH_SIZE:
+                    self.conn.executemany(insert, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self.conn.executemany(insert, batch)
+                count += len(batch)
+        self._tables[table] = columns
+
+        # 导入完成后再建索引，比边插入边维护索引快
+        for key in index or []:
+            self.create_index(table, [key] if isinstance(key, str) else key)
+        return count
+
+    def load_sheet(self, table: str, ws, columns: Union[Dict[str, Any], Sequence[Any]],
+                   min_row: int = 2, header_row: int = 1,
+                   key: Optional[Callable[[Any], Any]] = None,
+                   index: Optional[Sequence[Union[str, Sequence[str]]]] = None,
+                   skip_empty: bool = True) -> int:
+        """把工作表中选定的列导入为表，另加 _row 列记录原行号，返回导入的行数
+
+        Args:
+            table: 表名
+            ws: ExcelWorksheet
+            columns: {表列名: 工作表列}，或工作表列的列表（表列名与之相同）；
+                工作表列可以是表头名、列字母或列号，按 header_index().resolve() 解析
+            min_row: 数据起始行
+            header_row: 表头所在行（按表头名定位列时使用）
+            key: 对每个值做的规范化（如 text_key），默认保持原值
+            index: 要建索引的列（表列名）
+            skip_empty: 跳过所选列全部为空的行
+        """
+        if not isinstance(columns, dict):
+            columns = {str(spec): spec for spec in columns}
+        header_index = ws.header_index(header_row)
+        positions = []
+        for name, spec in columns.items():
+            col = header_index.resolve(spec)
+            if col is None:
+                raise ExcelLiteError(f"工作表 '{ws.title}' 中找不到列: {spec}")
+            positions.append(col)
+
+        # 只流式读取覆盖所选列的范围
+        min_col = min(positions)
+        max_col = max(positions)
+        offsets = [col - min_col for col in positions]
+
+        normalize = key or _empty_to_none
+
+        def rows():
+            values_iter = ws.iter_rows(min_row=min_row, min_col=min_col, max_col=max_col, values_only=True)
+            if len(offsets) == 1:
+                # 单列（最常见的键列）走简化路径
+                offset = offsets[0]
+                for row_number, values in enumerate(values_iter, start=min_row):
+                    value = normalize(values[offset])
+                    if value is None and skip_empty:
+                        continue
+                    yield row_number, value
+                return
+            for row_number, values in enumerate(values_iter, start=min_row):
+                picked = [normalize(values[offset]) for offset in offsets]
+                if skip_empty and all(value is None for value in picked):
+                    continue
+                yield (row_number, *picked)
+
+        return self.load_rows(table, [ROW_COLUMN, *columns], rows(), index)
+
+    def create_index(self, table: str, columns: Sequence[str], unique: bool = False):
+        """在表的列上建索引"""
+        name = _quote(f'ix_{table}_{"_".join(columns)}')
+        self.conn.execute(f'CREATE {"UNIQUE " if unique else ""}INDEX IF NOT EXISTS {name} '
+                          f'ON {_quote(table)} ({", ".join(_quote(c) for c in columns)})')
+
+    def execute(self, sql: str, params: Sequence[Any] = ()):
+        """执行不返回结果的语句（建中间表、更新等）"""
+        with self.conn:
+            self.conn.execute(sql, params)
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> Iterator[Tuple[Any, ...]]:
+        """执行查询并分批流式产出结果行"""
+        cursor = self.conn.execute(sql, params)
+        try:
+            while True:
+                batch = cursor.fetchmany(_FETCH_SIZE)
+                if not batch:
+                    return
+                yield from batch
+        finally:
+            cursor.close()
+
+    def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[Tuple[Any, ...]]:
+        """执行查询并返回第一行（没有结果时返回 None）"""
+        cursor = self.conn.execute(sql, params)
+        try:
+            return cursor.fetchone()
+        finally:
+            cursor.close()
+
+    def scalar(self, sql: str, params: Sequence[Any] = ()) -> Any:
+        """执行查询并返回第一行第一列（没有结果时返回 None）"""
+        row = self.fetchone(sql, params)
+        return row[0] if row else None
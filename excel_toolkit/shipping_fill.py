@@ -6,8 +6,9 @@
 """
 import os
 from typing import Callable, Optional, List, Dict, Any
-from excel_toolkit.excel_lite import ExcelReader
+from excel_toolkit.excel_lite import ExcelReader, HeaderIndex
 from excel_toolkit.excel_lite import get_column_letter
+from excel_toolkit import sheet_cache
 
 # 导入openpyxl用于写入Excel文件
 try:
@@ -254,7 +255,7 @@ def load_config_mapping(config_file: str, mapping_choice: str = "映射1", logge
     if not os.path.exists(config_file):
         raise FileNotFoundError(f"配置文件不存在: {config_file}")
     
-    wb = ExcelReader(config_file, read_only=True, data_only=True)
+    wb = ExcelReader(config_file, read_only=True, data_only=True, cache=sheet_cache.is_enabled())
     sheet_names = wb.sheetnames
     
     if not sheet_names:
@@ -534,7 +535,7 @@ def check_template_has_data(template_file: str, template_sheet_name: str) -> Dic
     Returns:
         {
             "has_data": bool,  # 是否有数据
-            "data_rows": int,  # 数据行数（不含表头）
+            "data_rows": int,  # 表头之后到最后一行数据的行数（中间的空行也计入）
             "last_row": int    # 最后一行的行号
         }
     """
@@ -545,64 +546,24 @@ def check_template_has_data(template_file: str, template_sheet_name: str) -> Dic
     }
     
     try:
-        # 使用openpyxl来检测，因为它能更准确地读取xlsx文件
-        if _OPENPYXL_AVAILABLE:
-            wb = openpyxl.load_workbook(template_file, read_only=True, data_only=True)
+        wb = ExcelReader(template_file, read_only=True, data_only=True)
+        try:
             if template_sheet_name not in wb.sheetnames:
-                wb.close()
                 return result
             
             sheet = wb[template_sheet_name]
-            
-            # 从第2行开始检查（第1行是表头）
-            data_row_count = 0
-            last_data_row = 1
-            
-            for row_idx, row in enumerate(sheet.iter_rows(min_row=2, max_col=10), start=2):
-                # 检查该行是否有数据
-                has_data_in_row = False
-                for cell in row:
-                    if cell.value is not None and str(cell.value).strip():
-                        has_data_in_row = True
-                        break
-                
-                if has_data_in_row:
-                    data_row_count += 1
-                    last_data_row = row_idx
-            
-            wb.close()
-            
-            result["has_data"] = data_row_count > 0
-            result["data_rows"] = data_row_count
-            result["last_row"] = last_data_row
-        else:
-            # 回退到ExcelReader
-            wb = ExcelReader(template_file, read_only=True, data_only=True)
-            if template_sheet_name not in wb.sheetnames:
-                wb.close()
+            # 只有表头（或空表）时直接返回，不解析单元格数据
+            if sheet.max_row <= 1:
                 return result
             
-            sheet = wb[template_sheet_name]
-            
-            data_row_count = 0
-            last_data_row = 1
-            
-            for row_idx in range(2, sheet.max_row + 1):
-                has_data_in_row = False
-                for col_idx in range(1, min(11, sheet.max_column + 1)):
-                    cell_value = sheet.cell(row=row_idx, column=col_idx).value
-                    if cell_value is not None and str(cell_value).strip():
-                        has_data_in_row = True
-                        break
-                
-                if has_data_in_row:
-                    data_row_count += 1
-                    last_data_row = row_idx
-            
+            # 从末尾向前查找最后一个有数据的行，只看前10列
+            last_data_row = sheet.last_data_row(max_col=10)
+        finally:
             wb.close()
-            
-            result["has_data"] = data_row_count > 0
-            result["data_rows"] = data_row_count
+        
+        if last_data_row > 1:
+            result["has_data"] = True
+            result["data_rows"] = last_data_row - 1
             result["last_row"] = last_data_row
         
     except Exception:
@@ -682,19 +643,13 @@ def process_shipping_fill(
         template_sheet = template_wb[template_sheet_name]
     
         # 4. 构建订单表头映射 {列名: 列索引}
-        order_header_to_col = {}
-        for col_idx, cell in enumerate(order_sheet[1], start=1):
-            if cell.value:
-                order_header_to_col[str(cell.value).strip()] = col_idx
+        order_header_to_col = order_sheet.header_index()
         # 表格输出订单表头
-        header_rows = [[i+1, name] for i, name in enumerate(order_header_to_col.keys())]
+        header_rows = [[i+1, name] for i, name in enumerate(order_header_to_col.names())]
         logger(_format_table(["#", "订单列名"], header_rows, f"订单表头 ({len(order_header_to_col)}列)"))
         
         # 5. 构建模板表头映射 {列名: 列索引}
-        template_header_to_col = {}
-        for col_idx, cell in enumerate(template_sheet[1], start=1):
-            if cell.value:
-                template_header_to_col[str(cell.value).strip()] = col_idx
+        template_header_to_col = HeaderIndex([cell.value for cell in template_sheet[1]])
         logger(f"模板表头: {len(template_header_to_col)} 列")
         
         # 6. 找到关键列（智能查找，支持不同列名）
@@ -773,7 +728,7 @@ def process_shipping_fill(
             data_check = check_template_has_data(template_file, template_sheet_name)
             if data_check["has_data"]:
                 template_row = data_check["last_row"] + 1
-                logger(f"📋 追加模式: 检测到 {data_check['data_rows']} 行现有数据，从第 {template_row} 行开始填充")
+                logger(f"📋 追加模式: 现有数据到第 {data_check['last_row']} 行，从第 {template_row} 行开始填充")
             else:
                 template_row = 2
                 logger(f"📋 追加模式: 模板无数据，从第 2 行开始填充")
@@ -798,7 +753,7 @@ def process_shipping_fill(
             # 获取订单中的仓库值
             order_warehouse_value = None
             if warehouse_order_col:
-                cell_value = order_sheet.cell(row=order_row_idx, column=warehouse_order_col).value
+                cell_value = order_sheet.value(order_row_idx, warehouse_order_col)
                 if cell_value:
                     order_warehouse_value = str(cell_value).strip()
             
@@ -820,12 +775,12 @@ def process_shipping_fill(
                     continue
             
             # 检查是否为空行（跳过）
-            first_cell = order_sheet.cell(row=order_row_idx, column=1).value
+            first_cell = order_sheet.value(order_row_idx, 1)
             if first_cell is None:
                 # 检查整行是否都为空
                 all_empty = True
                 for col_idx in range(1, min(10, order_sheet.max_column + 1)):
-                    if order_sheet.cell(row=order_row_idx, column=col_idx).value:
+                    if order_sheet.value(order_row_idx, col_idx):
                         all_empty = False
                         break
                 if all_empty:
@@ -837,7 +792,7 @@ def process_shipping_fill(
                 template_col = template_header_to_col.get(template_col_name)
                 
                 if order_col and template_col:
-                    value = order_sheet.cell(row=order_row_idx, column=order_col).value
+                    value = order_sheet.value(order_row_idx, order_col)
                     
                     # 映射2空值默认填充：如果订单列为空且有默认值，则使用默认值
                     if (value is None or str(value).strip() == "") and order_col_name in default_values:
@@ -1,9 +1,11 @@
 from excel_toolkit.excel_lite import ExcelReader, ExcelWriter
-from excel_toolkit.excel_lite import column_index_from_string
+from excel_toolkit.excel_lite import HeaderIndex
+from excel_toolkit import sheet_cache
+from excel_toolkit.table import Table
 import os
 from typing import Dict, List, Optional, Tuple, Any, Callable
 
-# 导入openpyxl用于写入Excel文件
+# 导入openpyxl用于把.xls订单转换为可写的xlsx工作簿
 try:
     import openpyxl
     _OPENPYXL_AVAILABLE = True
@@ -65,6 +67,44 @@ def parse_sku_bundle(sku_string: Any, logger: Optional[Callable] = None) -> Opti
     return bundle
 
 
+def _order_qty(value: Any) -> float:
+    """订单数量：无法解析或不大于0时按1计"""
+    qty_val = 1
+    try:
+        if value:
+            qty_val = float(value)
+            if qty_val <= 0: qty_val = 1
+    except:
+        pass
+    return qty_val
+
+
+def _sku_dims(sku_val: Any, qty_val: float, sku_database: Dict[Any, Dict[str, float]],
+              logger: Optional[Callable] = None) -> Optional[Tuple[float, float, float, float]]:
+    """计算一行订单的 (长, 宽, 高, 重量)；SKU（或组合中的任一子SKU）未找到时返回 None"""
+    bundle_list = parse_sku_bundle(sku_val, logger)
+    
+    if bundle_list:
+        tot_vol = 0; tot_wt = 0
+        for sub_sku, sub_qty in bundle_list:
+            data = sku_database.get(sub_sku)
+            if not data:
+                return None  # 组合SKU错误
+            tot_vol += data["volume"] * sub_qty
+            tot_wt += data["weight"] * sub_qty
+        
+        final_h = tot_vol / 80 if tot_vol > 0 else 0
+        return 10, 8, final_h, tot_wt
+    
+    data = sku_database.get(sku_val)
+    if not data:
+        return None  # SKU未找到
+    new_h = data["height"] * qty_val
+    new_wt = data["weight"] * qty_val
+    final_l, final_w, final_h = sorted([data["length"], data["width"], new_h], reverse=True)
+    return final_l, final_w, final_h, new_wt
+
+
 def process_skus(
     file_name: str, 
     sku_db_file: str, 
@@ -103,11 +143,10 @@ def process_skus(
     file_ext = os.path.splitext(sku_db_file)[1].lower()
     sku_database = {}
     
-    if file_ext in ['.xlsx', '.xlsm']:
-        # 使用openpyxl读取新版Excel
+    if file_ext in ['.xlsx', '.xlsm', '.xls']:
         try:
             logger(f"正在加载SKU数据库: {sku_db_file}...")
-            db_wb = ExcelReader(sku_db_file, read_only=True, data_only=True)
+            db_wb = ExcelReader(sku_db_file, read_only=True, data_only=True, cache=sheet_cache.is_enabled())
         except Exception as e:
             raise Exception(f"加载SKU数据库失败: {e}")
         
@@ -123,24 +162,20 @@ def process_skus(
                 data_ws = db_wb.worksheets[0]
                 logger(f"未找到指定工作表，默认使用第一个工作表: '{data_ws.title}'")
                 
-            # 获取数据库表头映射到列索引
-            headers = []
-            for row in data_ws.iter_rows(min_row=1, max_row=1, values_only=True):
-                headers = list(row)
-                break
+            # 获取数据库表头映射到列索引（0基）
+            header_index = data_ws.header_index()
                 
-            if not headers:
+            if not header_index:
                  raise ValueError("SKU数据库似乎是空的（未找到表头）")
 
-            db_headers_idx = {}
+            db_cols = {}
             for key, header_name in db_col_map.items():
-                if header_name in headers:
-                    db_headers_idx[key] = headers.index(header_name)
-                else:
-                    pass
+                col = header_index.get(header_name)
+                if col is not None:
+                    db_cols[key] = col
 
             required_keys = ['sku', 'l', 'w', 'h', 'wt']
-            missing_keys = [k for k in required_keys if k not in db_headers_idx]
+            missing_keys = [k for k in required_keys if k not in db_cols]
             if missing_keys:
                 missing_names = [db_col_map.get(k, k) for k in missing_keys]
                 raise ValueError(f"SKU数据库缺少以下必需列: {', '.join(missing_names)}")
@@ -148,110 +183,19 @@ def process_skus(
             # 2. 构建SKU数据库（内存字典）
             logger("正在构建SKU数据库...")
             
-            idx_sku = db_headers_idx['sku']
-            idx_l = db_headers_idx['l']
-            idx_w = db_headers_idx['w']
-            idx_h = db_headers_idx['h']
-            idx_wt = db_headers_idx['wt']
-            
-            for row in data_ws.iter_rows(min_row=2, values_only=True):
-                try:
-                    sku_val = row[idx_sku]
-                    if not sku_val: continue
-                    
-                    def to_float(v):
-                        try: return float(v)
-                        except: return 0.0
-                    
-                    l = to_float(row[idx_l])
-                    w = to_float(row[idx_w])
-                    h = to_float(row[idx_h])
-                    wt = to_float(row[idx_wt])
-                    
-                    sku_database[sku_val] = {
-                        "length": l, "width": w, "height": h, "weight": wt,
-                        "volume": l * w * h
-                    }
-                except IndexError:
-                    continue
+            db = Table.from_sheet(data_ws, {key: db_cols[key] for key in required_keys}).filter('sku', bool)
+            for sku_val, l, w, h, wt in zip(db['sku'], db.numeric('l'), db.numeric('w'), db.numeric('h'),
+                                            db.numeric('wt')):
+                sku_database[sku_val] = {
+                    "length": l, "width": w, "height": h, "weight": wt,
+                    "volume": l * w * h
+                }
             
             logger(f"SKU数据库构建完成，共加载 {len(sku_database)} 个SKU。")
             
         finally:
             db_wb.close()
             
-    elif file_ext == '.xls':
-        # 使用xlrd读取旧版Excel
-        try:
-            import xlrd
-            logger(f"正在加载SKU数据库: {sku_db_file}...")
-            db_wb = xlrd.open_workbook(sku_db_file)
-        except Exception as e:
-            raise Exception(f"加载SKU数据库失败: {e}")
-        
-        # 使用指定的工作表或自动选择
-        sheet_names = db_wb.sheetnames
-        if db_sheet_name and db_sheet_name in sheet_names:
-            data_ws = db_wb.sheet_by_name(db_sheet_name)
-            logger(f"使用指定工作表: '{db_sheet_name}'")
-        elif DEFAULT_DB_SHEET_NAME in sheet_names:
-            data_ws = db_wb.sheet_by_name(DEFAULT_DB_SHEET_NAME)
-            logger(f"使用工作表: '{DEFAULT_DB_SHEET_NAME}'")
-        else:
-            data_ws = db_wb.sheet_by_index(0)
-            logger(f"未找到指定工作表，默认使用第一个工作表: '{data_ws.name}'")
-        
-        if data_ws.nrows == 0:
-            raise ValueError("SKU数据库似乎是空的（未找到表头）")
-        
-        # 获取表头
-        headers = [cell.value for cell in data_ws.row(0)]
-        
-        db_headers_idx = {}
-        for key, header_name in db_col_map.items():
-            if header_name in headers:
-                db_headers_idx[key] = headers.index(header_name)
-            else:
-                pass
-
-        required_keys = ['sku', 'l', 'w', 'h', 'wt']
-        missing_keys = [k for k in required_keys if k not in db_headers_idx]
-        if missing_keys:
-            missing_names = [db_col_map.get(k, k) for k in missing_keys]
-            raise ValueError(f"SKU数据库缺少以下必需列: {', '.join(missing_names)}")
-        
-        # 构建SKU数据库
-        logger("正在构建SKU数据库...")
-        
-        idx_sku = db_headers_idx['sku']
-        idx_l = db_headers_idx['l']
-        idx_w = db_headers_idx['w']
-        idx_h = db_headers_idx['h']
-        idx_wt = db_headers_idx['wt']
-        
-        for row_idx in range(1, data_ws.nrows):
-            try:
-                row = data_ws.row(row_idx)
-                sku_val = row[idx_sku].value
-                if not sku_val: continue
-                
-                def to_float(v):
-                    try: return float(v)
-                    except: return 0.0
-                
-                l = to_float(row[idx_l].value)
-                w = to_float(row[idx_w].value)
-                h = to_float(row[idx_h].value)
-                wt = to_float(row[idx_wt].value)
-                
-                sku_database[sku_val] = {
-                    "length": l, "width": w, "height": h, "weight": wt,
-                    "volume": l * w * h
-                }
-            except IndexError:
-                continue
-        
-        logger(f"SKU数据库构建完成，共加载 {len(sku_database)} 个SKU。")
     else:
         raise ValueError(f"不支持的文件格式: {file_ext}，请使用 .xlsx, .xlsm 或 .xls 文件")
     
@@ -278,6 +222,8 @@ def process_skus(
         
         # 转换为openpyxl工作簿以便编辑
         logger("  正在转换数据格式...")
+        if not _OPENPYXL_AVAILABLE:
+            raise ImportError("需要openpyxl库来处理Excel文件，请安装: pip install openpyxl")
         wb = openpyxl.Workbook()
         if 'Sheet' in wb.sheetnames:
             del wb['Sheet']
@@ -297,12 +243,10 @@ def process_skus(
         logger("  ✅ 数据转换完成")
         
     else:
-        # 加载.xlsx/.xlsm文件 - 使用openpyxl因为需要写入
+        # 加载.xlsx/.xlsm文件 - 修改的单元格保存时直接写回原文件
         try:
             logger(f"正在加载订单文件: {file_name}...")
-            if not _OPENPYXL_AVAILABLE:
-                raise ImportError("需要openpyxl库来处理Excel文件，请安装: pip install openpyxl")
-            wb = openpyxl.load_workbook(file_name)
+            wb = ExcelReader(file_name)
             
             # 如果指定了工作表，只处理该工作表
             if order_sheet_name:
@@ -331,29 +275,18 @@ def process_skus(
         
         target_idx = {}
         # 获取表头 (row 1)
-        target_headers = [c.value for c in target_ws[1]]
+        target_headers = HeaderIndex([c.value for c in target_ws[1]])
         
         if not target_col_map:
             col_map_config = {'sku': 'SKU', 'qty': '数量', 'l': '长', 'w': '宽', 'h': '高', 'wt': '单件重量'}
         else:
             col_map_config = target_col_map
 
-        def get_col_index(config_val):
-            # 1. 优先尝试当做表头名称查找
-            if config_val in target_headers:
-                return target_headers.index(config_val) + 1
-            
-            # 2. 尝试当做列字母 (A, B, AA...)
-            if config_val and isinstance(config_val, str) and config_val.isalpha() and len(config_val) <= 3:
-                 try: return column_index_from_string(config_val.upper())
-                 except: pass
-            
-            return None
-
         missing_cols = []
         for role in ['sku', 'qty', 'l', 'w', 'h', 'wt']:
             val = col_map_config.get(role)
-            idx = get_col_index(val)
+            # 优先当做表头名称查找，其次当做列字母 (A, B, AA...)
+            idx = target_headers.resolve(val)
             if idx:
                 target_idx[role] = idx
             else:
@@ -365,79 +298,19 @@ def process_skus(
             
         logger(f"    ...列定位成功，开始处理...")
         logger(f"    Debug: target_idx={target_idx}, max_row={target_ws.max_row}")
-        count = 0
         
-        # 缓存列索引
-        c_sku = target_idx['sku']
-        c_qty = target_idx['qty']
-        c_l = target_idx['l']
-        c_w = target_idx['w']
-        c_h = target_idx['h']
-        c_wt = target_idx['wt']
-        
-        # 批量读取数据优化？ openpyxl 写操作通常是瓶颈，读操作还行
-        # 这里逐行处理以便同时读写
-        for i in range(2, target_ws.max_row + 1):
-            sku_val = target_ws.cell(row=i, column=c_sku).value
-            if not sku_val: continue
-            
-            # 读取数量（如果忽略数量，固定为1）
-            qty_val = 1
-            if not ignore_qty:
-                try:
-                    q_v = target_ws.cell(row=i, column=c_qty).value
-                    if q_v:
-                        qty_val = float(q_v)
-                        if qty_val <= 0: qty_val = 1
-                except:
-                    pass
-            
-            # 处理逻辑
-            bundle_list = parse_sku_bundle(sku_val, logger)
-            
-            final_l = final_w = final_h = final_wt = 0
-            valid = False
-            err_msg = None
-            
-            if bundle_list:
-                tot_vol = 0; tot_wt = 0; all_found = True
-                for sub_sku, sub_qty in bundle_list:
-                    data = sku_database.get(sub_sku)
-                    if data:
-                        tot_vol += data["volume"] * sub_qty
-                        tot_wt += data["weight"] * sub_qty
-                    else:
-                        all_found = False; break
-                
-                if all_found:
-                    final_l = 10; final_w = 8
-                    final_h = tot_vol / 80 if tot_vol > 0 else 0
-                    final_wt = tot_wt
-                    valid = True
-                else:
-                    err_msg = "组合SKU错误"
-            else:
-                data = sku_database.get(sku_val)
-                if data:
-                    new_h = data["height"] * qty_val
-                    new_wt = data["weight"] * qty_val
-                    dims = sorted([data["length"], data["width"], new_h], reverse=True)
-                    final_l, final_w, final_h = dims
-                    final_wt = new_wt
-                    valid = True
-                else:
-                    err_msg = "SKU未找到"
-            
-            if valid:
-                target_ws.cell(row=i, column=c_l).value = final_l
-                target_ws.cell(row=i, column=c_w).value = final_w
-                target_ws.cell(row=i, column=c_h).value = final_h
-                target_ws.cell(row=i, column=c_wt).value = final_wt
-                count += 1
-            elif err_msg:
-                # 记录错误原因但不中断
-                # target_ws.cell(row=i, column=c_l).value = err_msg
-                pass
+        # 整列读取 SKU 与数量，逐值计算尺寸重量，只把计算成功的行写回
+        t = Table.from_sheet(target_ws, {'sku': target_idx['sku'], 'qty': target_idx['qty']}).filter('sku', bool)
+        # 读取数量（如果忽略数量，固定为1）
+        t.assign('qty_val', [1] * len(t) if ignore_qty else t.map(_order_qty, 'qty'))
+        t.assign('dims', t.map(lambda sku_val, qty_val: _sku_dims(sku_val, qty_val, sku_database, logger),
+                               'sku', 'qty_val'))
+        filled = t.filter('dims')
+        count = len(filled)
+        if count:
+            for role, values in zip(('l', 'w', 'h', 'wt'), zip(*filled['dims'])):
+                filled.assign(role, values)
+            filled.write(target_ws, {role: target_idx[role] for role in ('l', 'w', 'h', 'wt')})
 
         logger(f"    处理完成: 成功填充 {count} 行")
         if count > 0:
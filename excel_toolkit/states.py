@@ -1,11 +1,8 @@
-from typing import Callable, Dict, Optional, Union
+from typing import Any, Callable, Dict, Optional, Union
+from types import MappingProxyType
 import os
-try:
-    import openpyxl
-    from openpyxl.utils import column_index_from_string
-except ImportError:
-    from excel_toolkit.excel_lite import column_index_from_string
-    openpyxl = None
+import re
+from excel_toolkit.excel_lite import ExcelReader, column_index_from_string
 
 from excel_toolkit.exceptions import (
     FileLockedError,
@@ -29,12 +26,133 @@ STATE_MAP = {
     "vermont": "VT", "virginia": "VA", "washington": "WA", "west virginia": "WV",
     "wisconsin": "WI", "wyoming": "WY", "puerto rico": "PR", "guam": "GU",
     "u.s. virgin islands": "VI", "us virgin islands": "VI",
-    "district of columbia": "DC", "washington dc": "DC", "washington d.c.": "DC"
+    "district of columbia": "DC", "washington dc": "DC", "washington d.c.": "DC",
+    "american samoa": "AS", "northern mariana islands": "MP", "marshall islands": "MH",
+    "federated states of micronesia": "FM", "micronesia": "FM", "palau": "PW"
 }
 
+# 常见的州名缩写写法（AP 格式等），键为规范化后的形式
+_STATE_NAME_VARIANTS = {
+    "ala": "AL", "ariz": "AZ", "ark": "AR", "cal": "CA", "cali": "CA", "calif": "CA",
+    "colo": "CO", "conn": "CT", "del": "DE", "fla": "FL", "ill": "IL", "ind": "IN",
+    "kan": "KS", "kans": "KS", "mass": "MA", "mich": "MI", "minn": "MN", "miss": "MS",
+    "mont": "MT", "neb": "NE", "nebr": "NE", "nev": "NV", "n mex": "NM", "n dak": "ND",
+    "s dak": "SD", "okla": "OK", "ore": "OR", "oreg": "OR", "penn": "PA", "penna": "PA",
+    "tenn": "TN", "tex": "TX", "wash": "WA", "w va": "WV", "wis": "WI", "wisc": "WI", "wyo": "WY",
+}
+
+# 州名中视为分隔符的标点
+_STATE_NAME_PUNCT = re.compile(r"[.,'’()\-_/]+")
+
+
+def _normalize_state_name(state_name) -> str:
+    """州名规范化：去标点、转小写、合并空白，连续的单字母合并（'D.C.' -> 'dc'）"""
+    words = _STATE_NAME_PUNCT.sub(' ', str(state_name)).lower().split()
+    merged = []
+    letters = False  # 上一个词是否由单字母拼成
+    for word in words:
+        if len(word) == 1 and letters:
+            merged[-1] += word
+        else:
+            merged.append(word)
+            letters = len(word) == 1
+    return ' '.join(merged)
+
+
+def _build_state_names() -> Dict[str, str]:
+    """预先算好所有写法（全名、两字母缩写、常见缩写、N./S./W. 开头）规范化后的查找表"""
+    names = {}
+    for name, abbr in STATE_MAP.items():
+        key = _normalize_state_name(name)
+        names[key] = abbr
+        first, _, rest = key.partition(' ')
+        if rest and first in ('north', 'south', 'west'):
+            names[f"{first[0]} {rest}"] = abbr
+    for abbr in set(STATE_MAP.values()):
+        names[abbr.lower()] = abbr
+    names.update(_STATE_NAME_VARIANTS)
+    return names
+
+
+# 规范化州名 -> 缩写（只读）
+STATE_NAMES = MappingProxyType(_build_state_names())
+
+
+# ZIP 前三位区间 -> 州（USPS 分配；AA/AE/AP 为军邮）
+_ZIP3_RANGES = (
+    (5, 5, 'NY'), (6, 7, 'PR'), (8, 8, 'VI'), (9, 9, 'PR'), (10, 27, 'MA'), (28, 29, 'RI'),
+    (30, 38, 'NH'), (39, 49, 'ME'), (50, 54, 'VT'), (55, 55, 'MA'), (56, 59, 'VT'), (60, 69, 'CT'),
+    (70, 89, 'NJ'), (90, 99, 'AE'), (100, 149, 'NY'), (150, 196, 'PA'), (197, 199, 'DE'),
+    (200, 200, 'DC'), (201, 201, 'VA'), (202, 205, 'DC'), (206, 219, 'MD'), (220, 246, 'VA'),
+    (247, 268, 'WV'), (270, 289, 'NC'), (290, 299, 'SC'), (300, 319, 'GA'), (320, 339, 'FL'),
+    (340, 340, 'AA'), (341, 349, 'FL'), (350, 369, 'AL'), (370, 385, 'TN'), (386, 397, 'MS'),
+    (398, 399, 'GA'), (400, 427, 'KY'), (430, 459, 'OH'), (460, 479, 'IN'), (480, 499, 'MI'),
+    (500, 528, 'IA'), (530, 549, 'WI'), (550, 567, 'MN'), (569, 569, 'DC'), (570, 577, 'SD'),
+    (580, 588, 'ND'), (590, 599, 'MT'), (600, 629, 'IL'), (630, 658, 'MO'), (660, 679, 'KS'),
+    (680, 693, 'NE'), (700, 715, 'LA'), (716, 729, 'AR'), (730, 732, 'OK'), (733, 733, 'TX'),
+    (734, 749, 'OK'), (750, 799, 'TX'), (800, 816, 'CO'), (820, 831, 'WY'), (832, 838, 'ID'),
+    (840, 847, 'UT'), (850, 865, 'AZ'), (870, 884, 'NM'), (885, 885, 'TX'), (889, 898, 'NV'),
+    (900, 961, 'CA'), (962, 966, 'AP'), (967, 968, 'HI'), (969, 969, 'GU'), (970, 979, 'OR'),
+    (980, 994, 'WA'), (995, 999, 'AK'),
+)
+
+# 与所在 ZIP3 不同州的 ZIP5 区间（太平洋属地）
+_ZIP5_RANGES = (
+    (96799, 96799, 'AS'), (96939, 96940, 'PW'), (96941, 96944, 'FM'), (96950, 96952, 'MP'),
+    (96960, 96960, 'MH'), (96970, 96970, 'MH'),
+)
+
+
+def _build_zip3_states() -> tuple:
+    table = [None] * 1000
+    for first, last, abbr in _ZIP3_RANGES:
+        for zip3 in range(first, last + 1):
+            table[zip3] = abbr
+    return tuple(table)
+
+
+# 以 ZIP 前三位为下标的州缩写表（未分配为 None）
+ZIP3_STATES = _build_zip3_states()
+
+# ZIP5 -> 州，优先于 ZIP3_STATES
+ZIP5_OVERRIDES = MappingProxyType({zip5: abbr for first, last, abbr in _ZIP5_RANGES
+                                   for zip5 in range(first, last + 1)})
+
+# 文本形式的邮编：5位（可带 -4 位扩展）或丢了前导0的3~4位
+_ZIP_PATTERN = re.compile(r'(\d{5})(?:-?\d{4})?|(\d{3,4})')
+
+
+def _zip5(zip_code: Any) -> Optional[int]:
+    """邮编 -> 5位邮编的整数值；数字单元格丢失的前导0按位数还原，无法识别时返回 None"""
+    if zip_code is None or zip_code == '' or isinstance(zip_code, bool):
+        return None
+    if isinstance(zip_code, float):
+        if not zip_code.is_integer():
+            return None
+        zip_code = int(zip_code)
+    if isinstance(zip_code, int):
+        if 99999 < zip_code <= 999999999:
+            # 存成数字的 ZIP+4
+            zip_code //= 10000
+        return zip_code if 0 < zip_code <= 99999 else None
+    match = _ZIP_PATTERN.fullmatch(str(zip_code).strip())
+    if match is None:
+        return None
+    return int(match.group(1) or match.group(2))
+
+
+def state_from_zip(zip_code: Any) -> Optional[str]:
+    """按邮编查州缩写（如 '90210' -> 'CA'），无法识别时返回 None"""
+    zip5 = _zip5(zip_code)
+    if zip5 is None:
+        return None
+    return ZIP5_OVERRIDES.get(zip5) or ZIP3_STATES[zip5 // 100]
+
 
 def get_state_abbreviation(state_name: str) -> Optional[str]:
-    """将州全名转换为缩写
+    """将州名转换为缩写
+    
+    忽略大小写、标点和多余空白，也识别两字母缩写和常见缩写写法（如 'Calif.'、'N. Carolina'）。
     
     Args:
         state_name: 州的全名（如 'California'）
@@ -44,15 +162,23 @@ def get_state_abbreviation(state_name: str) -> Optional[str]:
     """
     if not state_name:
         return None
-    lookup_name = str(state_name).strip().lower()
-    return STATE_MAP.get(lookup_name)
+    return STATE_NAMES.get(_normalize_state_name(state_name))
+
+
+def _column_index(column_letter) -> int:
+    """列字母 -> 列号（只接受 A~XFD 形式的列字母），无效时返回 0"""
+    letters = str(column_letter).strip()
+    col_index = column_index_from_string(letters) if letters.isascii() and letters.isalpha() else 0
+    return col_index if 1 <= col_index <= 16384 else 0
 
 
 def process_states(
     file_name: str, 
     sheet_name: str, 
     column_letter: str, 
-    logger: Callable[[str], None] = print
+    logger: Callable[[str], None] = print,
+    zip_column_letter: Optional[str] = None,
+    zip_mode: str = 'fill'
 ) -> Dict[str, int]:
     """处理Excel文件中的州名转换
     
@@ -61,9 +187,12 @@ def process_states(
         sheet_name: 工作表名称
         column_letter: 要处理的列号（如 'A', 'B'）
         logger: 日志输出函数
+        zip_column_letter: 邮编列号（可选）；指定后按邮编补全州名为空或无法识别的行
+        zip_mode: 'fill' 只补全；'validate' 另外在日志中列出州名与邮编不一致的行（保留州名结果）
     
     Returns:
-        包含统计信息的字典 {'success': int, 'failed': int, 'total': int}
+        包含统计信息的字典 {'success': int, 'failed': int, 'total': int,
+        'from_zip': int, 'mismatch': int}
         
     Raises:
         CustomFileNotFoundError: 文件不存在
@@ -75,13 +204,9 @@ def process_states(
     if not os.path.exists(file_name):
         raise CustomFileNotFoundError(file_name)
 
-    # 验证openpyxl可用
-    if openpyxl is None:
-        raise Exception("需要安装 openpyxl 库才能修改 Excel 文件")
-
     # 加载工作簿
     try:
-        wb = openpyxl.load_workbook(file_name)
+        wb = ExcelReader(file_name)
     except PermissionError as e:
         handle_file_error(file_name, e)
     except Exception as e:
@@ -93,41 +218,71 @@ def process_states(
         wb.close()
         raise SheetNotFoundError(sheet_name, wb.sheetnames)
     
-    ws = wb[sheet_name]
-    
     # 验证列号
-    try:
-        col_index = column_index_from_string(column_letter)
-    except ValueError:
+    col_index = _column_index(column_letter)
+    if not col_index:
         wb.close()
         raise InvalidColumnError(column_letter)
+    zip_index = 0
+    if zip_column_letter and str(zip_column_letter).strip():
+        zip_index = _column_index(zip_column_letter)
+        if not zip_index:
+            wb.close()
+            raise InvalidColumnError(zip_column_letter)
+    validate = zip_mode == 'validate'
 
-    stats = {'success': 0, 'failed': 0, 'total': 0}
-    
-    logger(f"开始处理工作表 '{sheet_name}' 的 {column_letter} 列...")
+    stats = {'success': 0, 'failed': 0, 'total': 0, 'from_zip': 0, 'mismatch': 0}
     
-    # 获取最大行数，避免处理空行
-    max_row = ws.max_row
+    if zip_index:
+        logger(f"开始处理工作表 '{sheet_name}' 的 {column_letter} 列（邮编列 {zip_column_letter}）...")
+    else:
+        logger(f"开始处理工作表 '{sheet_name}' 的 {column_letter} 列...")
     
-    for i in range(2, max_row + 1):
-        cell = ws.cell(row=i, column=col_index)
-        full_name = cell.value
-        
-        if full_name:
+    def convert(full_name):
+        if not full_name:
+            return None
+        stats['total'] += 1
+        abbr = get_state_abbreviation(full_name)
+        if abbr:
+            stats['success'] += 1
+        else:
+            # 保持原值，不修改
+            stats['failed'] += 1
+        return abbr
+
+    def convert_with_zip(full_name, zip_code):
+        abbr = get_state_abbreviation(full_name) if full_name else None
+        zip_abbr = state_from_zip(zip_code) if (validate or not abbr) else None
+        if full_name or zip_abbr:
             stats['total'] += 1
-            abbr = get_state_abbreviation(full_name)
-            if abbr:
-                cell.value = abbr
-                stats['success'] += 1
-            else:
-                stats['failed'] += 1
-                # 保持原值，不修改
-                # logger(f"  行 {i}: 未找到州名 '{full_name}'，保持原值") 
-
-    # 保存文件
+        if abbr:
+            stats['success'] += 1
+            if zip_abbr and zip_abbr != abbr:
+                stats['mismatch'] += 1
+                if stats['mismatch'] <= 20:
+                    logger(f"  - 州名 '{full_name}' -> {abbr}，邮编 {zip_code} -> {zip_abbr}")
+                elif stats['mismatch'] == 21:
+                    logger("  ... 其余略")
+            return abbr
+        if zip_abbr:
+            stats['success'] += 1
+            stats['from_zip'] += 1
+            return zip_abbr
+        if full_name:
+            stats['failed'] += 1
+        return None
+
+    # 边读边写：逐行转换并直接写入新文件，内存占用与行数无关
     try:
-        wb.save(file_name)
+        if zip_index:
+            if validate:
+                logger("州名与邮编不一致的行（保留州名转换结果）：")
+            wb.transform_column(sheet_name, (col_index, zip_index), convert_with_zip, dst_column=col_index)
+        else:
+            wb.transform_column(sheet_name, col_index, convert)
         wb.close()
+        if validate:
+            logger(f"州名与邮编不一致: {stats['mismatch']} 行")
         logger(f"✅ 文件已成功保存")
         return stats
     except PermissionError as e:
@@ -138,4 +293,3 @@ def process_states(
         wb.close()
         log_error(e, f"保存文件: {file_name}")
         raise Exception(f"保存文件时发生错误: {e}")
-
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列式表格模块
+把工作表中选定的列读成按列存放的 Table，用整列操作（map / filter / where / assign /
+lookup）代替逐行读写单元格的循环：列操作由 map、itertools.compress、zip 等内置函数
+在C层完成迭代，结果再按原行号写回工作表。
+
+    t = Table.from_sheet(ws, {'state': 'C'})
+    t.assign('abbr', t.lookup('state', STATE_MAP, key=str.lower))
+    t.write(ws, {'abbr': 'C'})
+
+NumPy 可用时 array() 返回 ndarray 以便做向量运算；打包版本不含 NumPy，工具本身只依赖内置函数。
+"""
+from itertools import compress, repeat
+from operator import not_
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from excel_toolkit.excel_lite import ExcelLiteError, HeaderIndex, column_index_from_string
+
+try:
+    import numpy as np
+    _NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    _NUMPY_AVAILABLE = False
+
+
+def _is_blank(value: Any) -> bool:
+    """空单元格：None、空串或只有空白的文本"""
+    return value is None or value == '' or (isinstance(value, str) and not value.strip())
+
+
+def _to_float(value: Any, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class Table:
+    """按列存放的工作表数据；rows 为每一行在工作表中的行号"""
+
+    def __init__(self, columns: Dict[str, List[Any]], rows: Sequence[int]):
+        self.rows = list(rows)
+        self._columns: Dict[str, List[Any]] = {}
+        for name, values in columns.items():
+            self.assign(name, values)
+
+    @classmethod
+    def from_sheet(cls, ws, columns: Union[Dict[str, Any], Sequence[Any]], min_row: int = 2,
+                   max_row: Optional[int] = None, header_row: int = 1) -> 'Table':
+        """读取工作表中的列
+
+        Args:
+            ws: ExcelWorksheet 或 openpyxl 工作表（只用到 iter_rows(values_only=True)）
+            columns: {列名: 工作表列}，或工作表列的列表（列名与之相同）；
+                工作表列可以是表头名、列字母或列号
+            min_row: 数据起始行
+            max_row: 数据结束行，默认到最后一行
+            header_row: 表头所在行（按表头名定位列时使用）
+        """
+        if not isinstance(columns, dict):
+            columns = {str(spec): spec for spec in columns}
+        headers = None
+        positions = {}
+        for name, spec in columns.items():
+            col = spec if isinstance(spec, int) else None
+            if col is None:
+                if headers is None:
+                    header_values = next(ws.iter_rows(min_row=header_row, max_row=header_row, values_only=True), ())
+                    headers = HeaderIndex(header_values)
+                col = headers.resolve(spec)
+            if not col:
+                raise ExcelLiteError(f"工作表 '{ws.title}' 中找不到列: {spec}")
+            positions[name] = col
+        if not positions:
+            return cls({}, [])
+
+        # 只读取覆盖所选列的范围，再用 zip 一次性转成列
+        min_col = min(positions.values())
+        max_col = max(positions.values())
+        values = list(ws.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col,
+                                   values_only=True))
+        width = max_col - min_col + 1
+        if any(len(row) < width for row in values):
+            values = [tuple(row) + (None,) * (width - len(row)) for row in values]
+        by_position = list(zip(*values)) if values else [()] * width
+        return cls({name: list(by_position[col - min_col]) for name, col in positions.items()},
+                   range(min_row, min_row + len(values)))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    def __getitem__(self, name: str) -> List[Any]:
+        return self._columns[name]
+
+    @property
+    def columns(self) -> List[str]:
+        """列名"""
+        return list(self._columns)
+
+    def assign(self, name: str, values: Iterable[Any]) -> 'Table':
+        """设置（新增或替换）一列，长度必须与行数一致"""
+        values = values if isinstance(values, list) else list(values)
+        if len(values) != len(self.rows):
+            raise ExcelLiteError(f"列 '{name}' 的长度 {len(values)} 与行数 {len(self.rows)} 不一致")
+        self._columns[name] = values
+        return self
+
+    def map(self, func: Callable[..., Any], *names: str) -> List[Any]:
+        """对一列（或多列并行）逐值调用 func，返回新列；多列时 func 依次收到各列的值"""
+        return list(map(func, *(self._columns[name] for name in names)))
+
+    def where(self, mask: Iterable[Any]) -> 'Table':
+        """按布尔序列筛选行，返回新的 Table（列为原列的子集拷贝）"""
+        mask = mask if isinstance(mask, list) else list(mask)
+        return Table({name: list(compress(values, mask)) for name, values in self._columns.items()},
+                     compress(self.rows, mask))
+
+    def filter(self, name: str, predicate: Optional[Callable[[Any], Any]] = None) -> 'Table':
+        """保留某列满足 predicate 的行；不指定 predicate 时保留该列非空的行"""
+        if predicate is None:
+            return self.where(map(not_, map(_is_blank, self._columns[name])))
+        return self.where(map(predicate, self._columns[name]))
+
+    def lookup(self, name: str, mapping: Dict[Any, Any], default: Any = None,
+               key: Optional[Callable[[Any], Any]] = None) -> List[Any]:
+        """用字典查找一列的值（查找连接），找不到时取 default；key 为查找前对值做的规范化"""
+        values = self._columns[name]
+        if key is not None:
+            values = map(key, values)
+        return list(map(mapping.get, values, repeat(default)))
+
+    def to_dict(self, key: str, value: Union[str, Sequence[str]], skip_blank: bool = True) -> Dict[Any, Any]:
+        """以一列为键、另一列（或多列组成的元组）为值构建字典；键重复时后出现的行生效"""
+        keys = self._columns[key]
+        if isinstance(value, str):
+            values = self._columns[value]
+        else:
+            values = zip(*(self._columns[name] for name in value))
+        pairs = zip(keys, values)
+        if skip_blank:
+            pairs = compress(pairs, map(not_, map(_is_blank, keys)))
+        return dict(pairs)
+
+    def join(self, key: str, other: 'Table', other_key: str, names: Sequence[str],
+             prefix: str = '') -> 'Table':
+        """按键列把 other 的若干列连接到本表（左连接，找不到时为 None），返回本表"""
+        mapping = other.to_dict(other_key, names)
+        matched = self.lookup(key, mapping)
+        empty = (None,) * len(names)
+        columns = zip(*[row if row is not None else empty for row in matched]) if matched else [()] * len(names)
+        for name, values in zip(names, columns):
+            self.assign(prefix + name, values)
+        return self
+
+    def numeric(self, name: str, default: float = 0.0) -> List[float]:
+        """把一列转成浮点数，无法转换的值取 default"""
+        values = self._columns[name]
+        try:
+            return list(map(float, values))
+        except (TypeError, ValueError):
+            return [_to_float(value, default) for value in values]
+
+    def array(self, name: str, default: float = 0.0):
+        """一列的数值数组：NumPy 可用时为 float64 ndarray，否则为浮点数列表"""
+        values = self.numeric(name, default)
+        if _NUMPY_AVAILABLE:
+            return np.asarray(values, dtype=np.float64)
+        return values
+
+    def write(self, ws, columns: Dict[str, Any], skip_none: bool = True) -> int:
+        """把列按行号写回工作表，返回写入的单元格数
+
+        Args:
+            ws: ExcelWorksheet 或 openpyxl 工作表（只用到 ws.cell(row=, column=, value=)）
+            columns: {列名: 工作表列号或列字母}
+            skip_none: 值为 None 的单元格保持原值不写
+        """
+        count = 0
+        for name, col in columns.items():
+            if isinstance(col, str):
+                col = column_index_from_string(col.strip())
+            for row_number, value in zip(self.rows, self._columns[name]):
+                if value is None and skip_none:
+                    continue
+                ws.cell(row=row_number, column=col, value=value)
+                count += 1
+        return count
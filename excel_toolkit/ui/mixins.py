@@ -7,6 +7,12 @@ from tkinter.scrolledtext import ScrolledText
 from excel_toolkit.excel_lite import get_sheet_names
 
 
+# 文件选择对话框的文件类型
+EXCEL_FILETYPES = [("Excel文件", "*.xlsx;*.xlsm;*.xls"), ("所有文件", "*.*")]
+# 只读取数据的功能额外支持 CSV/TSV（作为单个工作表读取）
+EXCEL_CSV_FILETYPES = [("Excel/CSV文件", "*.xlsx;*.xlsm;*.xls;*.csv;*.tsv"), ("所有文件", "*.*")]
+
+
 class LoggerMixin:
     """日志功能混入类"""
     
@@ -47,11 +53,11 @@ class LoggerMixin:
 class FileSelectMixin:
     """文件选择功能混入类"""
     
-    def select_file_and_sheets(self, file_var, sheet_var, combobox, title):
-        """选择文件并加载工作表列表到下拉框"""
+    def select_file_and_sheets(self, file_var, sheet_var, combobox, title, allow_csv=False):
+        """选择文件并加载工作表列表到下拉框（allow_csv=True 时可选择 CSV/TSV）"""
         path = filedialog.askopenfilename(
             title=title,
-            filetypes=[("Excel文件", "*.xlsx;*.xlsm;*.xls"), ("所有文件", "*.*")]
+            filetypes=EXCEL_CSV_FILETYPES if allow_csv else EXCEL_FILETYPES
         )
         if path:
             file_var.set(path)
@@ -62,11 +68,11 @@ class FileSelectMixin:
                 if names:
                     self._update_combobox_options(combobox, sheet_var, names)
 
-    def select_file_and_listbox(self, file_var, listbox, title):
-        """选择文件并加载工作表列表到列表框"""
+    def select_file_and_listbox(self, file_var, listbox, title, allow_csv=False):
+        """选择文件并加载工作表列表到列表框（allow_csv=True 时可选择 CSV/TSV）"""
         path = filedialog.askopenfilename(
             title=title,
-            filetypes=[("Excel文件", "*.xlsx;*.xlsm;*.xls"), ("所有文件", "*.*")]
+            filetypes=EXCEL_CSV_FILETYPES if allow_csv else EXCEL_FILETYPES
         )
         if path:
             file_var.set(path)
@@ -181,10 +181,10 @@ class Tab11ShippingMixin:
     
     def _select_order11(self):
         """选择订单文件"""
-        from excel_toolkit.ui.mixins import get_sheet_names
+        from excel_toolkit.ui.mixins import get_sheet_names, EXCEL_CSV_FILETYPES
         path = filedialog.askopenfilename(
             title="选择订单信息文件",
-            filetypes=[("Excel文件", "*.xlsx;*.xlsm;*.xls"), ("所有文件", "*.*")]
+            filetypes=EXCEL_CSV_FILETYPES
         )
         if path:
             self.order11_file_var.set(path)
@@ -273,12 +273,12 @@ class Tab11ShippingMixin:
         for var in self.warehouses11_checks.values():
             var.set(select)
     
-    def _show_fill_mode_dialog(self, existing_rows: int):
+    def _show_fill_mode_dialog(self, last_row: int):
         """
         显示填充模式选择对话框
         
         Args:
-            existing_rows: 模板文件中现有的数据行数
+            last_row: 模板文件中最后一行数据的行号
         
         Returns:
             "overwrite" 或 "append"，如果用户取消则返回 None
@@ -303,7 +303,7 @@ class Tab11ShippingMixin:
         
         ttk.Label(msg_frame, text="⚠️ 模板文件中检测到已有数据", 
                  font=("Segoe UI", 11, "bold")).pack(pady=(0, 10))
-        ttk.Label(msg_frame, text=f"现有数据行数: {existing_rows} 行", 
+        ttk.Label(msg_frame, text=f"现有数据到第 {last_row} 行", 
                  font=("Segoe UI", 10)).pack(pady=5)
         ttk.Label(msg_frame, text="请选择填充模式:", 
                  font=("Segoe UI", 10)).pack(pady=(10, 5))
@@ -439,7 +439,7 @@ class Tab11ShippingMixin:
             data_check = check_template_has_data(template_file, template_sheet)
             if data_check["has_data"]:
                 # 弹出对话框让用户选择
-                choice = self._show_fill_mode_dialog(data_check["data_rows"])
+                choice = self._show_fill_mode_dialog(data_check["last_row"])
                 if choice is None:  # 用户取消
                     self.logger11("❌ 用户取消了操作")
                     return
@@ -8,7 +8,7 @@ import threading
 import os
 import json
 
-from excel_toolkit.delete_cols import delete_columns, parse_column_input
+from excel_toolkit.delete_cols import delete_columns, delete_columns_batch, find_table_files, parse_column_input
 from excel_toolkit.tooltip import create_tooltip
 
 
@@ -172,6 +172,16 @@ class Tab14DeleteColsMixin:
         run_btn.pack(side='left', padx=(0, 8))
         create_tooltip(run_btn, "开始删除指定的列")
         
+        folder_btn = ttk.Button(
+            action_frame,
+            text="📁 批量处理文件夹",
+            command=self.run_tool14_folder,
+            style='Secondary.TButton',
+            width=16
+        )
+        folder_btn.pack(side='left', padx=(0, 8))
+        create_tooltip(folder_btn, "把当前列配置（或选中的模板）应用到文件夹中的所有表格文件")
+        
         # ===== 日志区域 =====
         log_card = ttk.LabelFrame(tab, text="📝 执行日志", padding=12)
         log_card.pack(fill='both', expand=True, padx=15, pady=(0, 15))
@@ -323,7 +333,7 @@ class Tab14DeleteColsMixin:
         from tkinter import filedialog
         path = filedialog.askopenfilename(
             title="选择要删除列的Excel文件",
-            filetypes=[("表格文件", "*.xlsx;*.xlsm;*.xls"), ("所有文件", "*.*")]
+            filetypes=[("表格文件", "*.xlsx;*.xlsm;*.csv;*.tsv"), ("所有文件", "*.*")]
         )
         if path:
             self.file14_var.set(path)
@@ -410,3 +420,82 @@ class Tab14DeleteColsMixin:
                 self.master.after(0, on_error)
 
         threading.Thread(target=thread_target, daemon=True).start()
+
+    def run_tool14_folder(self):
+        """把当前列配置批量应用到文件夹中的所有表格文件"""
+        from tkinter import filedialog
+        cols_str = self.cols14_var.get().strip()
+        sheet = self.sheet14_var.get().strip() if hasattr(self, 'sheet14_var') else None
+        
+        if not cols_str:
+            messagebox.showwarning("⚠️ 警告", "请输入要删除的列标识，或选择已保存的模板。")
+            return
+        columns = parse_column_input(cols_str)
+        if not columns:
+            messagebox.showwarning("⚠️ 警告", "无法解析列标识，请检查输入格式。")
+            return
+        
+        folder = filedialog.askdirectory(title="选择要批量删除列的文件夹")
+        if not folder:
+            return
+        files = find_table_files(folder)
+        if not files:
+            messagebox.showwarning("⚠️ 警告", "该文件夹中没有可处理的表格文件（.xlsx/.xlsm/.csv/.tsv）。")
+            return
+        
+        cols_display = ", ".join(reversed(columns))
+        tpl_name = self.template14_var.get()
+        tpl_display = f"\n模板: {tpl_name}" if tpl_name and tpl_name != "（选择模板）" else ""
+        confirm_msg = (f"确定要对文件夹中的 {len(files)} 个文件删除以下列吗？\n\n"
+                       f"列: {cols_display}{tpl_display}\n\n⚠️ 此操作会直接修改原文件！")
+        if not messagebox.askyesno("确认批量删除", confirm_msg):
+            self.logger14("❌ 用户取消操作")
+            return
+        
+        self.logger14("=" * 60)
+        self.logger14("▶️ 开始批量删除列...")
+        self.logger14(f"  文件夹: {folder}（{len(files)} 个文件）")
+        self.logger14(f"  工作表: {sheet if sheet else '全部'}")
+        self.logger14(f"  删除列: {cols_display}")
+        self.logger14("=" * 60)
+        
+        self._update_status("正在批量删除列...", icon="⏳", show_progress=True)
+        self.master.config(cursor="watch")
+        
+        def thread_target():
+            try:
+                def safe_logger(msg):
+                    self.master.after(0, lambda m=msg: self.logger14(m))
+                
+                stats = delete_columns_batch(files, columns, safe_logger, sheet if sheet else None)
+                
+                def on_success():
+                    self.master.config(cursor="")
+                    self._update_status("就绪", icon="✅", show_progress=False)
+                    msg = (
+                        f"✅ 批量删除完成！\n\n"
+                        f"成功文件数: {stats['files_processed']}\n"
+                        f"失败文件数: {stats['files_failed']}\n"
+                        f"处理工作表数: {stats['sheets_processed']}\n"
+                        f"删除列数: {stats['columns_deleted']}"
+                    )
+                    messagebox.showinfo("✅ 完成", msg)
+                    self.logger14("\n" + "=" * 60)
+                    self.logger14("✅ 批量删除完成")
+                    self.logger14(f"  成功: {stats['files_processed']} 个文件，失败: {stats['files_failed']} 个")
+                    self.logger14(f"  处理工作表: {stats['sheets_processed']} 个")
+                    self.logger14(f"  删除列: {stats['columns_deleted']} 个")
+                    self.logger14("=" * 60)
+                
+                self.master.after(0, on_success)
+                
+            except Exception as e:
+                error_msg = str(e)
+                def on_error(msg=error_msg):
+                    self.master.config(cursor="")
+                    self._update_status("错误", icon="❌", show_progress=False)
+                    messagebox.showerror("❌ 错误", msg)
+                    self.logger14(f"❌ 发生错误: {msg}")
+                self.master.after(0, on_error)
+
+        threading.Thread(target=thread_target, daemon=True).start()
@@ -16,6 +16,9 @@ from excel_toolkit.tooltip import create_tooltip
 class Tab1StatesMixin:
     """Tab1 州名转换 Mixin"""
     
+    # 邮编用途（界面文字 -> process_states 的 zip_mode）
+    _ZIP1_MODES = {"补全": "fill", "校验": "validate"}
+    
     def create_tab1_states(self, tab):
         """创建Tab1界面(优化版)"""
         # 变量已在 _initialize_all_variables 中创建，这里不再重复创建
@@ -26,6 +29,10 @@ class Tab1StatesMixin:
             self._trace_persist(self.file1_var)
             self._trace_persist(self.sheet1_var)
             self._trace_persist(self.col1_var)
+            self.zip1_var = tk.StringVar(value="")
+            self.zip1_mode_var = tk.StringVar(value="补全")
+            self._trace_persist(self.zip1_var)
+            self._trace_persist(self.zip1_mode_var)
 
         # ===== 卡片1: 文件选择 =====
         file_card = ttk.LabelFrame(tab, text="📊 文件选择", padding=12)
@@ -64,6 +71,20 @@ class Tab1StatesMixin:
         col_entry.pack(side='left')
         create_tooltip(col_entry, "输入列号(如A、B、G等)")
         
+        zip_row = ttk.Frame(param_card)
+        zip_row.pack(fill='x', pady=4)
+        
+        ttk.Label(zip_row, text="邮编列:", width=8).pack(side='left', padx=(0, 8))
+        zip_entry = ttk.Entry(zip_row, textvariable=self.zip1_var, width=6)
+        zip_entry.pack(side='left', padx=(0, 16))
+        create_tooltip(zip_entry, "可选：邮编所在列号，留空则只按州名转换")
+        
+        ttk.Label(zip_row, text="邮编用途:", width=8).pack(side='left', padx=(0, 8))
+        zip_mode_combo = ttk.Combobox(zip_row, textvariable=self.zip1_mode_var,
+                                      values=list(self._ZIP1_MODES), state="readonly", width=8)
+        zip_mode_combo.pack(side='left')
+        create_tooltip(zip_mode_combo, "补全：州名为空或无法识别时按邮编填写\n校验：另外列出州名与邮编不一致的行")
+        
         # 提示信息
         hint_row = ttk.Frame(param_card)
         hint_row.pack(fill='x', pady=(8, 4))
@@ -143,6 +164,8 @@ class Tab1StatesMixin:
         file = self.file1_var.get()
         sheet = self.sheet1_var.get()
         col = self.col1_var.get()
+        zip_col = self.zip1_var.get().strip()
+        zip_mode = self._ZIP1_MODES.get(self.zip1_mode_var.get(), "fill")
         
         if not file or file == "未选择文件":
             messagebox.showwarning("⚠️ 警告", "请先选择一个文件。")
@@ -159,6 +182,8 @@ class Tab1StatesMixin:
         self.logger1(f"  文件: {os.path.basename(file)}")
         self.logger1(f"  工作表: {sheet}")
         self.logger1(f"  目标列: {col}")
+        if zip_col:
+            self.logger1(f"  邮编列: {zip_col}（{self.zip1_mode_var.get()}）")
         self.logger1("=" * 60)
         
         self._update_status("正在处理州名转换...", icon="⏳", show_progress=True)
@@ -169,17 +194,24 @@ class Tab1StatesMixin:
                 def safe_logger(msg):
                     self.master.after(0, lambda m=msg: self.logger1(m))
                 
-                stats = process_states(file, sheet, col, safe_logger)
+                stats = process_states(file, sheet, col, safe_logger, zip_col or None, zip_mode)
                 
                 def on_success():
                     self.master.config(cursor="")
                     self._update_status("就绪", icon="✅", show_progress=False)
                     
+                    zip_info = ""
+                    if zip_col:
+                        zip_info = f"按邮编补全: {stats['from_zip']} 行\n"
+                        if zip_mode == 'validate':
+                            zip_info += f"州名与邮编不一致: {stats['mismatch']} 行\n"
+                    
                     msg = (
                         f"✅ 州名转换完成！\n\n"
                         f"总共处理: {stats['total']} 行\n"
                         f"成功转换: {stats['success']} 行\n"
-                        f"未找到/保持原值: {stats['failed']} 行\n\n"
+                        f"未找到/保持原值: {stats['failed']} 行\n"
+                        f"{zip_info}\n"
                         f"文件已保存: {os.path.basename(file)}"
                     )
                     
@@ -189,6 +221,8 @@ class Tab1StatesMixin:
                     self.logger1(f"  总计: {stats['total']} 行")
                     self.logger1(f"  成功: {stats['success']} 行")
                     self.logger1(f"  跳过: {stats['failed']} 行")
+                    if zip_col:
+                        self.logger1(f"  邮编补全: {stats['from_zip']} 行")
                     self.logger1("=" * 60)
 
                 self.master.after(0, on_success)
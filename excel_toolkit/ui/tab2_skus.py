@@ -279,9 +279,9 @@ class Tab2SkusMixin:
             file_ext = os.path.splitext(sku_db_path)[1].lower()
             headers = []
             
-            if file_ext in ['.xlsx', '.xlsm']:
-                # 使用openpyxl读取新版Excel
-                from excel_toolkit.excel_lite import ExcelReader, ExcelWriter
+            if file_ext in ['.xlsx', '.xlsm', '.xls']:
+                # 只解析表头行，不加载整表
+                from excel_toolkit.excel_lite import ExcelReader
                 wb = ExcelReader(sku_db_path, read_only=True, data_only=True)
                 
                 if sheet_name not in wb.sheetnames:
@@ -290,21 +290,8 @@ class Tab2SkusMixin:
                     return
                 
                 ws = wb[sheet_name]
-                headers = [cell.value for cell in list(ws.rows)[0] if cell.value]
+                headers = [value for value in ws.headers() if value]
                 wb.close()
-                
-            elif file_ext == '.xls':
-                # 使用xlrd读取旧版Excel
-                import xlrd
-                wb = xlrd.open_workbook(sku_db_path)
-                
-                if sheet_name not in wb.sheetnames:
-                    self.logger2(f"  警告：工作表 '{sheet_name}' 不存在")
-                    return
-                
-                ws = wb.sheet_by_name(sheet_name)
-                if ws.nrows > 0:
-                    headers = [cell.value for cell in ws.row(0) if cell.value]
             
             if not headers:
                 self.logger2("  警告：未找到表头，请手动配置列映射")
@@ -7,13 +7,19 @@ from tkinter.scrolledtext import ScrolledText
 import threading
 import os
 
-from excel_toolkit.highlight import highlight_duplicates
+from excel_toolkit.highlight import (
+    highlight_duplicates, highlight_history_duplicates, SCOPE_SHEET, SCOPE_WORKBOOK
+)
+from excel_toolkit.key_history import DEFAULT_HISTORY_PATH
 from excel_toolkit.tooltip import create_tooltip
 
 
 class Tab3HighlightMixin:
     """Tab3 高亮重复项 Mixin"""
     
+    # 判断范围（界面文字 -> highlight_duplicates 的 scope）
+    _SCOPE3_OPTIONS = {"每个工作表单独判断": SCOPE_SHEET, "所有工作表合并判断": SCOPE_WORKBOOK}
+    
     def create_tab3_highlight(self, tab):
         """创建Tab3界面(优化版)"""
         # 检查变量是否已经在_initialize_all_variables中创建
@@ -24,6 +30,12 @@ class Tab3HighlightMixin:
             self._trace_persist(self.file3_var)
             self._trace_persist(self.col3_var)
             self._trace_persist(self.sheet3_var)
+            self.scope3_var = tk.StringVar(value="每个工作表单独判断")
+            self._trace_persist(self.scope3_var)
+            self.history3_var = tk.BooleanVar(value=False)
+            self.history3_path_var = tk.StringVar(value=DEFAULT_HISTORY_PATH)
+            self._trace_persist(self.history3_var)
+            self._trace_persist(self.history3_path_var)
 
         # ===== 卡片1: 文件选择 =====
         file_card = ttk.LabelFrame(tab, text="📊 文件选择", padding=12)
@@ -55,6 +67,21 @@ class Tab3HighlightMixin:
         
         ttk.Label(sheet_row, text="（不选择=处理所有工作表）", 
                  foreground='#6B7280', font=("Microsoft YaHei UI", 9)).pack(side='left')
+        
+        # 一起判断重复的其他文件（不持久化）
+        self.other_files3 = []
+        others_row = ttk.Frame(file_card)
+        others_row.pack(fill='x', pady=(8, 4))
+        
+        others_btn = ttk.Button(others_row, text="➕ 其他文件", width=12, command=self._select_other_files3)
+        others_btn.pack(side='left', padx=(0, 8))
+        create_tooltip(others_btn, "可选：选择更多文件，与上面的文件合在一起判断重复（都会高亮并保存）")
+        
+        self.others3_label = ttk.Label(others_row, text="未选择", foreground='#6B7280')
+        self.others3_label.pack(side='left', padx=(0, 8))
+        
+        ttk.Button(others_row, text="清除", width=6, command=lambda: self._set_other_files3([]),
+                   style='Secondary.TButton').pack(side='left')
 
         # ===== 卡片2: 参数配置 =====
         param_card = ttk.LabelFrame(tab, text="⚙️ 参数配置", padding=12)
@@ -66,7 +93,26 @@ class Tab3HighlightMixin:
         ttk.Label(param_row, text="目标列:", width=8).pack(side='left', padx=(0, 8))
         col_entry = ttk.Entry(param_row, textvariable=self.col3_var, width=6)
         col_entry.pack(side='left')
-        create_tooltip(col_entry, "输入要检查重复的列号(如A、B、C等)")
+        create_tooltip(col_entry, "输入要检查重复的列号(如A、B、C等)，多列组合判断用逗号分隔(如 A,C)")
+        
+        ttk.Label(param_row, text="范围:", width=6).pack(side='left', padx=(16, 8))
+        scope_combo = ttk.Combobox(param_row, textvariable=self.scope3_var,
+                                   values=list(self._SCOPE3_OPTIONS), state="readonly", width=18)
+        scope_combo.pack(side='left')
+        create_tooltip(scope_combo, "所有工作表合并判断：不同工作表之间出现相同的值也算重复")
+        
+        # 历史索引：与以往处理过的文件比对
+        history_row = ttk.Frame(param_card)
+        history_row.pack(fill='x', pady=(8, 4))
+        
+        history_check = ttk.Checkbutton(history_row, text="与历史文件比对", variable=self.history3_var)
+        history_check.pack(side='left', padx=(0, 8))
+        create_tooltip(history_check, "勾选后标红在以往文件中出现过的值(如已发过的订单号)，\n并把本文件记入历史索引")
+        
+        ttk.Entry(history_row, textvariable=self.history3_path_var, width=40).pack(side='left', fill='x', expand=True, padx=(0, 8))
+        history_btn = ttk.Button(history_row, text="📂 索引文件", width=12, command=self._select_history3)
+        history_btn.pack(side='left')
+        create_tooltip(history_btn, "选择或新建历史索引文件(.sqlite)")
         
         # 提示信息
         hint_row = ttk.Frame(param_card)
@@ -158,11 +204,45 @@ class Tab3HighlightMixin:
                 self._update_combobox_options(self.sheet3_combo, self.sheet3_var, names)
                 self.logger3(f"  工作表: {', '.join(names)}")
     
+    def _select_other_files3(self):
+        """选择一起判断重复的其他文件"""
+        from tkinter import filedialog
+        paths = filedialog.askopenfilenames(
+            title="选择一起判断重复的其他Excel文件",
+            filetypes=[("表格文件", "*.xlsx;*.xlsm"), ("所有文件", "*.*")]
+        )
+        if paths:
+            self._set_other_files3(list(paths))
+            for path in paths:
+                self.logger3(f"已添加文件: {path}")
+    
+    def _select_history3(self):
+        """选择或新建历史索引文件"""
+        from tkinter import filedialog
+        current = self.history3_path_var.get() or DEFAULT_HISTORY_PATH
+        path = filedialog.asksaveasfilename(
+            title="选择或新建历史索引文件",
+            initialdir=os.path.dirname(current),
+            initialfile=os.path.basename(current),
+            defaultextension=".sqlite",
+            confirmoverwrite=False,
+            filetypes=[("历史索引", "*.sqlite"), ("所有文件", "*.*")]
+        )
+        if path:
+            self.history3_path_var.set(path)
+    
+    def _set_other_files3(self, paths):
+        self.other_files3 = paths
+        self.others3_label.config(text=f"已选择 {len(paths)} 个文件" if paths else "未选择")
+    
     def run_tool3(self):
         """执行高亮重复项"""
         file = self.file3_var.get()
         col = self.col3_var.get().strip()
         sheet = self.sheet3_var.get().strip() if hasattr(self, 'sheet3_var') else None
+        scope = self._SCOPE3_OPTIONS.get(self.scope3_var.get(), SCOPE_SHEET)
+        other_files = [path for path in getattr(self, 'other_files3', []) if path != file]
+        history_path = self.history3_path_var.get().strip() if self.history3_var.get() else ''
         
         if not file or file == "未选择文件":
             messagebox.showwarning("⚠️ 警告", "请先选择要处理的Excel文件。")
@@ -179,6 +259,12 @@ class Tab3HighlightMixin:
         else:
             self.logger3(f"  工作表: 全部")
         self.logger3(f"  目标列: {col}")
+        if history_path:
+            self.logger3(f"  历史索引: {history_path}")
+        elif other_files:
+            self.logger3(f"  其他文件: {len(other_files)} 个（合并判断）")
+        else:
+            self.logger3(f"  范围: {self.scope3_var.get()}")
         self.logger3("=" * 60)
         
         self._update_status("正在高亮重复项...", icon="⏳", show_progress=True)
@@ -189,7 +275,11 @@ class Tab3HighlightMixin:
                 def safe_logger(msg):
                     self.master.after(0, lambda m=msg: self.logger3(m))
                 
-                stats = highlight_duplicates(file, col, safe_logger, sheet)
+                if history_path:
+                    stats = highlight_history_duplicates(file, col, history_path, safe_logger, sheet)
+                    stats['files_processed'] = 1 if stats['cells_highlighted'] else 0
+                else:
+                    stats = highlight_duplicates(file, col, safe_logger, sheet, scope, other_files)
                 
                 def on_success():
                     self.master.config(cursor="")
@@ -199,13 +289,15 @@ class Tab3HighlightMixin:
                         f"✅ 高亮完成！\n\n"
                         f"处理工作表数: {stats['sheets_processed']}\n"
                         f"高亮单元格数: {stats['cells_highlighted']}\n\n"
-                        f"文件已保存: {os.path.basename(file)}"
+                        f"已保存文件数: {stats['files_processed']}"
                     )
                     messagebox.showinfo("✅ 完成", msg)
                     self.logger3("\n" + "=" * 60)
                     self.logger3(f"✅ 高亮完成")
                     self.logger3(f"  处理工作表: {stats['sheets_processed']} 个")
                     self.logger3(f"  高亮单元格: {stats['cells_highlighted']} 个")
+                    if 'keys_indexed' in stats:
+                        self.logger3(f"  记入历史: {stats['keys_indexed']} 个键")
                     self.logger3("=" * 60)
                 
                 self.master.after(0, on_success)
@@ -35,7 +35,7 @@ class Tab5CompareMixin:
         ttk.Button(f1, text="选择表格X", 
                   command=lambda: self.select_file_and_listbox(
                       self.file5_x_var, self.listbox5_x, 
-                      "选择要对比的表格X")).pack(side='left', padx=5)
+                      "选择要对比的表格X", allow_csv=True)).pack(side='left', padx=5)
         ttk.Label(f1, textvariable=self.file5_x_var).pack(side='left', padx=5)
 
         f2 = ttk.Frame(tab)
@@ -61,7 +61,7 @@ class Tab5CompareMixin:
         ttk.Button(f3, text="选择表格Y", 
                   command=lambda: self.select_file_and_sheets(
                       self.file5_y_var, self.sheet5_y_var, self.combo5_y, 
-                      "选择要对比的表格Y")).pack(side='left', padx=5)
+                      "选择要对比的表格Y", allow_csv=True)).pack(side='left', padx=5)
         ttk.Label(f3, textvariable=self.file5_y_var).pack(side='left', padx=5)
 
         f4 = ttk.Frame(tab)
@@ -37,7 +37,7 @@ class Tab9RouterMixin:
         ttk.Button(f1, text="选择收件信息表格", 
                   command=lambda: self.select_file_and_sheets(
                       self.file9_var, self.sheet9_var, self.combo9, 
-                      "选择收件信息表格")).pack(side='left', padx=5)
+                      "选择收件信息表格", allow_csv=True)).pack(side='left', padx=5)
         ttk.Label(f1, textvariable=self.file9_var).pack(side='left', padx=5)
 
         f2 = ttk.Frame(tab)
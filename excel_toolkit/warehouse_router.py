@@ -5,7 +5,7 @@ import os
 from typing import Dict, Set, Tuple, Optional, Callable, Any
 from excel_toolkit.excel_lite import ExcelReader, ExcelWriter
 from excel_toolkit.excel_lite import column_index_from_string
-# PatternFill functionality moved to ExcelWriter
+from excel_toolkit import sheet_cache
 from excel_toolkit.states import get_state_abbreviation
 
 # 常量定义
@@ -98,16 +98,14 @@ def _load_inventory(
     sku_by_wh = {}
     wh_state = {}
     
-    if file_ext in ['.xlsx', '.xlsm']:
-        # 使用openpyxl读取新版Excel
-        wb = ExcelReader(inventory_file)
-        for name in wb.sheetnames:
-            ws = wb[name]
+    if file_ext in ['.xlsx', '.xlsm', '.xls']:
+        # xlsx 的各仓库表在多个进程中并行解析；.xls 工作簿只打开一次，逐表读取后即卸载
+        wb = ExcelReader(inventory_file, cache=sheet_cache.is_enabled())
+        sheets = wb.load_sheets()
+        for name, ws in sheets.items():
             nm = str(name).strip()
             if nm == "仓库名和地址":
-                for r in range(1, ws.max_row + 1):
-                    wname = ws.cell(row=r, column=1).value
-                    wstate = ws.cell(row=r, column=2).value
+                for wname, wstate in ws.iter_rows(min_col=1, max_col=2, values_only=True):
                     if wname:
                         abbr = _state_to_abbr(wstate)
                         wh_state[str(wname).strip()] = abbr
@@ -117,9 +115,8 @@ def _load_inventory(
                             logger(f"映射：仓库='{str(wname).strip()}' 州='{abbr or wstate}{mark_state}{mark_name}'")
                 continue
             s = set()
-            for r in range(1, ws.max_row + 1):
-                v = ws.cell(row=r, column=1).value
-                if v is None:
+            for v in ws.column_values(1):
+                if v is None or v == '':
                     continue
                 s.add(str(v).strip())
             sku_by_wh[nm] = s
@@ -132,39 +129,6 @@ def _load_inventory(
                     logger(f"示例SKU：{', '.join(samples)}")
         wb.close()
     
-    elif file_ext == '.xls':
-        # 使用xlrd读取旧版Excel
-        import xlrd
-        wb = xlrd.open_workbook(inventory_file)
-        for name in wb.sheetnames:
-            ws = wb.sheet_by_name(name)
-            nm = str(name).strip()
-            if nm == "仓库名和地址":
-                for r in range(ws.nrows):
-                    wname = ws.cell_value(r, 0) if ws.ncols > 0 else None
-                    wstate = ws.cell_value(r, 1) if ws.ncols > 1 else None
-                    if wname:
-                        abbr = _state_to_abbr(wstate)
-                        wh_state[str(wname).strip()] = abbr
-                        if logger:
-                            mark_state = " (屏蔽)" if blocked_states and abbr in blocked_states else ""
-                            mark_name = " (屏蔽名称)" if blocked_names and str(wname).strip() in blocked_names else ""
-                            logger(f"映射：仓库='{str(wname).strip()}' 州='{abbr or wstate}{mark_state}{mark_name}'")
-                continue
-            s = set()
-            for r in range(ws.nrows):
-                v = ws.cell_value(r, 0) if ws.ncols > 0 else None
-                if v is None or v == '':
-                    continue
-                s.add(str(v).strip())
-            sku_by_wh[nm] = s
-            if logger:
-                logger(f"仓库表：{nm} SKU数量={len(s)}")
-                if s:
-                    samples = list(s)
-                    samples.sort()
-                    samples = samples[:10]
-                    logger(f"示例SKU：{', '.join(samples)}")
     else:
         raise ValueError(f"不支持的文件格式: {file_ext}，请使用 .xlsx, .xlsm 或 .xls 文件")
     
@@ -224,21 +188,14 @@ def process_warehouse_routing(
             logger(f"按名称屏蔽已启用：屏蔽仓库={', '.join(sorted(names_set))}")
     changes = 0
     for r in range(1, ws.max_row + 1):
-        dst_current = ws.cell(row=r, column=dst_col).value
+        dst_current = ws.value(r, dst_col)
         if dst_current is not None and str(dst_current).strip() != "":
-            try:
-                ws.cell(row=r, column=dst_col).fill = PatternFill(
-                    start_color=DEFAULT_HIGHLIGHT_COLOR, 
-                    end_color=DEFAULT_HIGHLIGHT_COLOR, 
-                    fill_type="solid"
-                )
-            except Exception:
-                pass
+            ws.fill(r, dst_col, DEFAULT_HIGHLIGHT_COLOR)
             if logger:
                 logger(f"第{r}行：目标列已有内容，已跳过并高亮")
             continue
-        sku = ws.cell(row=r, column=sku_col).value
-        st_raw = ws.cell(row=r, column=state_col).value
+        sku = ws.value(r, sku_col)
+        st_raw = ws.value(r, state_col)
         if sku is None or str(sku).strip() == "":
             continue
         st = _state_to_abbr(st_raw)
@@ -256,7 +213,7 @@ def process_warehouse_routing(
                     continue
                 candidates.append(wname)
         if not candidates:
-            ws.cell(row=r, column=dst_col).value = "无可发货仓"
+            ws.cell(row=r, column=dst_col, value="无可发货仓")
             if logger:
                 logger(f"第{r}行：SKU={sku} 无仓库可发货")
             continue
@@ -279,16 +236,16 @@ def process_warehouse_routing(
         if len(best_list) > 1:
             best_w = random.choice(best_list)
         if not best_w:
-            ws.cell(row=r, column=dst_col).value = "缺少仓库州映射"
+            ws.cell(row=r, column=dst_col, value="缺少仓库州映射")
             if logger:
                 logger(f"第{r}行：SKU={sku} 候选={len(candidates)} 但缺少仓库州映射，未能计算距离")
             continue
-        ws.cell(row=r, column=dst_col).value = best_w
+        ws.cell(row=r, column=dst_col, value=best_w)
         changes += 1
         if logger:
             logger(f"第{r}行：SKU={sku} 候选={len(candidates)} 选择={best_w}")
     try:
-        wb.save(file_name)
+        wb.save(file_name, logger=logger)
         wb.close()
         return f"路由完成！共写入 {changes} 行。"
     except PermissionError:
@@ -309,28 +266,22 @@ def write_inventory(
     sku_by_wh: Dict[str, Set[str]], 
     logger: Callable[[str], None] = print
 ) -> str:
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "仓库名和地址"
+    # 各工作表都按行号递增一次写完，用 constant_memory 逐行落盘，SKU很多时内存占用不随行数增长
     rows = sorted(list(wh_state.items()), key=lambda x: x[0])
-    for i, (w, st) in enumerate(rows, start=1):
-        ws.cell(row=i, column=1).value = str(w).strip()
-        ws.cell(row=i, column=2).value = _state_to_abbr(st)
+    sheets: Dict[str, Set[str]] = {}
     for w, skus in sku_by_wh.items():
         nm = str(w).strip()
         if nm == "":
             continue
-        ws2 = wb.create_sheet(nm)
-        if isinstance(skus, (set, list, tuple)):
-            items = sorted([str(x).strip() for x in skus if str(x).strip() != ""]) 
-        elif isinstance(skus, dict):
-            items = sorted([str(x).strip() for x in skus.keys() if str(x).strip() != ""]) 
+        if isinstance(skus, (set, list, tuple, dict)):
+            items = {str(x).strip() for x in skus if str(x).strip() != ""}
         else:
-            items = []
-        for i, sku in enumerate(items, start=1):
-            ws2.cell(row=i, column=1).value = sku
-    wb.save(file_path)
-    wb.close()
+            items = set()
+        sheets.setdefault(nm, set()).update(items)
+    with ExcelWriter(file_path, constant_memory=True) as wb:
+        wb.write_rows("仓库名和地址", ((str(w).strip(), _state_to_abbr(st)) for w, st in rows))
+        for nm, items in sheets.items():
+            wb.write_rows(nm, ((sku,) for sku in sorted(items)))
     if logger:
         logger(f"已生成库存文件：{file_path}")
     return f"已生成库存文件：{file_path}"
\ No newline at end of file
@@ -0,0 +1,1255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+xlsx 原地修改写入模块
+只重写有改动的工作表XML（以及需要时的 styles.xml），其余zip成员按原始压缩数据直接拷贝，
+单列修改的代价约等于对该工作表做一遍流式扫描。
+"""
+import copy
+import html
+import math
+import re
+import shutil
+import struct
+import zipfile
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from excel_toolkit.excel_lite import ExcelLiteError, _column_from_ref, _convert_cell_value, get_column_letter
+
+
+# 读取工作表XML的块大小
+_CHUNK_SIZE = 1 << 16
+
+# 工作表XML中的标签
+_SHEET_DATA_OPEN = re.compile(rb'<(?:[\w.-]+:)?sheetData\b[^>]*?(/?)>')
+_DIMENSION = re.compile(rb'(<(?:[\w.-]+:)?dimension\b[^>]*?\bref=")([^"]*)(")')
+_CELL = re.compile(rb'<(?:[\w.-]+:)?c\b([^>]*?)(?:/>|>(.*?)</(?:[\w.-]+:)?c>)', re.S)
+_CELL_WITHOUT_REF = re.compile(rb'<(?:[\w.-]+:)?c\b(?![^>]*\sr=")')
+
+# 属性
+_ATTR_R = re.compile(rb'\sr="([^"]*)"')
+_ATTR_S = re.compile(rb'\ss="(\d+)"')
+_ATTR_T = re.compile(rb'\st="([^"]*)"')
+_ATTR_SPANS = re.compile(rb'\sspans="[^"]*"')
+_ATTR_COUNT = re.compile(rb'\scount="\d+"')
+_ATTR_FILL_ID = re.compile(rb'\sfillId="\d+"')
+_ATTR_APPLY_FILL = re.compile(rb'\sapplyFill="[^"]*"')
+
+# 插入行时需要改写的引用：单元格的 r 属性（锚定在 <c 标签内，不会误改文本）、
+# 共享公式的 ref 范围、</sheetData> 之后的合并单元格/超链接/条件格式/数据验证范围
+_CELL_ROW_REF = re.compile(rb'(<(?:[\w.-]+:)?c\s(?:[^>]*?\s)?r="[A-Z]+)\d+(?=")')
+_FORMULA_REF = re.compile(rb'(<(?:[\w.-]+:)?f\b[^>]*?\sref=")([^"]*)(")')
+_RANGE_ATTR = re.compile(rb'(\s(?:ref|sqref)=")([^"]*)(")')
+_SQREF_ELEMENT = re.compile(rb'(<(?:[\w.-]+:)?sqref>)([^<]*)(<)')
+_REF_ROW = re.compile(rb'(\$?[A-Z]{1,3}\$?)(\d+)')
+
+# 删除列时需要改写的引用：单个区域端点（列可省略，如 '5:5'；行可省略，如 'A:C'）、
+# 列宽定义、视图中的活动单元格/选区，以及 </sheetData> 之后带范围的元素
+_REF_PART = re.compile(rb'(\$?)([A-Z]{1,3})?(\$?\d+)?$')
+_COL_ELEMENT = re.compile(rb'<(?:[\w.-]+:)?col\b[^>]*?/>')
+_ATTR_MIN = re.compile(rb'\smin="(\d+)"')
+_ATTR_MAX = re.compile(rb'\smax="(\d+)"')
+_VIEW_REF_ATTR = re.compile(rb'(\s(?:activeCell|sqref|topLeftCell)=")([^"]*)(")')
+_RANGE_ELEMENT = re.compile(
+    rb'<((?:[\w.-]+:)?(?:mergeCell|hyperlink|conditionalFormatting|dataValidation|ignoredError|protectedRange))\b'
+    rb'([^>]*?)(?:/>|>.*?</\1>)', re.S)
+_RANGE_CONTAINERS = ((b'mergeCells', b'mergeCell'), (b'dataValidations', b'dataValidation'),
+                     (b'hyperlinks', b'hyperlink'), (b'ignoredErrors', b'ignoredError'),
+                     (b'protectedRanges', b'protectedRange'))
+_FILTER_REF = re.compile(rb'(<(?:[\w.-]+:)?(?:autoFilter|sortState|sortCondition)\b[^>]*?\sref=")([^"]*)(")')
+
+# 共享公式：主单元格带公式文本和 ref 范围，同组其余单元格只有 si
+_SHARED_CHILD = re.compile(rb'<((?:[\w.-]+:)?f)\b[^>]*?\ssi="(\d+)"[^>]*?(?:/>|>[^<]*</\1>)')
+_FORMULA = re.compile(rb'<((?:[\w.-]+:)?f)\b([^>]*?)(?:/>|>([^<]*)</\1>)')
+_ATTR_SI = re.compile(rb'\ssi="(\d+)"')
+_ATTR_REF = re.compile(rb'\sref="([^"]*)"')
+
+# 公式文本中的字符串常量与带引号的工作表名（其中的内容不是引用）
+_FORMULA_QUOTED = re.compile(r'("(?:[^"]|"")*"|\'(?:[^\']|\'\')*\')')
+# 公式中的单元格引用、整列区域（A:C）、整行区域（1:5）
+_FORMULA_REFERENCE = re.compile(
+    r'(?<![\w.$])(?:(\$?)([A-Z]{1,3})(\$?)(\d+)|(\$?)([A-Z]{1,3}):(\$?)([A-Z]{1,3})|(\$?)(\d+):(\$?)(\d+))(?![\w(!])')
+
+# 单元格内的值与内联字符串文本
+_CELL_VALUE = re.compile(rb'<(?:[\w.-]+:)?v>([^<]*)</(?:[\w.-]+:)?v>')
+_CELL_TEXT = re.compile(rb'<(?:[\w.-]+:)?t\b[^>]*?(?:/>|>([^<]*)</(?:[\w.-]+:)?t>)')
+
+# styles.xml 中的填充与单元格格式
+_FILLS = re.compile(rb'(<(?:[\w.-]+:)?fills\b[^>]*>)(.*?)(</(?:[\w.-]+:)?fills>)', re.S)
+_CELL_XFS = re.compile(rb'(<(?:[\w.-]+:)?cellXfs\b[^>]*>)(.*?)(</(?:[\w.-]+:)?cellXfs>)', re.S)
+_XF = re.compile(rb'<(?:[\w.-]+:)?xf\b[^>]*?(?:/>|>.*?</(?:[\w.-]+:)?xf>)', re.S)
+_FILL = re.compile(rb'<(?:[\w.-]+:)?fill\b[^>]*?(?:/>|>.*?</(?:[\w.-]+:)?fill>)', re.S)
+
+# XML 1.0 不允许的控制字符
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# 计算链关系类型（被覆盖的公式单元格留在计算链里会让 Excel 报错，删除后 Excel 打开时自动重建）
+_CALC_CHAIN_TYPE = b'/calcChain'
+
+
+class _StylesPatch:
+    """在 styles.xml 中追加纯色填充和对应的单元格格式"""
+
+    def __init__(self, xml: bytes):
+        self.xml = xml
+        fills = _FILLS.search(xml)
+        cell_xfs = _CELL_XFS.search(xml)
+        if fills is None or cell_xfs is None:
+            raise ExcelLiteError("styles.xml 缺少 fills 或 cellXfs，无法设置填充色")
+        self._fill_count = len(_FILL.findall(fills.group(2)))
+        self._xfs = _XF.findall(cell_xfs.group(2))
+        self._new_fills = []
+        self._new_xfs = []
+        self._fill_ids: Dict[str, int] = {}
+        self._styles: Dict[Tuple[int, str], int] = {}
+
+    @property
+    def changed(self) -> bool:
+        return bool(self._new_xfs)
+
+    def style_with_fill(self, style_id: int, color: str) -> int:
+        """返回在原格式 style_id 基础上改为纯色填充 color 的格式索引"""
+        key = (style_id, color)
+        new_id = self._styles.get(key)
+        if new_id is not None:
+            return new_id
+
+        fill_id = self._fill_ids.get(color)
+        if fill_id is None:
+            fill_id = self._fill_count + len(self._new_fills)
+            self._new_fills.append(
+                b'<fill><patternFill patternType="solid"><fgColor rgb="' + color.encode('ascii') +
+                b'"/><bgColor indexed="64"/></patternFill></fill>'
+            )
+            self._fill_ids[color] = fill_id
+
+        base = self._xfs[style_id] if 0 <= style_id < len(self._xfs) else b'<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        head_end = base.index(b'>')
+        if base[head_end - 1:head_end] == b'/':
+            head_end -= 1
+        head = _ATTR_APPLY_FILL.sub(b'', _ATTR_FILL_ID.sub(b'', base[:head_end]))
+        xf = head + b' fillId="%d" applyFill="1"' % fill_id + base[head_end:]
+
+        new_id = len(self._xfs) + len(self._new_xfs)
+        self._new_xfs.append(xf)
+        self._styles[key] = new_id
+        return new_id
+
+    def to_bytes(self) -> bytes:
+        xml = self.xml
+        if self._new_fills:
+            xml = _FILLS.sub(lambda m: _with_count(m.group(1), self._fill_count + len(self._new_fills)) +
+                             m.group(2) + b''.join(self._new_fills) + m.group(3), xml, count=1)
+        if self._new_xfs:
+            xml = _CELL_XFS.sub(lambda m: _with_count(m.group(1), len(self._xfs) + len(self._new_xfs)) +
+                                m.group(2) + b''.join(self._new_xfs) + m.group(3), xml, count=1)
+        return xml
+
+
+# 列号 -> 列字母（bytes）缓存
+_COLUMN_LETTERS: Dict[int, bytes] = {}
+
+
+def _column_letter(col: int) -> bytes:
+    letters = _COLUMN_LETTERS.get(col)
+    if letters is None:
+        letters = _COLUMN_LETTERS[col] = get_column_letter(col).encode('ascii')
+    return letters
+
+
+def _with_count(open_tag: bytes, count: int) -> bytes:
+    """设置开始标签的 count 属性"""
+    tag = _ATTR_COUNT.sub(b'', open_tag)
+    return tag[:-1] + b' count="%d">' % count
+
+
+def _normalize_color(color: str) -> str:
+    """'FFF59E' / '#FFF59E' -> 'FFFFF59E'"""
+    color = str(color).strip().lstrip('#').upper()
+    if len(color) == 6:
+        color = 'FF' + color
+    if len(color) != 8 or any(c not in '0123456789ABCDEF' for c in color):
+        raise ExcelLiteError(f"无效的颜色值: {color}")
+    return color
+
+
+def _cell_xml(prefix: bytes, ref: bytes, style: Optional[int], value: Any) -> bytes:
+    """生成单个单元格的XML；文本一律写成内联字符串，不改动共享字符串表"""
+    attrs = b' r="' + ref + b'"'
+    if style:
+        attrs += b' s="%d"' % style
+
+    if value is None or value == '':
+        return b'<' + prefix + b'c' + attrs + b'/>' if style else b''
+    if isinstance(value, bool):
+        return b'<%sc%s t="b"><%sv>%d</%sv></%sc>' % (prefix, attrs, prefix, int(value), prefix, prefix)
+    if isinstance(value, (int, float)) and not (isinstance(value, float) and not math.isfinite(value)):
+        text = repr(value).encode('ascii')
+        return b'<%sc%s><%sv>%s</%sv></%sc>' % (prefix, attrs, prefix, text, prefix, prefix)
+
+    text = _ILLEGAL_XML_CHARS.sub('', str(value))
+    space = b' xml:space="preserve"' if text != text.strip() else b''
+    return (b'<%sc%s t="inlineStr"><%sis><%st%s>' % (prefix, attrs, prefix, prefix, space) +
+            escape(text).encode('utf-8') + b'</%st></%sis></%sc>' % (prefix, prefix, prefix))
+
+
+def _translate_formula(formula: str, rows: int, cols: int) -> str:
+    """把公式中的相对引用平移 rows 行、cols 列（绝对引用不变，移出表格的引用写成 #REF!）"""
+
+    def shift_col(dollar: str, letters: str) -> Optional[str]:
+        if dollar:
+            return dollar + letters
+        col = _column_from_ref(letters) + cols
+        return get_column_letter(col) if col >= 1 else None
+
+    def shift_row(dollar: str, digits: str) -> Optional[str]:
+        if dollar:
+            return dollar + digits
+        row = int(digits) + rows
+        return str(row) if row >= 1 else None
+
+    def replace(match) -> str:
+        groups = match.groups()
+        if groups[1] is not None:
+            parts = (shift_col(groups[0], groups[1]), shift_row(groups[2], groups[3]))
+            return '#REF!' if None in parts else parts[0] + parts[1]
+        if groups[5] is not None:
+            parts = (shift_col(groups[4], groups[5]), shift_col(groups[6], groups[7]))
+        else:
+            parts = (shift_row(groups[8], groups[9]), shift_row(groups[10], groups[11]))
+        return '#REF!' if None in parts else parts[0] + ':' + parts[1]
+
+    pieces = _FORMULA_QUOTED.split(formula)
+    # 奇数位置是引号内的内容，原样保留
+    return ''.join(piece if i % 2 else _FORMULA_REFERENCE.sub(replace, piece) for i, piece in enumerate(pieces))
+
+
+class _SharedFormulas:
+    """共享公式的主单元格被覆盖或删除后，把同组其余单元格展开成各自的普通公式
+
+    否则这些单元格只剩 <f t="shared" si=".."/>，找不到主单元格，Excel 打开时会提示修复。
+    主单元格总在同组其余单元格之前（按行、列顺序），流式处理时先记下主公式即可。
+    """
+
+    def __init__(self):
+        # {si: (公式文本, 主单元格行号, 主单元格列号, 共享范围的最后一行)}
+        self.masters: Dict[bytes, Tuple[str, int, int, int]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.masters)
+
+    def capture(self, cell_xml: bytes, row: int, col: int):
+        """cell_xml 即将被覆盖或删除：是共享公式主单元格时记下其公式"""
+        if b' ref="' not in cell_xml:
+            return
+        for match in _FORMULA.finditer(cell_xml):
+            attrs = match.group(2)
+            if b't="shared"' not in attrs:
+                continue
+            si, ref = _ATTR_SI.search(attrs), _ATTR_REF.search(attrs)
+            if si is None or ref is None or match.group(3) is None:
+                continue
+            last = ref.group(1).rsplit(b':', 1)[-1].lstrip(b'$ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+            self.masters[si.group(1)] = (_xml_text(match.group(3)), row, col, int(last or row))
+
+    def expire(self, row: int):
+        """去掉共享范围已经结束的主公式"""
+        if any(last < row for *_, last in self.masters.values()):
+            self.masters = {si: master for si, master in self.masters.items() if master[3] >= row}
+
+    def expand(self, row: int, inner: bytes) -> bytes:
+        """把一行中属于已记下主公式的共享单元格展开成普通公式"""
+        if b' si="' not in inner:
+            return inner
+        col = 0
+
+        def expand_cell(match) -> bytes:
+            nonlocal col
+            cell = match.group(0)
+            ref = _ATTR_R.search(match.group(1))
+            col = _column_from_ref(ref.group(1).decode('ascii')) if ref else col + 1
+            if b' si="' not in cell:
+                return cell
+            child = _SHARED_CHILD.search(cell)
+            master = self.masters.get(child.group(2)) if child is not None else None
+            if master is None:
+                return cell
+            formula, master_row, master_col, _ = master
+            text = escape(_translate_formula(formula, row - master_row, col - master_col)).encode('utf-8')
+            tag = child.group(1)
+            return cell[:child.start()] + b'<' + tag + b'>' + text + b'</' + tag + b'>' + cell[child.end():]
+
+        return _CELL.sub(expand_cell, inner)
+
+
+class _SheetRewriter:
+    """按行流式重写工作表XML：有改动的行重新生成，其余字节原样输出"""
+
+    def __init__(self, values: Dict[int, Dict[int, Any]], fills: Dict[int, Dict[int, str]],
+                 styles: Optional[_StylesPatch]):
+        self.values = values
+        self.fills = fills
+        self.styles = styles
+        self.pending = deque(sorted(set(values) | set(fills)))
+        self.prefix = b''
+        max_row = self.pending[-1] if self.pending else 0
+        max_col = max((col for cols in (*values.values(), *fills.values()) for col in cols), default=0)
+        self.extent = (max_row, max_col)
+        self.shared = _SharedFormulas()
+
+    def rewrite(self, src, dst):
+        buffer = b''
+        # <sheetData> 之前的部分：更新 dimension
+        while True:
+            chunk = src.read(_CHUNK_SIZE)
+            buffer += chunk
+            match = _SHEET_DATA_OPEN.search(buffer)
+            if match is not None:
+                break
+            if not chunk:
+                raise ExcelLiteError("工作表XML缺少 sheetData")
+        dst.write(self._update_dimension(buffer[:match.start()]))
+
+        open_tag = match.group(0)
+        self.prefix = open_tag[1:open_tag.index(b'sheetData')]
+        self._row_open = b'<' + self.prefix + b'row'
+        self._row_close = b'</' + self.prefix + b'row>'
+        self._data_close = b'</' + self.prefix + b'sheetData>'
+        if match.group(1):
+            # <sheetData/>：展开并写入全部新行
+            dst.write(open_tag[:-2] + b'>')
+            dst.write(self._new_rows_before(None))
+            dst.write(self._data_close)
+            buffer = buffer[match.end():]
+        else:
+            dst.write(match.group(0))
+            buffer = self._rewrite_rows(src, dst, buffer[match.end():])
+
+        self._write_tail(src, dst, buffer)
+
+    def _write_tail(self, src, dst, buffer: bytes):
+        """</sheetData> 及之后的内容原样输出"""
+        dst.write(buffer)
+        shutil.copyfileobj(src, dst, _CHUNK_SIZE)
+
+    def _rewrite_rows(self, src, dst, buffer: bytes) -> bytes:
+        """逐行处理 sheetData 内容，返回 </sheetData> 及之后已读入的字节"""
+        pos = 0      # 下一次查找的位置
+        flushed = 0  # buffer 中已输出的位置
+        row_number = 0
+        eof = False
+        # 输出先攒在列表里，每读入一块写出一次，减少压缩流的写调用
+        out = []
+        # 覆盖了共享公式主单元格时，还要继续处理同组其余单元格所在的行
+        while self.pending or self.shared:
+            row = self._find_row(buffer, pos)
+            if row is None:
+                # 当前行不完整，把之前的内容原样写出后继续读入
+                if eof:
+                    raise ExcelLiteError("工作表XML不完整")
+                start = self._incomplete_start(buffer, pos)
+                out.append(buffer[flushed:start])
+                dst.write(b''.join(out))
+                out.clear()
+                chunk = src.read(_CHUNK_SIZE)
+                eof = not chunk
+                buffer = buffer[start:] + chunk
+                pos = flushed = 0
+                continue
+            start, end, attrs, inner = row
+            if attrs is None:
+                # </sheetData>
+                out.append(buffer[flushed:start])
+                out.append(self._new_rows_before(None))
+                dst.write(b''.join(out))
+                return buffer[start:]
+
+            ref = _ATTR_R.search(attrs)
+            row_number = int(ref.group(1)) if ref else row_number + 1
+            pos = end
+            if not self.pending or self.pending[0] > row_number:
+                # 没有改动的行留在缓冲区，稍后整段写出
+                new_inner = self._expand_shared(row_number, inner)
+                if new_inner is not inner:
+                    out.append(buffer[flushed:start])
+                    out.append(self._row_xml(attrs, new_inner))
+                    flushed = pos
+                continue
+
+            out.append(buffer[flushed:start])
+            out.append(self._new_rows_before(row_number))
+            if self.pending and self.pending[0] == row_number:
+                self.pending.popleft()
+                out.append(self._rewrite_row(row_number, attrs, inner))
+            else:
+                out.append(buffer[start:pos])
+            flushed = pos
+        # 所有改动都已写出，剩余内容原样拷贝
+        dst.write(b''.join(out))
+        return buffer[flushed:]
+
+    def _find_row(self, buffer: bytes, pos: int):
+        """查找 pos 之后的下一行（按字面标签查找，不用正则逐个 '<' 试探）
+
+        Returns:
+            (开始, 结束, 属性, 行内XML)；先遇到 </sheetData> 时为 (其位置, -1, None, None)；
+            下一行还不完整、需要继续读入时为 None
+        """
+        start = buffer.find(self._row_open, pos)
+        close = buffer.find(self._data_close, pos, start if start >= 0 else len(buffer))
+        if close >= 0:
+            return close, -1, None, None
+        if start < 0:
+            return None
+        head_end = buffer.find(b'>', start)
+        if head_end < 0:
+            return None
+        attrs_start = start + len(self._row_open)
+        if buffer[head_end - 1] == 0x2F:
+            # 自闭合的空行 <row .../>
+            return start, head_end + 1, buffer[attrs_start:head_end - 1], b''
+        end = buffer.find(self._row_close, head_end)
+        if end < 0:
+            return None
+        return start, end + len(self._row_close), buffer[attrs_start:head_end], buffer[head_end + 1:end]
+
+    def _incomplete_start(self, buffer: bytes, pos: int) -> int:
+        """不完整的行（或结束标签）在 buffer 中的开始位置，从这里开始与下一块拼接"""
+        start = buffer.find(self._row_open, pos)
+        return start if start >= 0 else max(buffer.rfind(b'<', pos), pos)
+
+    def _new_rows_before(self, row_number: Optional[int]) -> bytes:
+        """生成原文件中不存在、行号小于 row_number 的新行（None 表示全部）"""
+        parts = []
+        while self.pending and (row_number is None or self.pending[0] < row_number):
+            new_row = self.pending.popleft()
+            parts.append(self._rewrite_row(new_row, b' r="%d"' % new_row, b''))
+        return b''.join(parts)
+
+    def _expand_shared(self, row_number: int, inner: bytes) -> bytes:
+        """展开一行中主单元格已被覆盖的共享公式；没有要展开的内容时原样返回 inner"""
+        if not self.shared or not inner:
+            return inner
+        self.shared.expire(row_number)
+        new_inner = self.shared.expand(row_number, inner) if self.shared else inner
+        return inner if new_inner == inner else new_inner
+
+    def _row_xml(self, attrs: bytes, inner: bytes) -> bytes:
+        prefix = self.prefix
+        return b'<' + prefix + b'row' + attrs + b'>' + inner + b'</' + prefix + b'row>'
+
+    def _rewrite_row(self, row_number: int, attrs: bytes, inner: bytes) -> bytes:
+        prefix = self.prefix
+        values = self.values.get(row_number, {})
+        fills = self.fills.get(row_number, {})
+        if values and b' ref="' in inner:
+            # 要覆盖的单元格是共享公式的主单元格时，先记下公式供同组其余单元格展开
+            col = 0
+            for cell in _CELL.finditer(inner):
+                ref = _ATTR_R.search(cell.group(1))
+                col = _column_from_ref(ref.group(1).decode('ascii')) if ref else col + 1
+                if col in values:
+                    self.shared.capture(cell.group(0), row_number, col)
+        inner = self._expand_shared(row_number, inner)
+        # 行上的 spans 只是提示信息，列范围可能变化，直接去掉
+        attrs = _ATTR_SPANS.sub(b'', attrs)
+        row_open = b'<' + prefix + b'row' + attrs + b'>'
+        row_close = b'</' + prefix + b'row>'
+
+        if not fills and inner:
+            # 常见情况：只在该行已有单元格之后写入值（如填充新列），直接追加
+            start = inner.rfind(b'<' + prefix + b'c ')
+            last = _CELL.match(inner, start) if start >= 0 else None
+            last_ref = _ATTR_R.search(last.group(1)) if last is not None and not inner[last.end():].strip() else None
+            if last_ref is not None and min(values) > _column_from_ref(last_ref.group(1).decode('ascii')):
+                row_suffix = b'%d' % row_number
+                new_cells = b''.join(
+                    _cell_xml(prefix, _column_letter(col) + row_suffix, 0, values[col]) for col in sorted(values)
+                )
+                return row_open + inner + new_cells + row_close
+
+        if fills and not values and inner:
+            # 只改填充色（如高亮重复项）：单元格都带 r 属性时原地替换样式属性
+            body = self._restyle_cells(row_number, inner, fills)
+            if body is not None:
+                return row_open + body + row_close
+
+        # 原有单元格 {列号: (样式, 原始XML)}
+        cells: Dict[int, Tuple[int, bytes]] = {}
+        col = 0
+        for cell in _CELL.finditer(inner):
+            cell_attrs = cell.group(1)
+            ref = _ATTR_R.search(cell_attrs)
+            col = _column_from_ref(ref.group(1).decode('ascii')) if ref else col + 1
+            style = _ATTR_S.search(cell_attrs)
+            cells[col] = (int(style.group(1)) if style else 0, cell.group(0))
+        # 单元格之外的内容（如扩展数据）保留在行尾
+        tail = _CELL.sub(b'', inner).strip()
+
+        for col in sorted(set(values) | set(fills)):
+            style, old_xml = cells.get(col, (0, b''))
+            if col in fills:
+                style = self.styles.style_with_fill(style, fills[col])
+            ref = _column_letter(col) + b'%d' % row_number
+            if col in values:
+                cells[col] = (style, _cell_xml(prefix, ref, style, values[col]))
+            elif old_xml:
+                # 只改填充色：保留原值，替换样式
+                head_end = old_xml.index(b'>')
+                if old_xml[head_end - 1:head_end] == b'/':
+                    head_end -= 1
+                head = _ATTR_S.sub(b'', old_xml[:head_end])
+                cells[col] = (style, head + b' s="%d"' % style + old_xml[head_end:])
+            else:
+                cells[col] = (style, _cell_xml(prefix, ref, style, None))
+
+        body = b''.join(cells[col][1] for col in sorted(cells)) + tail
+        return row_open + body + row_close
+
+    def _restyle_cells(self, row_number: int, inner: bytes, fills: Dict[int, str]) -> Optional[bytes]:
+        """按 r 属性定位要改填充色的单元格并替换其 s 属性；有单元格定位不到时返回 None"""
+        cell_open = b'<' + self.prefix + b'c '
+        row_suffix = b'%d"' % row_number
+        edits = []
+        for col, color in fills.items():
+            pos = inner.find(b' r="' + _column_letter(col) + row_suffix)
+            if pos < 0:
+                return None
+            start = inner.rfind(b'<', 0, pos)
+            end = inner.find(b'>', pos)
+            if start < 0 or end < 0 or not inner.startswith(cell_open, start) or inner.find(b'>', start, pos) >= 0:
+                return None
+            if inner[end - 1:end] == b'/':
+                end -= 1
+            head = inner[start:end]
+            style = _ATTR_S.search(head)
+            style = self.styles.style_with_fill(int(style.group(1)) if style else 0, color)
+            edits.append((start, end, _ATTR_S.sub(b'', head) + b' s="%d"' % style))
+        edits.sort()
+        parts = []
+        last = 0
+        for start, end, head in edits:
+            parts.append(inner[last:start])
+            parts.append(head)
+            last = end
+        parts.append(inner[last:])
+        return b''.join(parts)
+
+    def _update_dimension(self, head: bytes) -> bytes:
+        max_row, max_col = self.extent
+        if not max_row:
+            return head
+
+        def replace(match):
+            ref = match.group(2).decode('ascii')
+            start, _, end = ref.partition(':')
+            end = end or start
+            end_col = max(_column_from_ref(end), max_col)
+            end_row = max(int(end.lstrip('$ABCDEFGHIJKLMNOPQRSTUVWXYZ') or 0), max_row)
+            new_ref = f"{start or 'A1'}:{get_column_letter(end_col)}{end_row}"
+            return match.group(1) + new_ref.encode('ascii') + match.group(3)
+
+        return _DIMENSION.sub(replace, head, count=1)
+
+
+def _xml_text(raw: bytes) -> str:
+    """XML 文本节点的原始字节 -> 字符串（还原实体引用）"""
+    text = raw.decode('utf-8')
+    return html.unescape(text) if '&' in text else text
+
+
+def _decode_cell(attrs: bytes, inner: Optional[bytes], shared_strings) -> Any:
+    """按与 ExcelReader 相同的规则取出单元格的值"""
+    if not inner:
+        return ''
+    cell_type = _ATTR_T.search(attrs)
+    cell_type = cell_type.group(1) if cell_type else b''
+    if cell_type == b'inlineStr':
+        # 富文本的各段直接拼接（实体引用不会跨段）
+        return _xml_text(b''.join(_CELL_TEXT.findall(inner)))
+    value = _CELL_VALUE.search(inner)
+    return _convert_cell_value(cell_type.decode('ascii'), _xml_text(value.group(1)) if value else None,
+                               shared_strings)
+
+
+def _column_cell_pattern(col: int):
+    """匹配一行中第 col 列（带 r 属性的）单元格的正则；group(1) 为属性，group(2) 为内容"""
+    return re.compile(rb'<(?:[\w.-]+:)?c\b([^>]*?\sr="' + _column_letter(col) +
+                      rb'\d+"[^>]*?)(?:/>|>(.*?)</(?:[\w.-]+:)?c>)', re.S)
+
+
+def _row_cell_value(inner: bytes, src_col: int, pattern, shared_strings) -> Any:
+    """取出一行中 src_col 列单元格的值（pattern 为 _column_cell_pattern(src_col)），没有该单元格时为空串"""
+    if not inner:
+        return ''
+    # 常见情况：单元格带 r 属性，按引用直接定位
+    cell = pattern.search(inner)
+    if cell is not None:
+        return _decode_cell(cell.group(1), cell.group(2), shared_strings)
+    if _CELL_WITHOUT_REF.search(inner) is None:
+        return ''
+    # 有不带 r 属性的单元格时逐个单元格顺延列号
+    col = 0
+    for cell in _CELL.finditer(inner):
+        cell_ref = _ATTR_R.search(cell.group(1))
+        col = _column_from_ref(cell_ref.group(1).decode('ascii')) if cell_ref else col + 1
+        if col == src_col:
+            return _decode_cell(cell.group(1), cell.group(2), shared_strings)
+        if col > src_col:
+            break
+    return ''
+
+
+def iter_column_values(src, columns: Tuple[int, ...], shared_strings, min_row: int = 1,
+                       max_row: Optional[int] = None) -> Iterator[Tuple[int, List[Any]]]:
+    """流式读取工作表XML中指定的几列，产出 (行号, [各列的值])
+
+    每读入一块XML按行结束标签切开，再按 r 属性直接定位单元格，不解析其他列；
+    行里没有该列单元格时值为空串，空行不产出。
+    """
+    patterns = [_column_cell_pattern(col) for col in columns]
+    buffer = b''
+    while True:
+        chunk = src.read(_CHUNK_SIZE)
+        buffer += chunk
+        match = _SHEET_DATA_OPEN.search(buffer)
+        if match is not None:
+            break
+        if not chunk:
+            raise ExcelLiteError("工作表XML缺少 sheetData")
+    if match.group(1):
+        return
+    open_tag = match.group(0)
+    prefix = open_tag[1:open_tag.index(b'sheetData')]
+    row_open = b'<' + prefix + b'row'
+    row_close = b'</' + prefix + b'row>'
+    data_close = b'</' + prefix + b'sheetData>'
+    buffer = buffer[match.end():]
+    row_number = 0
+    while True:
+        end = buffer.find(data_close)
+        if end < 0:
+            # 最后一段可能是不完整的行，留到下一块
+            chunk = src.read(_CHUNK_SIZE)
+            if not chunk:
+                raise ExcelLiteError("工作表XML不完整")
+            *parts, tail = buffer.split(row_close)
+        else:
+            parts = buffer[:end].split(row_close)
+        for part in parts:
+            # 每段以一个非空行结束，之前可能还有几个自闭合的空行
+            start = part.rfind(row_open)
+            head_end = part.find(b'>', start)
+            if start < 0 or head_end < 0:
+                continue
+            ref = _ATTR_R.search(part, start, head_end)
+            if ref is not None:
+                row_number = int(ref.group(1))
+            else:
+                row_number += part.count(row_open, 0, start) + 1
+            if max_row and row_number > max_row:
+                return
+            if row_number < min_row:
+                continue
+            inner = part[head_end + 1:]
+            yield row_number, [_row_cell_value(inner, col, pattern, shared_strings)
+                               for col, pattern in zip(columns, patterns)]
+        if end >= 0:
+            return
+        buffer = tail + chunk
+
+
+class _ColumnTransform(_SheetRewriter):
+    """流式单列变换：逐行取出源列的值交给 fn，fn 返回非 None 时把结果写入目标列
+
+    源列可以是多列（如州名列+邮编列），fn 按顺序收到各列的值。
+    只重新生成有改动的行，其余字节原样输出；任何时刻只持有一块XML和当前行的修改，
+    内存占用与行数无关。
+    """
+
+    def __init__(self, src_cols: Tuple[int, ...], fn: Callable[..., Any], shared_strings,
+                 dst_col: Optional[int] = None, min_row: int = 1):
+        super().__init__({}, {}, None)
+        self.src_cols = tuple(src_cols)
+        self.dst_col = dst_col or self.src_cols[0]
+        self.fn = fn
+        self.shared_strings = shared_strings
+        self.min_row = min_row
+        self.changed = 0
+        self._src_patterns = [_column_cell_pattern(col) for col in self.src_cols]
+        # 写入的列可能超出原声明范围
+        self.extent = (1, self.dst_col)
+
+    def _rewrite_rows(self, src, dst, buffer: bytes) -> bytes:
+        """逐行处理 sheetData 内容，返回 </sheetData> 及之后已读入的字节"""
+        pos = 0
+        flushed = 0
+        row_number = 0
+        eof = False
+        out = []
+        while True:
+            row = self._find_row(buffer, pos)
+            if row is None:
+                if eof:
+                    raise ExcelLiteError("工作表XML不完整")
+                start = self._incomplete_start(buffer, pos)
+                out.append(buffer[flushed:start])
+                dst.write(b''.join(out))
+                out.clear()
+                chunk = src.read(_CHUNK_SIZE)
+                eof = not chunk
+                buffer = buffer[start:] + chunk
+                pos = flushed = 0
+                continue
+            start, end, attrs, inner = row
+            if attrs is None:
+                out.append(buffer[flushed:start])
+                dst.write(b''.join(out))
+                return buffer[start:]
+
+            ref = _ATTR_R.search(attrs)
+            row_number = int(ref.group(1)) if ref else row_number + 1
+            pos = end
+            if row_number < self.min_row:
+                continue
+
+            value = self.fn(*[_row_cell_value(inner, col, pattern, self.shared_strings)
+                              for col, pattern in zip(self.src_cols, self._src_patterns)])
+            if value is None:
+                # 不改动的行里也可能有主单元格已被覆盖的共享公式
+                new_inner = self._expand_shared(row_number, inner)
+                if new_inner is not inner:
+                    out.append(buffer[flushed:start])
+                    out.append(self._row_xml(attrs, new_inner))
+                    flushed = pos
+                continue
+            self.values = {row_number: {self.dst_col: value}}
+            out.append(buffer[flushed:start])
+            out.append(self._rewrite_row(row_number, attrs, inner))
+            flushed = pos
+            self.changed += 1
+
+
+class _RowInserter(_SheetRewriter):
+    """流式插入行：一遍扫描工作表，把新行插在指定行之后，其后的行整体下移
+
+    插入点之前的行原样输出，之后的行只改写行号与单元格引用（以及共享公式的范围），
+    合并单元格、超链接、条件格式、数据验证的范围和 dimension 按同样的规则下移。
+    单元格公式中的引用不做调整（与 openpyxl 的 insert_rows 一致）。
+    总耗时与工作表大小成正比，与插入的行数无关。
+    """
+
+    def __init__(self, insertions: Dict[int, List[List[Any]]], fill: Optional[str] = None):
+        """
+        Args:
+            insertions: {行号: [新行的值列表, ...]}，新行插在该行之后（0 表示插在最前面），
+                值从A列开始依次写入
+            fill: 新行单元格的填充色，None 表示不设置
+        """
+        super().__init__({}, {}, None)
+        self.insertions = {row: rows for row, rows in insertions.items() if rows}
+        self.fill = _normalize_color(fill) if fill else None
+        self.pending = deque(sorted(self.insertions))
+        # 各插入点及其之前（不含）累计插入的行数，用于计算任意行号的新位置
+        self._points = list(self.pending)
+        self._shifts = [0]
+        for point in self._points:
+            self._shifts.append(self._shifts[-1] + len(self.insertions[point]))
+        self.inserted = self._shifts[-1]
+        self.offset = 0
+        self._style = None
+
+    def _shift(self, row_number: int) -> int:
+        """原行号 -> 插入后的行号"""
+        return row_number + self._shifts[bisect_left(self._points, row_number)]
+
+    def _shift_refs(self, refs: bytes) -> bytes:
+        """'A5' / 'A5:C9' / 'A1:A3 C7' 中的行号按插入后的位置改写"""
+        return _REF_ROW.sub(lambda m: m.group(1) + b'%d' % self._shift(int(m.group(2))), refs)
+
+    def _shift_attr(self, match) -> bytes:
+        return match.group(1) + self._shift_refs(match.group(2)) + match.group(3)
+
+    def _update_dimension(self, head: bytes) -> bytes:
+        if not self.inserted:
+            return head
+
+        def replace(match):
+            ref = match.group(2).decode('ascii')
+            start, _, end = ref.partition(':')
+            end = end or start
+            start_col = _column_from_ref(start)
+            start_row = int(start.lstrip('$ABCDEFGHIJKLMNOPQRSTUVWXYZ') or 1)
+            end_col = max(_column_from_ref(end), max(len(values) for rows in self.insertions.values() for values in rows))
+            end_row = int(end.lstrip('$ABCDEFGHIJKLMNOPQRSTUVWXYZ') or 0)
+            # 插在最前面的新行从A1开始；插在原范围之后的新行扩展结束行
+            if self._points[0] == 0:
+                start_col, start_row = 1, 1
+            else:
+                start_row = self._shift(start_row)
+            end_row = max(self._shift(end_row), self._points[-1] + self.inserted)
+            new_ref = f"{get_column_letter(start_col)}{start_row}:{get_column_letter(end_col)}{end_row}"
+            return match.group(1) + new_ref.encode('ascii') + match.group(3)
+
+        return _DIMENSION.sub(replace, head, count=1)
+
+    def _write_tail(self, src, dst, buffer: bytes):
+        """</sheetData> 之后的范围引用（合并单元格等）一并下移"""
+        if not self.inserted:
+            return super()._write_tail(src, dst, buffer)
+        tail = buffer + src.read()
+        tail = _RANGE_ATTR.sub(self._shift_attr, tail)
+        dst.write(_SQREF_ELEMENT.sub(self._shift_attr, tail))
+
+    def _rewrite_rows(self, src, dst, buffer: bytes) -> bytes:
+        """逐行处理 sheetData 内容，返回 </sheetData> 及之后已读入的字节"""
+        pos = 0
+        flushed = 0
+        row_number = 0
+        eof = False
+        out = []
+        while True:
+            row = self._find_row(buffer, pos)
+            if row is None:
+                if eof:
+                    raise ExcelLiteError("工作表XML不完整")
+                start = self._incomplete_start(buffer, pos)
+                out.append(buffer[flushed:start])
+                dst.write(b''.join(out))
+                out.clear()
+                chunk = src.read(_CHUNK_SIZE)
+                eof = not chunk
+                buffer = buffer[start:] + chunk
+                pos = flushed = 0
+                continue
+            start, end, attrs, inner = row
+            if attrs is None:
+                out.append(buffer[flushed:start])
+                out.append(self._new_rows_before(None))
+                dst.write(b''.join(out))
+                return buffer[start:]
+
+            ref = _ATTR_R.search(attrs)
+            row_number = int(ref.group(1)) if ref else row_number + 1
+            pos = end
+            if not self.offset and not (self.pending and self.pending[0] < row_number):
+                # 第一个插入点之前的行原样保留
+                continue
+
+            out.append(buffer[flushed:start])
+            out.append(self._new_rows_before(row_number))
+            if ref is not None:
+                out.append(self._renumber_row(row_number, attrs, inner))
+            else:
+                # 没有 r 属性的行按位置编号，插入新行后自然顺延
+                out.append(buffer[start:pos])
+            flushed = pos
+
+    def _renumber_row(self, row_number: int, attrs: bytes, inner: bytes) -> bytes:
+        prefix = self.prefix
+        new_number = b'%d' % (row_number + self.offset)
+        attrs = _ATTR_R.sub(b' r="' + new_number + b'"', attrs, count=1)
+        if not inner:
+            return b'<' + prefix + b'row' + attrs + b'/>'
+        inner = _CELL_ROW_REF.sub(b'\\g<1>' + new_number, inner)
+        if b' ref="' in inner:
+            inner = _FORMULA_REF.sub(self._shift_attr, inner)
+        return b'<' + prefix + b'row' + attrs + b'>' + inner + b'</' + prefix + b'row>'
+
+    def _new_rows_before(self, row_number: Optional[int]) -> bytes:
+        """生成插入点在 row_number 之前的新行（None 表示全部）"""
+        prefix = self.prefix
+        parts = []
+        while self.pending and (row_number is None or self.pending[0] < row_number):
+            point = self.pending.popleft()
+            for values in self.insertions[point]:
+                self.offset += 1
+                new_row = point + self.offset
+                row_suffix = b'%d' % new_row
+                cells = b''.join(
+                    _cell_xml(prefix, _column_letter(col) + row_suffix, self._cell_style(), value)
+                    for col, value in enumerate(values, start=1)
+                )
+                if cells:
+                    parts.append(b'<%srow r="%d">' % (prefix, new_row) + cells + b'</%srow>' % prefix)
+        return b''.join(parts)
+
+    def _cell_style(self) -> int:
+        """新单元格的样式：默认样式加上填充色"""
+        if self._style is None:
+            self._style = self.styles.style_with_fill(0, self.fill) if self.fill else 0
+        return self._style
+
+
+class _ColumnDropper(_SheetRewriter):
+    """流式删除列：一遍扫描工作表，去掉指定列的单元格，其后的列整体左移
+
+    每行只改写单元格的列字母（以及共享公式的范围），dimension、列宽、视图选区、
+    合并单元格、超链接、条件格式、数据验证的范围按同样的规则左移；范围内的列全部被删除时
+    去掉对应的元素，合并单元格缩成单个单元格时取消合并；共享公式的主单元格被删除时，
+    同组其余单元格展开成各自的普通公式。
+    单元格公式中的引用不做调整（与 openpyxl 的 delete_cols 一致）。
+    总耗时与工作表大小成正比，与删除的列数无关。
+    """
+
+    def __init__(self, columns: List[int]):
+        """
+        Args:
+            columns: 要删除的列号（1基）
+        """
+        super().__init__({}, {}, None)
+        self.columns = sorted(set(columns))
+        self._dropped = set(self.columns)
+        self._first = self.columns[0] if self.columns else 0
+        self._col = 0
+        # 实际有单元格被删除的列
+        self.found = set()
+
+    def _shift(self, col: int) -> int:
+        """原列号 -> 删除后的列号；被删除的列落到其后第一个保留列的新位置"""
+        return col - bisect_left(self.columns, col)
+
+    def _kept_range(self, start: int, end: int) -> Optional[Tuple[int, int]]:
+        """列范围 [start, end] 删除后的新范围，全部被删除时为 None"""
+        while start <= end and start in self._dropped:
+            start += 1
+        while end >= start and end in self._dropped:
+            end -= 1
+        if start > end:
+            return None
+        return self._shift(start), self._shift(end)
+
+    def _drop_refs(self, refs: bytes) -> bytes:
+        """'A5' / 'A5:C9' / 'A1:A3 C7' 按删除后的列改写，去掉全部被删除的区域"""
+        kept = []
+        for token in refs.split():
+            parts = [_REF_PART.match(part) for part in token.split(b':', 1)]
+            if any(m is None for m in parts) or not any(m.group(2) for m in parts):
+                # 整行引用或无法识别的内容原样保留
+                kept.append(token)
+                continue
+            start = _column_from_ref(parts[0].group(2).decode('ascii')) if parts[0].group(2) else 1
+            end = _column_from_ref(parts[-1].group(2).decode('ascii')) if parts[-1].group(2) else start
+            new_range = self._kept_range(start, end)
+            if new_range is None:
+                continue
+            kept.append(b':'.join(
+                m.group(1) + (_column_letter(col) if m.group(2) else b'') + (m.group(3) or b'')
+                for m, col in zip(parts, new_range if len(parts) > 1 else new_range[:1])
+            ))
+        return b' '.join(kept)
+
+    def _clamp_refs(self, refs: bytes) -> bytes:
+        """活动单元格/选区等只需要仍然有效的引用：各端点的列直接映射，不删除区域"""
+        return _REF_ROW.sub(lambda m: self._clamp_cell(m.group(1)) + m.group(2), refs)
+
+    def _clamp_cell(self, letters: bytes) -> bytes:
+        dollar = b'$' if letters.startswith(b'$') else b''
+        col_letters = letters.strip(b'$')
+        col = self._shift(_column_from_ref(col_letters.decode('ascii')))
+        return dollar + _column_letter(max(col, 1)) + (b'$' if letters.endswith(b'$') else b'')
+
+    def _update_dimension(self, head: bytes) -> bytes:
+        """<sheetData> 之前：dimension、列宽、视图选区"""
+        if not self.columns:
+            return head
+
+        def dimension(match):
+            refs = self._drop_refs(match.group(2)) or b'A1'
+            return match.group(1) + refs + match.group(3)
+
+        head = _DIMENSION.sub(dimension, head, count=1)
+        head = _COL_ELEMENT.sub(self._drop_col_element, head)
+        return _VIEW_REF_ATTR.sub(lambda m: m.group(1) + self._clamp_refs(m.group(2)) + m.group(3), head)
+
+    def _drop_col_element(self, match) -> bytes:
+        """<col min=".." max=".."/> 按删除后的列改写，范围内的列全部删除时去掉"""
+        element = match.group(0)
+        low, high = _ATTR_MIN.search(element), _ATTR_MAX.search(element)
+        if low is None or high is None:
+            return element
+        new_range = self._kept_range(int(low.group(1)), int(high.group(1)))
+        if new_range is None:
+            return b''
+        element = _ATTR_MIN.sub(b' min="%d"' % new_range[0], element, count=1)
+        return _ATTR_MAX.sub(b' max="%d"' % new_range[1], element, count=1)
+
+    def _write_tail(self, src, dst, buffer: bytes):
+        """</sheetData> 之后的合并单元格等范围一并左移"""
+        if not self.columns:
+            return super()._write_tail(src, dst, buffer)
+        tail = _RANGE_ELEMENT.sub(self._drop_range_element, buffer + src.read())
+        tail = _FILTER_REF.sub(lambda m: m.group(1) + (self._drop_refs(m.group(2)) or b'A1') + m.group(3), tail)
+        for container, child in _RANGE_CONTAINERS:
+            tail = _recount_container(tail, container, child)
+        dst.write(tail)
+
+    def _drop_range_element(self, match) -> bytes:
+        element = match.group(0)
+        head_end = len(match.group(1)) + len(match.group(2)) + 1
+        attrs = match.group(2)
+        ref = _RANGE_ATTR.search(attrs)
+        if ref is None:
+            return element
+        refs = self._drop_refs(ref.group(2))
+        corners = refs.split(b':')
+        if not refs or (match.group(1).endswith(b'mergeCell') and (len(corners) < 2 or corners[0] == corners[1])):
+            # 范围全部删除；或合并区域只剩一个单元格
+            return b''
+        attrs = attrs[:ref.start(2)] + refs + attrs[ref.end(2):]
+        return b'<' + match.group(1) + attrs + element[head_end:]
+
+    def _rewrite_rows(self, src, dst, buffer: bytes) -> bytes:
+        """逐行处理 sheetData 内容，返回 </sheetData> 及之后已读入的字节"""
+        pos = 0
+        flushed = 0
+        row_number = 0
+        eof = False
+        out = []
+        while True:
+            row = self._find_row(buffer, pos)
+            if row is None:
+                if eof:
+                    raise ExcelLiteError("工作表XML不完整")
+                start = self._incomplete_start(buffer, pos)
+                out.append(buffer[flushed:start])
+                dst.write(b''.join(out))
+                out.clear()
+                chunk = src.read(_CHUNK_SIZE)
+                eof = not chunk
+                buffer = buffer[start:] + chunk
+                pos = flushed = 0
+                continue
+            start, end, attrs, inner = row
+            if attrs is None:
+                out.append(buffer[flushed:start])
+                dst.write(b''.join(out))
+                return buffer[start:]
+
+            ref = _ATTR_R.search(attrs)
+            row_number = int(ref.group(1)) if ref else row_number + 1
+            pos = end
+            if not inner or not self.columns:
+                continue
+            if b' ref="' in inner:
+                self._capture_dropped_masters(row_number, inner)
+            # 共享公式按原位置展开后再删除列（公式中的引用不随删除列调整）
+            self._col = 0
+            new_inner = _CELL.sub(self._drop_cell, self._expand_shared(row_number, inner))
+            if new_inner == inner:
+                continue
+            out.append(buffer[flushed:start])
+            prefix = self.prefix
+            out.append(b'<' + prefix + b'row' + _ATTR_SPANS.sub(b'', attrs) + b'>' + new_inner +
+                       b'</' + prefix + b'row>')
+            flushed = pos
+
+    def _drop_cell(self, match) -> bytes:
+        cell = match.group(0)
+        ref = _ATTR_R.search(match.group(1))
+        if ref is not None:
+            letters = ref.group(1).rstrip(b'0123456789')
+            col = _column_from_ref(letters.decode('ascii'))
+        else:
+            col = self._col + 1
+        self._col = col
+        if col < self._first:
+            return cell
+        if col in self._dropped:
+            self.found.add(col)
+            return b''
+
+        if ref is not None:
+            new_ref = _column_letter(self._shift(col)) + ref.group(1)[len(letters):]
+            offset = match.start(1) - match.start(0)
+            cell = cell[:offset + ref.start(1)] + new_ref + cell[offset + ref.end(1):]
+        if b' ref="' in cell:
+            cell = _FORMULA_REF.sub(lambda m: m.group(1) + self._drop_refs(m.group(2)) + m.group(3), cell)
+        return cell
+
+    def _capture_dropped_masters(self, row_number: int, inner: bytes):
+        """被删除的单元格是共享公式的主单元格时记下公式，同组其余单元格展开成普通公式"""
+        col = 0
+        for cell in _CELL.finditer(inner):
+            ref = _ATTR_R.search(cell.group(1))
+            col = _column_from_ref(ref.group(1).decode('ascii')) if ref else col + 1
+            if col in self._dropped:
+                self.shared.capture(cell.group(0), row_number, col)
+
+
+def _recount_container(xml: bytes, container: bytes, child: bytes) -> bytes:
+    """更新容器元素（如 mergeCells）的 count 属性，子元素全部被去掉时删除容器"""
+    pattern = re.compile(rb'<((?:[\w.-]+:)?' + container + rb')\b([^>]*)>(.*?)</\1>', re.S)
+    child_open = re.compile(rb'<(?:[\w.-]+:)?' + child + rb'\b')
+
+    def recount(match):
+        count = len(child_open.findall(match.group(3)))
+        if not count:
+            return b''
+        open_tag = b'<' + match.group(1) + match.group(2) + b'>'
+        if _ATTR_COUNT.search(open_tag):
+            open_tag = _with_count(open_tag, count)
+        return open_tag + match.group(3) + b'</' + match.group(1) + b'>'
+
+    return pattern.sub(recount, xml)
+
+
+def _strip_zip64_extra(extra: bytes) -> bytes:
+    """去掉 extra 字段中的 zip64 记录（写出时按需重新生成）"""
+    result = b''
+    pos = 0
+    while pos + 4 <= len(extra):
+        header_id, size = struct.unpack('<HH', extra[pos:pos + 4])
+        if header_id != 1:
+            result += extra[pos:pos + 4 + size]
+        pos += 4 + size
+    return result
+
+
+def _copy_member_raw(zin: zipfile.ZipFile, zout: zipfile.ZipFile, info: zipfile.ZipInfo):
+    """按原始压缩数据拷贝zip成员，不解压也不重新压缩"""
+    fp = zin.fp
+    fp.seek(info.header_offset)
+    header = fp.read(30)
+    if header[:4] != b'PK\x03\x04':
+        raise ExcelLiteError(f"zip成员头损坏: {info.filename}")
+    name_len, extra_len = struct.unpack('<HH', header[26:30])
+    fp.seek(info.header_offset + 30 + name_len + extra_len)
+
+    new_info = copy.copy(info)
+    # 大小与CRC已知，写在本地文件头里，不再使用数据描述符
+    new_info.flag_bits &= ~0x08
+    new_info.extra = _strip_zip64_extra(info.extra)
+    new_info.header_offset = zout.fp.tell()
+    zip64 = info.file_size > zipfile.ZIP64_LIMIT or info.compress_size > zipfile.ZIP64_LIMIT
+    zout.fp.write(new_info.FileHeader(zip64))
+
+    remaining = info.compress_size
+    while remaining:
+        data = fp.read(min(remaining, 1 << 20))
+        if not data:
+            raise ExcelLiteError(f"zip成员数据不完整: {info.filename}")
+        zout.fp.write(data)
+        remaining -= len(data)
+
+    zout.filelist.append(new_info)
+    zout.NameToInfo[new_info.filename] = new_info
+    zout.start_dir = zout.fp.tell()
+
+
+def _drop_calc_chain(name: str, data: bytes) -> bytes:
+    """从 [Content_Types].xml / workbook.xml.rels 中去掉计算链条目"""
+    if name == '[Content_Types].xml':
+        return re.sub(rb'<Override\b[^>]*?PartName="/xl/calcChain\.xml"[^>]*?/>', b'', data)
+    return re.sub(rb'<Relationship\b[^>]*?Type="[^"]*' + re.escape(_CALC_CHAIN_TYPE) + rb'"[^>]*?/>', b'', data)
+
+
+def _normalize_fills(fills: Dict[int, Dict[int, str]]) -> Dict[int, Dict[int, str]]:
+    """规范化填充色；多行共用的 {列: 颜色} 字典（ws.fill_rows）只转换一次，结果仍然共用"""
+    converted: Dict[int, Dict[int, str]] = {}
+    normalized = {}
+    for row, cols in fills.items():
+        result = converted.get(id(cols))
+        if result is None:
+            result = converted[id(cols)] = {col: _normalize_color(color) for col, color in cols.items()}
+        normalized[row] = result
+    return normalized
+
+
+def write_patched_workbook(zin: zipfile.ZipFile, out_path: str,
+                           sheet_patches: Dict[str, Tuple[Dict[int, Dict[int, Any]], Dict[int, Dict[int, str]]]],
+                           styles_path: str = 'xl/styles.xml'):
+    """把修改写入新的xlsx文件
+
+    Args:
+        zin: 原工作簿的zip句柄
+        out_path: 输出文件路径
+        sheet_patches: {工作表XML路径: (值修改 {行: {列: 值}}, 填充修改 {行: {列: 颜色}})}
+        styles_path: styles.xml 在zip中的路径
+    """
+    fills_needed = any(fills for _, fills in sheet_patches.values())
+    styles = None
+    if fills_needed:
+        try:
+            styles = _StylesPatch(zin.read(styles_path))
+        except KeyError:
+            raise ExcelLiteError("工作簿缺少 styles.xml，无法设置填充色")
+    normalized = {path: (values, _normalize_fills(fills)) for path, (values, fills) in sheet_patches.items()}
+    rewriters = {path: _SheetRewriter(values, fills, styles) for path, (values, fills) in normalized.items()}
+    # 覆盖了值就去掉计算链，由 Excel 打开时重建
+    drop_calc_chain = any(values for values, _ in sheet_patches.values())
+    _write_workbook(zin, out_path, rewriters, styles, styles_path, drop_calc_chain)
+
+
+def write_transformed_workbook(zin: zipfile.ZipFile, out_path: str, transforms: Dict[str, _ColumnTransform]):
+    """把单列变换流式写入新的xlsx文件
+
+    Args:
+        zin: 原工作簿的zip句柄
+        out_path: 输出文件路径
+        transforms: {工作表XML路径: _ColumnTransform}；写完后各自的 changed 为改动的单元格数
+    """
+    _write_workbook(zin, out_path, transforms, None, None, drop_calc_chain=True)
+
+
+def write_inserted_workbook(zin: zipfile.ZipFile, out_path: str, inserters: Dict[str, _RowInserter],
+                            styles_path: str = 'xl/styles.xml'):
+    """把插入行流式写入新的xlsx文件
+
+    Args:
+        zin: 原工作簿的zip句柄
+        out_path: 输出文件路径
+        inserters: {工作表XML路径: _RowInserter}
+        styles_path: styles.xml 在zip中的路径
+    """
+    styles = None
+    if any(inserter.fill for inserter in inserters.values()):
+        try:
+            styles = _StylesPatch(zin.read(styles_path))
+        except KeyError:
+            raise ExcelLiteError("工作簿缺少 styles.xml，无法设置填充色")
+        for inserter in inserters.values():
+            inserter.styles = styles
+    # 行号变化后计算链中的单元格位置失效，由 Excel 打开时重建
+    _write_workbook(zin, out_path, inserters, styles, styles_path, drop_calc_chain=True)
+
+
+def write_dropped_workbook(zin: zipfile.ZipFile, out_path: str, droppers: Dict[str, _ColumnDropper]):
+    """把删除列流式写入新的xlsx文件
+
+    Args:
+        zin: 原工作簿的zip句柄
+        out_path: 输出文件路径
+        droppers: {工作表XML路径: _ColumnDropper}
+    """
+    # 列位置变化后计算链中的单元格位置失效，由 Excel 打开时重建
+    _write_workbook(zin, out_path, droppers, None, None, drop_calc_chain=True)
+
+
+def _write_workbook(zin: zipfile.ZipFile, out_path: str, rewriters: Dict[str, _SheetRewriter],
+                    styles: Optional[_StylesPatch], styles_path: Optional[str], drop_calc_chain: bool):
+    """逐个成员写出新工作簿：有改动的工作表流式重写，其余成员按原始压缩数据拷贝"""
+    with zipfile.ZipFile(out_path, 'w', zipfile.ZIP_DEFLATED) as zout:
+        for info in zin.infolist():
+            name = info.filename
+            if name in rewriters:
+                new_info = zipfile.ZipInfo(name, date_time=info.date_time)
+                new_info.compress_type = zipfile.ZIP_DEFLATED
+                with zin.open(info) as src, zout.open(new_info, 'w', force_zip64=info.file_size > (1 << 30)) as dst:
+                    rewriters[name].rewrite(src, dst)
+            elif name == styles_path and styles is not None:
+                # 填充色在所有工作表写完后才确定，styles.xml 放到最后写
+                continue
+            elif drop_calc_chain and name == 'xl/calcChain.xml':
+                continue
+            elif drop_calc_chain and name in ('[Content_Types].xml', 'xl/_rels/workbook.xml.rels'):
+                zout.writestr(info, _drop_calc_chain(name, zin.read(info)))
+            else:
+                _copy_member_raw(zin, zout, info)
+
+        if styles is not None:
+            info = zin.getinfo(styles_path)
+            zout.writestr(info, styles.to_bytes() if styles.changed else zin.read(info))
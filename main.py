@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 import tkinter as tk
 
@@ -136,4 +137,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 打包为exe后多进程解析（excel_lite.load_sheets）需要
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
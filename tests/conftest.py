@@ -0,0 +1,123 @@
+"""
+测试公用的工作簿构造工具
+
+直接写出最小的xlsx（单个工作表，可指定工作表XML与附加成员），
+便于构造共享公式、过期的 dimension 等 openpyxl 不会生成的内容。
+"""
+import os
+import sys
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{extra}</Types>'
+)
+
+STYLES = (
+    f'<?xml version="1.0" encoding="UTF-8"?><styleSheet xmlns="{_NS}">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def sheet_xml(rows: str, dimension: str = None, head: str = '', tail: str = '') -> str:
+    """拼出工作表XML；rows 为 <row> 元素串"""
+    dim = f'<dimension ref="{dimension}"/>' if dimension else ''
+    return (f'<?xml version="1.0" encoding="UTF-8"?><worksheet xmlns="{_NS}" xmlns:r="{_REL_NS}">'
+            f'{dim}{head}<sheetData>{rows}</sheetData>{tail}</worksheet>')
+
+
+def value_rows(values) -> str:
+    """[[值, ...], ...] -> 从A1开始的 <row> 元素串（数字写成数值，其余写成内联字符串）"""
+    from excel_toolkit.excel_lite import get_column_letter
+    parts = []
+    for r, row in enumerate(values, start=1):
+        cells = []
+        for c, value in enumerate(row, start=1):
+            ref = f'{get_column_letter(c)}{r}'
+            if value is None:
+                continue
+            if isinstance(value, (int, float)):
+                cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+            else:
+                cells.append(f'<c r="{ref}" t="inlineStr"><is><t>{value}</t></is></c>')
+        parts.append(f'<row r="{r}">{"".join(cells)}</row>')
+    return ''.join(parts)
+
+
+def write_xlsx(path, worksheet: str, extra_members: dict = None, calc_chain: bool = False):
+    """写出只含一个工作表 'Sheet1' 的xlsx"""
+    rels = ('<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            'Target="worksheets/sheet1.xml"/>'
+            '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+            'Target="styles.xml"/>')
+    extra_types = ''
+    if calc_chain:
+        rels += ('<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/calcChain" '
+                 'Target="calcChain.xml"/>')
+        extra_types = ('<Override PartName="/xl/calcChain.xml" '
+                       'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.calcChain+xml"/>')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as z:
+        z.writestr('[Content_Types].xml', CONTENT_TYPES.format(extra=extra_types))
+        z.writestr('_rels/.rels',
+                   '<?xml version="1.0" encoding="UTF-8"?>'
+                   '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                   '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+                   'Target="xl/workbook.xml"/></Relationships>')
+        z.writestr('xl/workbook.xml',
+                   f'<?xml version="1.0" encoding="UTF-8"?><workbook xmlns="{_NS}" xmlns:r="{_REL_NS}">'
+                   '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>')
+        z.writestr('xl/_rels/workbook.xml.rels',
+                   '<?xml version="1.0" encoding="UTF-8"?>'
+                   f'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{rels}</Relationships>')
+        z.writestr('xl/styles.xml', STYLES)
+        z.writestr('xl/worksheets/sheet1.xml', worksheet)
+        if calc_chain:
+            z.writestr('xl/calcChain.xml', f'<?xml version="1.0" encoding="UTF-8"?><calcChain xmlns="{_NS}"><c r="C2" i="1"/></calcChain>')
+        for name, data in (extra_members or {}).items():
+            z.writestr(name, data)
+    return str(path)
+
+
+def read_member(path, name: str) -> str:
+    with zipfile.ZipFile(path) as z:
+        return z.read(name).decode('utf-8')
+
+
+# 共享公式：C2 为主单元格（=A2*2，范围 C2:C6），C3..C6 只带 si
+SHARED_FORMULA_ROWS = ''.join(
+    f'<row r="{r}"><c r="A{r}"><v>{r}</v></c><c r="B{r}"><v>{r * 10}</v></c>'
+    + (f'<c r="C{r}"><f t="shared" ref="C2:C6" si="0">A2*2</f><v>{r * 2}</v></c>' if r == 2
+       else f'<c r="C{r}"><f t="shared" si="0"/><v>{r * 2}</v></c>')
+    + '</row>'
+    for r in range(2, 7)
+)
+
+
+@pytest.fixture
+def shared_formula_xlsx(tmp_path):
+    """A1:C1 表头，C2:C6 为共享公式 =A*2"""
+    header = '<row r="1"><c r="A1" t="inlineStr"><is><t>a</t></is></c><c r="B1" t="inlineStr"><is><t>b</t></is></c>' \
+             '<c r="C1" t="inlineStr"><is><t>c</t></is></c></row>'
+    return write_xlsx(tmp_path / 'shared.xlsx', sheet_xml(header + SHARED_FORMULA_ROWS, 'A1:C6'))
@@ -0,0 +1,149 @@
+"""delete_cols 的一遍流式删除列与批量模式"""
+import pytest
+
+from excel_toolkit import delete_cols
+from conftest import read_member, sheet_xml, value_rows, write_xlsx
+
+openpyxl = pytest.importorskip('openpyxl')
+
+_ROWS = [[f'{letter}{r}' for letter in 'ABCDEF'] for r in range(1, 6)]
+
+
+def _values(path):
+    return [list(row) for row in openpyxl.load_workbook(path)['Sheet1'].iter_rows(values_only=True)]
+
+
+def _quiet(msg):
+    pass
+
+
+@pytest.fixture
+def layout_xlsx(tmp_path):
+    head = ('<sheetViews><sheetView workbookViewId="0"><selection activeCell="E2" sqref="E2"/></sheetView></sheetViews>'
+            '<cols><col min="1" max="1" width="5" customWidth="1"/><col min="3" max="5" width="9" customWidth="1"/>'
+            '<col min="4" max="4" width="7" customWidth="1"/></cols>')
+    tail = ('<mergeCells count="3"><mergeCell ref="B1:D1"/><mergeCell ref="C2:D3"/><mergeCell ref="E4:F5"/></mergeCells>'
+            '<conditionalFormatting sqref="D1:D5 F1"><cfRule type="containsBlanks" priority="1">'
+            '<formula>LEN(TRIM(D1))=0</formula></cfRule></conditionalFormatting>')
+    return write_xlsx(tmp_path / 'layout.xlsx', sheet_xml(value_rows(_ROWS), 'A1:F5', head, tail))
+
+
+def test_delete_columns_round_trip(layout_xlsx):
+    stats = delete_cols.delete_columns(layout_xlsx, ['D', 'C'], _quiet)
+
+    assert stats == {'sheets_processed': 1, 'columns_deleted': 2}
+    expected = [[row[i] for i in (0, 1, 4, 5)] for row in _ROWS]
+    # openpyxl 读取时合并区域（C4:D5）内左上角之外的单元格为空
+    expected[3][3] = expected[4][2] = expected[4][3] = None
+    assert _values(layout_xlsx) == expected
+
+    sheet = openpyxl.load_workbook(layout_xlsx)['Sheet1']
+    # B1:D1 缩成单个单元格后取消合并，C2:D3 整体删除，E4:F5 左移
+    assert sorted(str(r) for r in sheet.merged_cells.ranges) == ['C4:D5']
+    assert sheet.conditional_formatting and [str(cf.sqref) for cf in sheet.conditional_formatting] == ['D1']
+    assert sheet.column_dimensions['A'].width == 5
+    # C:E 宽度 9 的定义只剩原来的E列，落在新的C列；原D列的定义被去掉
+    assert sheet.column_dimensions['C'].width == 9
+    assert sheet.column_dimensions['C'].min == 3 and sheet.column_dimensions['C'].max == 3
+
+    xml = read_member(layout_xlsx, 'xl/worksheets/sheet1.xml')
+    assert '<dimension ref="A1:D5"/>' in xml
+    assert 'activeCell="C2"' in xml
+
+
+def test_delete_columns_ignores_stale_dimension(tmp_path):
+    path = write_xlsx(tmp_path / 'stale.xlsx', sheet_xml(value_rows(_ROWS), 'A1:C7'))
+    logs = []
+
+    stats = delete_cols.delete_columns(path, ['E', 'Z'], logs.append)
+
+    assert stats['columns_deleted'] == 1
+    assert _values(path) == [[row[i] for i in (0, 1, 2, 3, 5)] for row in _ROWS]
+    assert any('已删除列 E' in line for line in logs)
+    assert any('列 Z 超出工作表范围' in line for line in logs)
+
+
+def test_delete_shared_formula_master_column(tmp_path):
+    # 共享公式横向展开：C2 为主单元格（=A2*2，范围 C2:E2），删除C列后 D2/E2 展开成普通公式
+    rows = ('<row r="2"><c r="A2"><v>1</v></c><c r="B2"><v>2</v></c>'
+            '<c r="C2"><f t="shared" ref="C2:E2" si="0">A2*2</f><v>2</v></c>'
+            '<c r="D2"><f t="shared" si="0"/><v>4</v></c><c r="E2"><f t="shared" si="0"/><v>0</v></c></row>')
+    path = write_xlsx(tmp_path / 'shared_row.xlsx', sheet_xml(rows, 'A2:E2'))
+
+    delete_cols.delete_columns(path, ['C'], _quiet)
+
+    xml = read_member(path, 'xl/worksheets/sheet1.xml')
+    assert 't="shared"' not in xml
+    sheet = openpyxl.load_workbook(path)['Sheet1']
+    # 公式中的引用不随删除列调整，只按原位置展开
+    assert [sheet['C2'].value, sheet['D2'].value] == ['=B2*2', '=C2*2']
+
+
+def test_delete_column_inside_shared_range_shrinks_ref(shared_formula_xlsx):
+    delete_cols.delete_columns(shared_formula_xlsx, ['B'], _quiet)
+
+    xml = read_member(shared_formula_xlsx, 'xl/worksheets/sheet1.xml')
+    assert 'ref="B2:B6"' in xml
+    sheet = openpyxl.load_workbook(shared_formula_xlsx)['Sheet1']
+    assert [sheet.cell(r, 2).value for r in range(2, 7)] == ['=A2*2', '=A3*2', '=A4*2', '=A5*2', '=A6*2']
+
+
+def test_delete_columns_csv(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_text('a,b,c\n1,2,3\n4,5\n', encoding='utf-8')
+
+    stats = delete_cols.delete_columns(str(path), ['B', 'D'], _quiet)
+
+    assert stats['columns_deleted'] == 1
+    assert path.read_text(encoding='utf-8').splitlines() == ['a,c', '1,3', '4']
+
+
+def test_batch_processes_every_file_once(tmp_path):
+    paths = [write_xlsx(tmp_path / f'f{i}.xlsx', sheet_xml(value_rows(_ROWS), 'A1:F5')) for i in range(3)]
+
+    stats = delete_cols.delete_columns_batch(paths, ['A'], _quiet, workers=2)
+
+    assert stats == {'files_processed': 3, 'files_failed': 0, 'sheets_processed': 3, 'columns_deleted': 3}
+    for path in paths:
+        assert _values(path) == [row[1:] for row in _ROWS]
+
+
+def test_batch_does_not_retry_files_after_pool_crash(tmp_path, monkeypatch):
+    paths = [write_xlsx(tmp_path / f'f{i}.xlsx', sheet_xml(value_rows(_ROWS), 'A1:F5')) for i in range(4)]
+    calls = []
+    real_worker = delete_cols._delete_columns_in_worker
+
+    def worker(file_path, columns, sheet_name=None):
+        calls.append(file_path)
+        return real_worker(file_path, columns, sheet_name)
+
+    class BrokenPool:
+        """第一个文件交给进程池后进程池崩溃"""
+
+        def __init__(self, max_workers):
+            self.submitted = []
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def submit(self, fn, file_path, *args):
+            import concurrent.futures
+            future = concurrent.futures.Future()
+            if self.submitted:
+                raise delete_cols.BrokenProcessPool('pool is broken')
+            self.submitted.append(file_path)
+            future.set_exception(delete_cols.BrokenProcessPool('worker died'))
+            return future
+
+    monkeypatch.setattr(delete_cols, '_delete_columns_in_worker', worker)
+    monkeypatch.setattr(delete_cols.concurrent.futures, 'ProcessPoolExecutor', BrokenPool)
+
+    stats = delete_cols.delete_columns_batch(paths, ['A'], _quiet, workers=2)
+
+    # 崩溃的文件记为失败且不在本进程重试，其余从未交出的文件顺序处理
+    assert stats['files_failed'] == 1 and stats['files_processed'] == 3
+    assert calls == paths[1:]
+    assert _values(paths[0]) == _ROWS
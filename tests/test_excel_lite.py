@@ -0,0 +1,180 @@
+"""ExcelReader / ExcelWorksheet 的读取接口"""
+import pytest
+import xlsxwriter
+
+from excel_toolkit import excel_lite, sheet_cache
+from excel_toolkit.excel_lite import ExcelLiteError, ExcelReader, KeyIndex
+from conftest import sheet_xml, value_rows, write_xlsx
+
+
+def test_extent_ignores_stale_dimension(tmp_path):
+    rows = value_rows([['a', 'b', 'c', 'd', 'e', 'f']] + [[r, 2, 3, 4, 5, 6] for r in range(2, 8)])
+    path = write_xlsx(tmp_path / 'stale.xlsx', sheet_xml(rows, 'A1:C7'))
+    ws = ExcelReader(path)['Sheet1']
+
+    # 声明的 A1:C7 小于实际数据，报出的范围以扫描结果为准，加载数据前后一致
+    assert (ws.max_row, ws.max_column) == (7, 6)
+    assert list(ws.iter_rows(min_row=7, values_only=True)) == [(7, 2, 3, 4, 5, 6)]
+    assert (ws.max_row, ws.max_column) == (7, 6)
+
+
+def test_csv_falls_back_to_gb18030_after_ascii_prefix(tmp_path):
+    # 开头的识别样本全是ASCII，GBK编码的中文在样本之后才出现
+    lines = ['sku,name'] + [f'A{n:06d},item' for n in range(8000)] + ['B000001,中文品名']
+    path = tmp_path / 'gbk.csv'
+    path.write_bytes('\n'.join(lines).encode('gb18030') + b'\n')
+    assert path.stat().st_size > (1 << 16)
+
+    reader = ExcelReader(str(path))
+    rows = list(reader['gbk'].iter_rows(values_only=True))
+    assert len(rows) == len(lines)
+    assert rows[-1] == ('B000001', '中文品名')
+
+    # 重写时保持原编码
+    ExcelReader(str(path)).transform_column('gbk', 2, lambda name: name + '!' if name == '中文品名' else None)
+    assert path.read_bytes().decode('gb18030').splitlines()[-1] == 'B000001,中文品名!'
+
+
+def test_csv_save_warns_about_dropped_fills(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_text('sku,qty\nA1,3\n', encoding='utf-8')
+    messages = []
+
+    reader = ExcelReader(str(path))
+    ws = reader['data']
+    ws.cell(2, 2, value='4')
+    ws.fill(2, 1, 'FFF59E')
+    reader.save(logger=messages.append)
+
+    assert len(messages) == 1 and '填充' in messages[0]
+    assert path.read_text(encoding='utf-8').splitlines() == ['sku,qty', 'A1,4']
+
+
+def test_key_index_single_and_composite_keys():
+    rows = [(2, ['P1', 'a']), (3, ['P1', 'b']), (4, ['P2', 'a']), (5, ['', 'c']), (6, ['P1', 'a'])]
+
+    single = KeyIndex().update(rows)
+    assert list(single.keys()) == ['P1', 'P2']
+    assert list(single.lookup('P1')) == [2, 3, 6] and list(single.lookup('P2')) == [4]
+    assert len(single.lookup('P9')) == 0 and 'P2' in single
+    assert single.counts() == {'P1': 3, 'P2': 1}
+
+    composite = KeyIndex((0, 1)).update(rows)
+    assert [(key, list(found)) for key, found in composite.duplicates()] == [(('P1', 'a'), [2, 6])]
+    assert KeyIndex((0, 1)).update(rows[:2]).difference(composite) == []
+    assert composite.difference(KeyIndex((0, 1)).update(rows[:2])) == [('P2', 'a')]
+
+
+def test_build_index_by_header_and_letter(tmp_path):
+    rows = value_rows([['pid', 'id', 'qty'], ['P1', 'a', 1], ['P1', 'b', 2], ['P2', 'a', 3], ['P1', 'a', 4]])
+    path = write_xlsx(tmp_path / 'keys.xlsx', sheet_xml(rows, 'A1:C5'))
+    ws = ExcelReader(path)['Sheet1']
+
+    index = ws.build_index(['pid', 'B'])
+    assert list(index.lookup(('P1', 'a'))) == [2, 5]
+    assert list(ws.build_index(3).keys()) == ['1', '2', '3', '4']
+    # 已加载的工作表走同一套规则
+    list(ws.rows)
+    assert list(ws.build_index(['pid', 'B']).lookup(('P1', 'a'))) == [2, 5]
+
+
+def test_unreadable_shared_strings_raise_and_are_not_cached(tmp_path, monkeypatch):
+    path = str(tmp_path / 'strings.xlsx')
+    workbook = xlsxwriter.Workbook(path)
+    worksheet = workbook.add_worksheet('Sheet1')
+    worksheet.write_row(0, 0, ['hello', 'world'])
+    worksheet.write_row(1, 0, ['foo', 1])
+    workbook.close()
+    monkeypatch.setattr(sheet_cache, 'CACHE_DIR', str(tmp_path / 'cache'))
+
+    class BrokenStrings:
+        def __init__(self, stream):
+            raise OSError('no space left on device')
+
+    monkeypatch.setattr(excel_lite, '_LAZY_SHARED_STRINGS_THRESHOLD', 0)
+    monkeypatch.setattr(excel_lite, '_LazySharedStrings', BrokenStrings)
+    with pytest.raises(ExcelLiteError):
+        ExcelReader(path, cache=True).get_sheet_data('Sheet1')
+    assert sheet_cache.load_sheet(path, 'Sheet1') is None
+
+    monkeypatch.undo()
+    monkeypatch.setattr(sheet_cache, 'CACHE_DIR', str(tmp_path / 'cache'))
+    assert [list(row) for row in ExcelReader(path, cache=True).get_sheet_data('Sheet1')] == [
+        ['hello', 'world'], ['foo', 1]]
+
+
+def test_last_data_row_skips_trailing_formatted_rows(tmp_path):
+    rows = value_rows([['h1', 'h2', 'h3'], ['a', None, None], [None, None, None], [None, 'b', None], ['  ']])
+    # 末尾大量只有格式的空行，以及只在第3列有值的行
+    rows += ''.join(f'<row r="{r}"><c r="A{r}" s="0"/></row>' for r in range(6, 400))
+    rows += '<row r="400"><c r="C400" t="inlineStr"><is><t>far</t></is></c></row>'
+    rows += ''.join(f'<row r="{r}"><c r="A{r}" s="0"/></row>' for r in range(401, 700))
+    path = write_xlsx(tmp_path / 'tail.xlsx', sheet_xml(rows, 'A1:C699'))
+    ws = ExcelReader(path)['Sheet1']
+
+    assert ws.last_data_row() == 400
+    assert ws.last_data_row(max_col=2) == 4
+    assert ws.last_data_row(min_col=3, max_col=3) == 400
+    assert ws.max_row == 699
+
+
+def test_last_data_row_of_empty_sheet(tmp_path):
+    path = write_xlsx(tmp_path / 'empty.xlsx', sheet_xml('<row r="1"><c r="A1" s="0"/></row>'))
+    assert ExcelReader(path)['Sheet1'].last_data_row() == 0
+
+
+def test_check_template_has_data_reports_last_row(tmp_path):
+    from excel_toolkit.shipping_fill import check_template_has_data
+    rows = value_rows([['sku', 'qty'], ['A1', 1], [None, None], ['C3', 3]])
+    rows += '<row r="5"><c r="A5" s="0"/></row>'
+    path = write_xlsx(tmp_path / 'template.xlsx', sheet_xml(rows, 'A1:B5'))
+
+    assert check_template_has_data(path, 'Sheet1') == {'has_data': True, 'data_rows': 3, 'last_row': 4}
+    assert check_template_has_data(path, 'missing')['has_data'] is False
+
+
+def _multi_sheet_xlsx(tmp_path):
+    path = str(tmp_path / 'multi.xlsx')
+    workbook = xlsxwriter.Workbook(path)
+    for n in range(3):
+        worksheet = workbook.add_worksheet(f'S{n}')
+        worksheet.write_row(0, 0, ['sku', 'qty', '名称'])
+        for r in range(1, 40):
+            worksheet.write_row(r * (n + 1), 0, [f'A{n}-{r}', r * 1.5, '品名' if r % 3 else None])
+    workbook.close()
+    return path
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_load_sheets_in_workers_matches_sequential(tmp_path, monkeypatch, columnar):
+    path = _multi_sheet_xlsx(tmp_path)
+    monkeypatch.setattr(excel_lite, '_PARALLEL_MIN_BYTES', 0)
+
+    parent = ExcelReader(path, columnar=columnar)
+    # 解析全部在工作进程中完成，主进程不再回退到顺序加载
+    monkeypatch.setattr(parent, 'get_sheet_data', None)
+    monkeypatch.setattr(parent, 'get_sheet_columns', None)
+    sheets = parent.load_sheets(workers=2)
+    # 与逐个工作表顺序加载的结果一致
+    reader = ExcelReader(path, columnar=columnar)
+    assert list(sheets) == reader.sheetnames
+    for name, ws in sheets.items():
+        assert list(ws.iter_rows(values_only=True)) == list(reader[name].iter_rows(values_only=True))
+
+
+def test_load_sheets_falls_back_when_processes_unavailable(tmp_path, monkeypatch):
+    path = _multi_sheet_xlsx(tmp_path)
+    monkeypatch.setattr(excel_lite, '_PARALLEL_MIN_BYTES', 0)
+    calls = []
+
+    def no_processes(*args, **kwargs):
+        calls.append(kwargs)
+        raise OSError('fork not permitted')
+
+    monkeypatch.setattr(excel_lite.concurrent.futures, 'ProcessPoolExecutor', no_processes)
+    sheets = ExcelReader(path).load_sheets(['S2', 'S0'], workers=4)
+    reader = ExcelReader(path)
+    assert calls == [{'max_workers': 2}]
+    assert list(sheets) == ['S2', 'S0']
+    for name, ws in sheets.items():
+        assert list(ws.iter_rows(values_only=True)) == list(reader[name].iter_rows(values_only=True))
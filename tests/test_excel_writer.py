@@ -0,0 +1,46 @@
+"""ExcelWriter 的格式缓存、逐行写入与 constant_memory 输出"""
+import pytest
+
+from excel_toolkit.excel_lite import ExcelReader, ExcelWriter
+from excel_toolkit.warehouse_router import read_inventory, write_inventory
+from conftest import read_member
+
+
+def test_same_color_registers_one_format(tmp_path):
+    path = str(tmp_path / 'colors.xlsx')
+    with ExcelWriter(path) as wb:
+        for row in range(50):
+            wb.set_cell_color('S', row, 0, '#FFFF00')
+        wb.set_cell_color('S', 0, 1, '#FF0000')
+        assert wb.get_format(bold=True, bg_color='#FFFF00') is wb.get_format({'bg_color': '#FFFF00'}, bold=True)
+        assert wb.get_format() is None
+        assert len(wb._formats) == 3
+
+    styles = read_member(path, 'xl/styles.xml')
+    assert styles.count('<fill>') == 4  # 两个内置填充 + 黄、红各一个
+
+
+@pytest.mark.parametrize('constant_memory', [False, True])
+def test_write_rows_consumes_generator(tmp_path, constant_memory):
+    path = str(tmp_path / 'rows.xlsx')
+    rows = ((f'SKU{n}', n, n * 0.5) for n in range(1000))
+    with ExcelWriter(path, constant_memory=constant_memory) as wb:
+        wb.write_row('S', 0, ['sku', 'qty', 'weight'])
+        assert wb.write_rows('S', rows, start_row=1) == 1000
+        assert next(rows, None) is None
+
+    ws = ExcelReader(path)['S']
+    assert ws.max_row == 1001
+    assert list(ws.iter_rows(min_row=1000, values_only=True)) == [('SKU998', 998, 499), ('SKU999', 999, 499.5)]
+
+
+def test_write_inventory_round_trip(tmp_path):
+    path = str(tmp_path / 'inventory.xlsx')
+    wh_state = {'LA': 'California', 'NJ': 'nj', 'TX': None}
+    sku_by_wh = {'LA': {'A1', ' B2 ', ''}, 'NJ': ['C3', 'A1'], 'TX': set(), ' ': {'X'}}
+    write_inventory(path, wh_state, sku_by_wh, logger=None)
+
+    assert ExcelReader(path).sheetnames == ['仓库名和地址', 'LA', 'NJ', 'TX']
+    skus, states = read_inventory(path, logger=None)
+    assert states == {'LA': 'CA', 'NJ': 'NJ', 'TX': None}
+    assert skus == {'LA': {'A1', 'B2'}, 'NJ': {'A1', 'C3'}, 'TX': set()}
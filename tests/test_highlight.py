@@ -0,0 +1,60 @@
+"""按键列流式读取与重复项高亮"""
+import pytest
+
+from excel_toolkit.excel_lite import ExcelReader
+from excel_toolkit.highlight import SCOPE_WORKBOOK, highlight_duplicates
+from conftest import sheet_xml, value_rows, write_xlsx
+
+openpyxl = pytest.importorskip('openpyxl')
+
+
+def _quiet(msg):
+    pass
+
+
+def _filled(path, column):
+    sheet = openpyxl.load_workbook(path)['Sheet1']
+    return [row for row in range(1, sheet.max_row + 1) if sheet.cell(row, column).fill.fill_type == 'solid']
+
+
+def test_iter_sheet_columns_matches_full_rows(tmp_path):
+    # 跨越多个读取块的行，后面接自闭合的空行、缺少 r 属性的行和缺少键列单元格的行
+    rows = value_rows([['pid', 'id', 'qty']] + [[f'P{n % 7}', f'id{n}', n] for n in range(1, 3000)])
+    rows += ('<row r="3001" spans="1:3"/>'
+             '<row><c r="A3002" t="inlineStr"><is><t>P9</t></is></c><c r="C3002"><v>9</v></c></row>'
+             '<row r="3003"><c r="B3003" t="inlineStr"><is><t>only-b</t></is></c></row>')
+    reader = ExcelReader(write_xlsx(tmp_path / 'keys.xlsx', sheet_xml(rows)))
+
+    streamed = dict(reader.iter_sheet_columns('Sheet1', [3, 1], min_row=2))
+    full = {}
+    for row_number, values in reader.iter_sheet_rows('Sheet1', min_row=2):
+        values = list(values) + [''] * (3 - len(values))
+        if row_number >= 2 and any(values):
+            full[row_number] = [values[2], values[0]]
+    assert streamed == full
+    assert streamed[3000] == [2999, 'P3']
+    assert streamed[3002] == [9, 'P9'] and streamed[3003] == ['', '']
+    assert list(reader.iter_sheet_columns('Sheet1', [2], min_row=3, max_row=4)) == [(3, ['id2']), (4, ['id3'])]
+
+
+def test_highlight_duplicates_composite_key(tmp_path):
+    rows = [['pid', 'id', 'qty'], ['P1', 'a', 1], ['P1', 'b', 2], ['P2', 'a', 3], ['P1', 'a', 4], ['', 'a', 5]]
+    path = write_xlsx(tmp_path / 'dup.xlsx', sheet_xml(value_rows(rows), 'A1:C6'))
+
+    result = highlight_duplicates(path, 'A,B', logger=_quiet)
+
+    assert result['cells_highlighted'] == 4 and result['duplicate_keys'] == 1
+    assert _filled(path, 1) == _filled(path, 2) == [2, 5]
+    assert _filled(path, 3) == []
+    assert [row[2] for row in openpyxl.load_workbook(path)['Sheet1'].iter_rows(min_row=2, values_only=True)] == [
+        1, 2, 3, 4, 5]
+
+
+def test_highlight_duplicates_across_files(tmp_path):
+    first = write_xlsx(tmp_path / 'first.xlsx', sheet_xml(value_rows([['no'], ['X1'], ['X2']]), 'A1:A3'))
+    second = write_xlsx(tmp_path / 'second.xlsx', sheet_xml(value_rows([['no'], ['X3'], ['X2']]), 'A1:A3'))
+
+    result = highlight_duplicates(first, 'A', logger=_quiet, scope=SCOPE_WORKBOOK, other_files=[second])
+
+    assert result['files_processed'] == 2 and result['duplicate_keys'] == 1
+    assert _filled(first, 1) == [3] and _filled(second, 1) == [3]
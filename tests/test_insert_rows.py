@@ -0,0 +1,83 @@
+"""ExcelReader.insert_rows 的一遍流式插入与 process_insert_rows"""
+import pytest
+
+from excel_toolkit.excel_lite import ExcelReader
+from excel_toolkit.insert_rows import process_insert_rows
+from conftest import read_member, sheet_xml, value_rows, write_xlsx
+
+openpyxl = pytest.importorskip('openpyxl')
+
+
+def _values(path, width=2):
+    sheet = openpyxl.load_workbook(path)['Sheet1']
+    return [list(row) for row in sheet.iter_rows(max_col=width, values_only=True)]
+
+
+def _quiet(msg):
+    pass
+
+
+@pytest.fixture
+def target_xlsx(tmp_path):
+    rows = [['pid', 'id'], ['P1', 'a'], ['P1', 'b'], ['P2', 'a'], ['P3', 'a']]
+    tail = ('<autoFilter ref="A1:B5"/>'
+            '<mergeCells count="2"><mergeCell ref="C2:C3"/><mergeCell ref="C4:D5"/></mergeCells>')
+    return write_xlsx(tmp_path / 'target.xlsx', sheet_xml(value_rows(rows), 'A1:B5', tail=tail))
+
+
+def test_insert_rows_round_trip(target_xlsx):
+    inserted = ExcelReader(target_xlsx).insert_rows(
+        'Sheet1', {3: [['P1', 'c'], ['P1', 'd']], 4: [['P2', 'b']]}, fill='FF00B0F0')
+
+    assert inserted == 3
+    assert _values(target_xlsx) == [
+        ['pid', 'id'], ['P1', 'a'], ['P1', 'b'], ['P1', 'c'], ['P1', 'd'], ['P2', 'a'], ['P2', 'b'], ['P3', 'a'],
+    ]
+    sheet = openpyxl.load_workbook(target_xlsx)['Sheet1']
+    assert [sheet.cell(r, 1).fill.fgColor.rgb for r in (4, 5, 7)] == ['FF00B0F0'] * 3
+    assert sheet.cell(2, 1).fill.fill_type is None
+    # 跨过插入点的合并区域扩大，之后的整体下移
+    assert sorted(str(r) for r in sheet.merged_cells.ranges) == ['C2:C3', 'C6:D8']
+    assert sheet.auto_filter.ref == 'A1:B8'
+    assert '<dimension ref="A1:B8"/>' in read_member(target_xlsx, 'xl/worksheets/sheet1.xml')
+
+
+def test_insert_rows_at_top_and_after_last_row(target_xlsx):
+    ExcelReader(target_xlsx).insert_rows('Sheet1', {0: [['top']], 5: [['end', 'x', 'y']]})
+
+    values = _values(target_xlsx, width=3)
+    assert values[0] == ['top', None, None]
+    assert values[1] == ['pid', 'id', None]
+    assert values[-1] == ['end', 'x', 'y']
+    assert '<dimension ref="A1:C7"/>' in read_member(target_xlsx, 'xl/worksheets/sheet1.xml')
+
+
+def test_insert_rows_shifts_shared_formula_range(shared_formula_xlsx):
+    ExcelReader(shared_formula_xlsx).insert_rows('Sheet1', {1: [['new']]})
+
+    assert 'ref="C3:C7"' in read_member(shared_formula_xlsx, 'xl/worksheets/sheet1.xml')
+    sheet = openpyxl.load_workbook(shared_formula_xlsx)['Sheet1']
+    assert sheet['A2'].value == 'new'
+    assert [sheet.cell(r, 1).value for r in range(3, 8)] == [2, 3, 4, 5, 6]
+
+
+def test_insert_rows_csv(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_text('pid,id\nP1,a\nP2,a\n', encoding='utf-8')
+
+    ExcelReader(str(path)).insert_rows('data', {2: [['P1', 'b']]})
+
+    assert path.read_text(encoding='utf-8').splitlines() == ['pid,id', 'P1,a', 'P1,b', 'P2,a']
+
+
+def test_process_insert_rows(tmp_path, target_xlsx):
+    source = write_xlsx(tmp_path / 'source.xlsx', sheet_xml(value_rows(
+        [['pid', 'id'], ['P2', 'b'], ['P1', 'c'], ['P1', 'a'], ['P9', 'z']]), 'A1:B5'))
+
+    result = process_insert_rows(source, 'Sheet1', target_xlsx, 'Sheet1', logger=_quiet)
+
+    # P9 在目标中不存在，不插入
+    assert result == {'inserted_rows': 2, 'missing_count': 3}
+    assert _values(target_xlsx) == [
+        ['pid', 'id'], ['P1', 'a'], ['P1', 'b'], ['P1', 'c'], ['P2', 'a'], ['P2', 'b'], ['P3', 'a'],
+    ]
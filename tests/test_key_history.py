@@ -0,0 +1,60 @@
+"""跨文件的历史键索引"""
+import pytest
+
+from excel_toolkit.highlight import highlight_history_duplicates
+from excel_toolkit.key_history import KeyHistory, history_key
+from conftest import sheet_xml, value_rows, write_xlsx
+
+openpyxl = pytest.importorskip('openpyxl')
+
+
+def _quiet(msg):
+    pass
+
+
+def test_history_key_normalization():
+    assert history_key([12345.0]) == history_key(['12345 ']) == '12345'
+    assert history_key(['A', 1]) == 'A\x1f1'
+    assert history_key(['A', '  ']) is None and history_key([None]) is None
+
+
+def test_matches_earliest_source_and_excludes_self(tmp_path):
+    with KeyHistory(str(tmp_path / 'keys.sqlite')) as history:
+        for path, keys in (('jan.xlsx', ['T1', 'T2', 'T2']), ('feb.xlsx', ['T2', 'T3'])):
+            table = history.stage(enumerate(([key] for key in keys), start=2))
+            history.commit(table, str(tmp_path / path), 'Sheet1', 'A')
+            history.drop(table)
+        assert [source['rows'] for source in history.sources()] == [2, 2]
+        assert history.key_count() == 4
+
+        table = history.stage([(2, ['T3']), (3, ['T2']), (4, ['T9']), (5, [''])])
+        assert history.staged_count(table) == 3
+        found = [(row, key, path.endswith('jan.xlsx'), source_row)
+                 for row, key, path, sheet, source_row in history.matches(table)]
+        # 同一文件内重复的键记第一次出现的行，命中时报最早加入的来源
+        assert found == [(2, 'T3', False, 3), (3, 'T2', True, 3)]
+        excluded = list(history.matches(table, exclude=(str(tmp_path / 'feb.xlsx'), 'Sheet1')))
+        assert [row for row, *_ in excluded] == [3]
+
+        # 再次加入同一 文件+工作表 时替换旧键
+        history.commit(table, str(tmp_path / 'feb.xlsx'), 'Sheet1', 'A')
+        assert len(history.sources()) == 2 and history.key_count() == 5
+        assert history.remove(str(tmp_path / 'jan.xlsx')) == 1
+        assert history.key_count() == 3
+
+
+def test_highlight_history_duplicates(tmp_path):
+    db_path = str(tmp_path / 'history' / 'keys.sqlite')
+    jan = write_xlsx(tmp_path / 'jan.xlsx', sheet_xml(value_rows([['no'], ['X1'], ['X2']]), 'A1:A3'))
+    feb = write_xlsx(tmp_path / 'feb.xlsx', sheet_xml(value_rows([['no'], ['X3'], ['X2'], ['X1']]), 'A1:A4'))
+
+    first = highlight_history_duplicates(jan, 'A', db_path, logger=_quiet)
+    assert first['cells_highlighted'] == 0 and first['keys_indexed'] == 2
+    second = highlight_history_duplicates(feb, 'A', db_path, logger=_quiet)
+    assert second['cells_highlighted'] == 2 and second['history_sources'] == 1
+
+    sheet = openpyxl.load_workbook(feb)['Sheet1']
+    assert [row for row in range(2, 5) if sheet.cell(row, 1).fill.fill_type == 'solid'] == [3, 4]
+    # 同一文件再次运行时不与自己比对：X3 只在 feb 自己的旧记录里
+    again = highlight_history_duplicates(feb, 'A', db_path, logger=_quiet)
+    assert again['cells_highlighted'] == 2 and again['history_sources'] == 2
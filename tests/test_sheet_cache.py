@@ -0,0 +1,80 @@
+"""工作表解析结果的磁盘缓存"""
+import os
+
+import pytest
+
+from excel_toolkit import sheet_cache
+from excel_toolkit.excel_lite import ExcelReader
+from conftest import sheet_xml, value_rows, write_xlsx
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    directory = tmp_path / 'cache'
+    monkeypatch.setattr(sheet_cache, 'CACHE_DIR', str(directory))
+    return directory
+
+
+def _sheet_values(path):
+    reader = ExcelReader(path, cache=True)
+    try:
+        return [list(row) for row in reader['Sheet1'].iter_rows(values_only=True)]
+    finally:
+        reader.close()
+
+
+def _write(path, rows):
+    return write_xlsx(path, sheet_xml(value_rows(rows), f'A1:B{len(rows)}'))
+
+
+def test_cache_hit_for_unchanged_file(tmp_path, cache_dir):
+    path = _write(tmp_path / 'data.xlsx', [['sku', 'qty'], ['A1', 3], ['B2', 5]])
+
+    assert _sheet_values(path) == [['sku', 'qty'], ['A1', 3], ['B2', 5]]
+    assert sheet_cache.load_sheet(path, 'Sheet1') is not None
+    entries = sorted(os.listdir(cache_dir))
+    # 再次读取命中缓存，不产生新的缓存文件
+    assert _sheet_values(path) == [['sku', 'qty'], ['A1', 3], ['B2', 5]]
+    assert sorted(os.listdir(cache_dir)) == entries
+
+
+def test_cache_invalidated_by_save(tmp_path):
+    path = _write(tmp_path / 'data.xlsx', [['sku', 'qty'], ['A1', 3], ['B2', 5]])
+    _sheet_values(path)
+
+    reader = ExcelReader(path, cache=True)
+    reader['Sheet1'].cell(2, 2, value=30)
+    reader.save()
+    reader.close()
+
+    assert _sheet_values(path) == [['sku', 'qty'], ['A1', 30], ['B2', 5]]
+
+
+def test_cache_invalidated_by_same_size_rewrite(tmp_path):
+    path = _write(tmp_path / 'data.xlsx', [['sku', 'qty'], ['A1', 3]])
+    _sheet_values(path)
+    stat = os.stat(path)
+
+    # 大小相同、内容不同的文件只靠修改时间区分
+    _write(tmp_path / 'data.xlsx', [['sku', 'qty'], ['A1', 4]])
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert os.stat(path).st_size == stat.st_size
+
+    assert _sheet_values(path) == [['sku', 'qty'], ['A1', 4]]
+
+
+def test_corrupt_cache_is_ignored(tmp_path, cache_dir):
+    path = _write(tmp_path / 'data.xlsx', [['sku', 'qty'], ['A1', 3]])
+    _sheet_values(path)
+    with open(sheet_cache.cache_path(path, 'Sheet1'), 'r+b') as f:
+        f.write(b'JUNK')
+
+    assert sheet_cache.load_sheet(path, 'Sheet1') is None
+    assert _sheet_values(path) == [['sku', 'qty'], ['A1', 3]]
+
+
+def test_tool_cache_is_opt_in(monkeypatch):
+    assert sheet_cache.is_enabled() is False
+    monkeypatch.setattr(sheet_cache, '_enabled', False)
+    sheet_cache.set_enabled(1)
+    assert sheet_cache.is_enabled() is True
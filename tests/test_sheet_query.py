@@ -0,0 +1,89 @@
+"""SheetQuery 的工作表导入与基于它的列对比"""
+from collections import Counter
+
+import pytest
+
+from excel_toolkit.compare import process_compare_columns
+from excel_toolkit.excel_lite import ExcelLiteError, ExcelReader
+from excel_toolkit.sheet_query import SheetQuery, text_key
+from conftest import sheet_xml, value_rows, write_xlsx
+
+
+def _gap_xlsx(tmp_path):
+    # 第4行整行缺失，第5行所选列为空
+    rows = value_rows([['sku', 'qty', 'note'], ['A1', 3, 'x'], [' B2 ', None, None]])
+    rows += ('<row r="5"><c r="C5" t="inlineStr"><is><t>only-note</t></is></c></row>'
+             '<row r="6"><c r="A6" t="inlineStr"><is><t>C3</t></is></c><c r="B6"><v>7</v></c></row>')
+    return write_xlsx(tmp_path / 'gap.xlsx', sheet_xml(rows, 'A1:C6'))
+
+
+def test_load_sheet_keeps_sheet_row_numbers(tmp_path):
+    ws = ExcelReader(_gap_xlsx(tmp_path))['Sheet1']
+    with SheetQuery() as q:
+        assert q.load_sheet('t', ws, {'sku': 'sku', 'qty': 'B'}, key=text_key, index=['sku']) == 3
+        assert list(q.query('SELECT _row, sku, qty FROM t ORDER BY _row')) == [
+            (2, 'A1', '3'), (3, 'B2', None), (6, 'C3', '7')]
+
+        # 不跳过空行时缺失的行与空行也导入，行号仍与工作表一致
+        q.load_sheet('all', ws, ['sku'], skip_empty=False)
+        assert list(q.query('SELECT _row, sku FROM "all" ORDER BY _row')) == [
+            (2, 'A1'), (3, ' B2 '), (4, None), (5, None), (6, 'C3')]
+
+        with pytest.raises(ExcelLiteError):
+            q.load_sheet('bad', ws, ['missing'])
+
+
+def test_load_rows_appends_and_checks_columns():
+    with SheetQuery(temp_file=True) as q:
+        q.load_rows('t', ['a', 'b'], [(1, 'x'), (2, 'y')])
+        q.load_rows('t', ['a', 'b'], iter([(3, 'z')]), index=[('a', 'b')])
+        assert q.scalar('SELECT COUNT(*) FROM t') == 3
+        with pytest.raises(ExcelLiteError):
+            q.load_rows('t', ['a'], [(4,)])
+
+
+_X = [['v'], ['a'], ['b'], ['b'], [' c '], [None], ['d'], [3], ['']]
+_Y = [['v'], ['b'], ['c'], ['c'], ['e'], ['3'], ['f'], ['']]
+
+
+def _compare(tmp_path, ignore_duplicates):
+    x_path = write_xlsx(tmp_path / 'x.xlsx', sheet_xml(value_rows(_X)))
+    y_path = write_xlsx(tmp_path / 'y.xlsx', sheet_xml(value_rows(_Y)))
+    messages = []
+    result = process_compare_columns(x_path, ['Sheet1'], 'A', y_path, 'Sheet1', 'A',
+                                     logger=messages.append, ignore_duplicates=ignore_duplicates)
+    return result, messages
+
+
+def _values(rows):
+    # 原实现的规则：去掉首尾空白，空值不参与
+    return [str(row[0]).strip() for row in rows[1:] if row[0] is not None and str(row[0]).strip()]
+
+
+def test_compare_unique_values_matches_set_difference(tmp_path):
+    x, y = set(_values(_X)), set(_values(_Y))
+    result, messages = _compare(tmp_path, ignore_duplicates=True)
+
+    assert f"X端唯一值: {len(x)}；Y端唯一值: {len(y)}。" in result
+    assert f"Y缺失: {len(x - y)}；Y多余: {len(y - x)}。" in result
+    assert [m[4:] for m in messages if m.startswith('  - ')] == sorted(x - y) + sorted(y - x)
+
+
+def test_compare_counts_matches_counter_difference(tmp_path):
+    x, y = Counter(_values(_X)), Counter(_values(_Y))
+    result, messages = _compare(tmp_path, ignore_duplicates=False)
+
+    missing, extra = x - y, y - x
+    assert f"X总值: {sum(x.values())}；Y总值: {sum(y.values())}。唯一值 X={len(x)}，Y={len(y)}。" in result
+    assert f"Y缺失总数: {sum(missing.values())}；Y多余总数: {sum(extra.values())}。" in result
+    expected = [f"{v}: X={x[v]}, Y={y[v]}, 差={abs(x[v] - y[v])}" for v in sorted(missing)]
+    expected += [f"{v}: X={x[v]}, Y={y[v]}, 差={abs(x[v] - y[v])}" for v in sorted(extra)]
+    assert [m[4:] for m in messages if m.startswith('  - ')] == expected
+
+
+def test_compare_identical_columns(tmp_path):
+    path = write_xlsx(tmp_path / 'same.xlsx', sheet_xml(value_rows([['v'], ['a'], ['b'], ['a']])))
+    for ignore_duplicates in (True, False):
+        result = process_compare_columns(path, ['Sheet1'], 'A', path, 'Sheet1', 'A',
+                                         logger=lambda msg: None, ignore_duplicates=ignore_duplicates)
+        assert result.startswith('对比完成：一致')
@@ -0,0 +1,79 @@
+"""州名/邮编 -> 州缩写"""
+import pytest
+
+from excel_toolkit.states import get_state_abbreviation, process_states, state_from_zip
+from conftest import sheet_xml, value_rows, write_xlsx
+
+openpyxl = pytest.importorskip('openpyxl')
+
+
+@pytest.mark.parametrize('zip_code, expected', [
+    # 本土各区间的边界
+    ('00501', 'NY'), ('01001', 'MA'), ('02801', 'RI'), ('10001', 'NY'), ('20001', 'DC'),
+    ('20101', 'VA'), ('33101', 'FL'), ('73301', 'TX'), ('73101', 'OK'), ('88501', 'TX'),
+    ('90210', 'CA'), ('96101', 'CA'), ('96801', 'HI'), ('99501', 'AK'), ('99950', 'AK'),
+    # 属地
+    ('00601', 'PR'), ('00802', 'VI'), ('00901', 'PR'), ('96910', 'GU'), ('96799', 'AS'),
+    ('96939', 'PW'), ('96941', 'FM'), ('96950', 'MP'), ('96960', 'MH'), ('96970', 'MH'),
+    # 军邮
+    ('09001', 'AE'), ('34001', 'AA'), ('96201', 'AP'), ('96601', 'AP'),
+    # ZIP+4、数字单元格、丢了前导0
+    ('90210-1234', 'CA'), ('902101234', 'CA'), (' 10001 ', 'NY'), (90210, 'CA'), (90210.0, 'CA'),
+    (902101234, 'CA'), (601, 'PR'), ('601', 'PR'), (2101, 'MA'), ('2101', 'MA'),
+    # 无法识别
+    (None, None), ('', None), ('ABCDE', None), ('1234567', None), (90210.5, None), (True, None),
+    (0, None), ('00001', None), ('99', None),
+])
+def test_state_from_zip(zip_code, expected):
+    assert state_from_zip(zip_code) == expected
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('California', 'CA'), ('  new   YORK ', 'NY'), ('ca', 'CA'), ('Calif.', 'CA'), ('N. Carolina', 'NC'),
+    ('S Dakota', 'SD'), ('W. Va.', 'WV'), ('D.C.', 'DC'), ('Washington, D.C.', 'DC'), ('Puerto Rico', 'PR'),
+    ('U.S. Virgin Islands', 'VI'), ('Rhode-Island', 'RI'), ('Narnia', None), ('', None), (None, None),
+])
+def test_get_state_abbreviation(name, expected):
+    assert get_state_abbreviation(name) == expected
+
+
+def _states_xlsx(tmp_path):
+    rows = [['state', 'zip'], ['California', '10001'], [None, '33101'], ['Narnia', '601'],
+            ['Texas', 75001], [None, None], [None, 'bad']]
+    return write_xlsx(tmp_path / 'states.xlsx', sheet_xml(value_rows(rows), 'A1:B7'))
+
+
+def _column(path, col=1):
+    sheet = openpyxl.load_workbook(path)['Sheet1']
+    return [sheet.cell(row, col).value for row in range(2, 8)]
+
+
+def test_process_states_fill_from_zip(tmp_path):
+    path = _states_xlsx(tmp_path)
+
+    stats = process_states(path, 'Sheet1', 'A', logger=lambda msg: None, zip_column_letter='B')
+
+    # 州名可识别时保留州名结果，空白或无法识别时按邮编补全
+    assert _column(path) == ['CA', 'FL', 'PR', 'TX', None, None]
+    assert _column(path, 2)[:4] == ['10001', '33101', '601', 75001]
+    assert stats == {'success': 4, 'failed': 0, 'total': 4, 'from_zip': 2, 'mismatch': 0}
+
+
+def test_process_states_validate_reports_mismatches(tmp_path):
+    path = _states_xlsx(tmp_path)
+    messages = []
+
+    stats = process_states(path, 'Sheet1', 'A', logger=messages.append, zip_column_letter='B', zip_mode='validate')
+
+    assert _column(path) == ['CA', 'FL', 'PR', 'TX', None, None]
+    assert stats['mismatch'] == 1
+    assert any("'California' -> CA" in msg and '-> NY' in msg for msg in messages)
+
+
+def test_process_states_without_zip_keeps_unknown_names(tmp_path):
+    path = _states_xlsx(tmp_path)
+
+    stats = process_states(path, 'Sheet1', 'A', logger=lambda msg: None)
+
+    assert _column(path) == ['CA', None, 'Narnia', 'TX', None, None]
+    assert stats == {'success': 2, 'failed': 1, 'total': 3, 'from_zip': 0, 'mismatch': 0}
@@ -0,0 +1,84 @@
+"""列式 Table 的整列操作与写回"""
+import pytest
+
+from excel_toolkit.excel_lite import ExcelLiteError, ExcelReader
+from excel_toolkit.table import Table
+from conftest import sheet_xml, value_rows, write_xlsx
+
+openpyxl = pytest.importorskip('openpyxl')
+
+
+@pytest.fixture
+def orders_xlsx(tmp_path):
+    rows = [['sku', 'qty', 'state'], ['A1', 3, 'texas'], ['B2', None, ' '], ['A1', '5', 'Ohio'], ['C3', 'x', None]]
+    return write_xlsx(tmp_path / 'orders.xlsx', sheet_xml(value_rows(rows), 'A1:C5'))
+
+
+def test_from_sheet_by_header_letter_and_number(orders_xlsx):
+    ws = ExcelReader(orders_xlsx)['Sheet1']
+    t = Table.from_sheet(ws, {'sku': 'sku', 'qty': 'B', 'state': 3})
+
+    assert t.rows == [2, 3, 4, 5]
+    assert t['sku'] == ['A1', 'B2', 'A1', 'C3']
+    # 空单元格读作空串
+    assert t['state'] == ['texas', ' ', 'Ohio', '']
+    with pytest.raises(ExcelLiteError):
+        Table.from_sheet(ws, ['missing'])
+
+
+def test_map_filter_where_assign(orders_xlsx):
+    t = Table.from_sheet(ExcelReader(orders_xlsx)['Sheet1'], ['sku', 'qty', 'state'])
+
+    assert t.map(lambda sku, qty: f'{sku}:{qty}', 'sku', 'qty') == ['A1:3', 'B2:', 'A1:5', 'C3:x']
+    present = t.filter('state')
+    assert present.rows == [2, 4] and present['sku'] == ['A1', 'A1']
+    assert t.filter('sku', lambda sku: sku != 'A1').rows == [3, 5]
+    assert t.where([True, False, False, True])['qty'] == [3, 'x']
+    assert t.numeric('qty', default=-1) == [3.0, -1, 5.0, -1]
+    t.assign('double', (value * 2 for value in t.numeric('qty')))
+    assert t['double'] == [6.0, 0.0, 10.0, 0.0]
+    with pytest.raises(ExcelLiteError):
+        t.assign('short', [1])
+
+
+def test_lookup_with_missing_keys_and_normalization():
+    t = Table({'state': ['Texas', 'ohio', None, 'Narnia']}, [2, 3, 4, 5])
+
+    states = {'texas': 'TX', 'ohio': 'OH'}
+    assert t.lookup('state', states, key=lambda v: v.lower() if v else v) == ['TX', 'OH', None, None]
+    assert t.lookup('state', {'Texas': 'TX'}, default='?') == ['TX', '?', '?', '?']
+
+
+def test_join_missing_and_duplicate_keys():
+    orders = Table({'sku': ['A1', 'B2', 'A1', 'Z9', None]}, [2, 3, 4, 5, 6])
+    catalog = Table({'sku': ['A1', 'B2', 'A1', ''], 'name': ['old', 'bolt', 'nut', 'blank'], 'w': [1, 2, 3, 4]},
+                    [2, 3, 4, 5])
+
+    orders.join('sku', catalog, 'sku', ['name', 'w'], prefix='cat_')
+
+    # 右表键重复时后出现的行生效；找不到的键与空键为 None，空键不参与连接
+    assert orders['cat_name'] == ['nut', 'bolt', 'nut', None, None]
+    assert orders['cat_w'] == [3, 2, 3, None, None]
+    assert catalog.to_dict('sku', 'name') == {'A1': 'nut', 'B2': 'bolt'}
+    assert catalog.to_dict('sku', 'name', skip_blank=False)[''] == 'blank'
+
+
+def test_join_on_empty_table():
+    empty = Table({'sku': []}, [])
+    empty.join('sku', Table({'sku': ['A1'], 'name': ['nut']}, [2]), 'sku', ['name'])
+    assert empty['name'] == [] and len(empty) == 0
+
+
+def test_write_round_trip(orders_xlsx):
+    reader = ExcelReader(orders_xlsx)
+    ws = reader['Sheet1']
+    t = Table.from_sheet(ws, ['sku', 'state'])
+    t.assign('abbr', t.lookup('state', {'texas': 'TX', 'ohio': 'OH'}, key=lambda v: str(v).strip().lower()))
+
+    assert t.write(ws, {'abbr': 'C', 'sku': 4}) == 6
+    reader.save()
+
+    sheet = openpyxl.load_workbook(orders_xlsx)['Sheet1']
+    # 查不到的值为 None，保持原单元格不变
+    assert [sheet.cell(r, 3).value for r in range(2, 6)] == ['TX', ' ', 'OH', None]
+    assert [sheet.cell(r, 4).value for r in range(2, 6)] == ['A1', 'B2', 'A1', 'C3']
@@ -0,0 +1,161 @@
+"""xlsx_patch 的流式改写：结果用 openpyxl 读回对照"""
+import os
+import re
+import stat
+
+import pytest
+
+from excel_toolkit.excel_lite import ExcelReader
+from conftest import read_member, sheet_xml, value_rows, write_xlsx
+
+openpyxl = pytest.importorskip('openpyxl')
+
+
+def _values(path, sheet='Sheet1'):
+    ws = openpyxl.load_workbook(path)[sheet]
+    return [list(row) for row in ws.iter_rows(values_only=True)]
+
+
+def _fill_color(cell):
+    return cell.fill.fgColor.rgb if cell.fill is not None and cell.fill.fill_type == 'solid' else None
+
+
+@pytest.fixture
+def simple_xlsx(tmp_path):
+    rows = [['sku', 'qty', 'note'], ['A1', 3, 'x'], ['B2', 5, None], ['C3', 7, 'z']]
+    return write_xlsx(tmp_path / 'simple.xlsx', sheet_xml(value_rows(rows), 'A1:C4'))
+
+
+def test_save_values_round_trip(simple_xlsx):
+    reader = ExcelReader(simple_xlsx)
+    ws = reader['Sheet1']
+    ws.cell(2, 2, value=30)
+    ws.cell(3, 3, value='new')
+    ws.cell(6, 1, value='tail')
+    reader.save()
+
+    assert _values(simple_xlsx) == [
+        ['sku', 'qty', 'note'],
+        ['A1', 30, 'x'],
+        ['B2', 5, 'new'],
+        ['C3', 7, 'z'],
+        [None, None, None],
+        ['tail', None, None],
+    ]
+    assert re.search(r'<dimension ref="A1:C6"/>', read_member(simple_xlsx, 'xl/worksheets/sheet1.xml'))
+
+
+def test_fill_keeps_values_and_dedups_styles(simple_xlsx):
+    reader = ExcelReader(simple_xlsx)
+    ws = reader['Sheet1']
+    for row in (2, 3, 4):
+        ws.fill(row, 1, 'FFF59E')
+        ws.fill(row, 2, '#FFF59E')
+    reader.save()
+
+    wb = openpyxl.load_workbook(simple_xlsx)
+    sheet = wb['Sheet1']
+    assert [[sheet.cell(r, c).value for c in (1, 2)] for r in (2, 3, 4)] == [['A1', 3], ['B2', 5], ['C3', 7]]
+    assert {_fill_color(sheet.cell(r, c)) for r in (2, 3, 4) for c in (1, 2)} == {'FFFFF59E'}
+    assert _fill_color(sheet.cell(1, 1)) is None
+
+    styles = read_member(simple_xlsx, 'xl/styles.xml')
+    # 同一颜色只追加一个填充和一个单元格格式
+    assert '<fills count="3">' in styles
+    assert re.search(r'<cellXfs count="2">', styles)
+
+
+def test_overwriting_value_drops_calc_chain(tmp_path):
+    rows = value_rows([['a', 'b', 'c'], [1, 2, None]]).replace(
+        '<c r="B2"><v>2</v></c>', '<c r="B2"><v>2</v></c><c r="C2"><f>A2+B2</f><v>3</v></c>')
+    path = write_xlsx(tmp_path / 'calc.xlsx', sheet_xml(rows, 'A1:C2'), calc_chain=True)
+    reader = ExcelReader(path)
+    reader['Sheet1'].cell(2, 1, value=5)
+    reader.save()
+
+    import zipfile
+    with zipfile.ZipFile(path) as z:
+        names = z.namelist()
+        rels = z.read('xl/_rels/workbook.xml.rels').decode()
+        content_types = z.read('[Content_Types].xml').decode()
+    assert 'xl/calcChain.xml' not in names
+    assert 'calcChain' not in rels and 'calcChain' not in content_types
+    sheet = openpyxl.load_workbook(path)['Sheet1']
+    assert sheet['A2'].value == 5 and sheet['C2'].value == '=A2+B2'
+
+
+def test_overwriting_shared_formula_master_expands_children(shared_formula_xlsx):
+    reader = ExcelReader(shared_formula_xlsx)
+    reader['Sheet1'].cell(2, 3, value='X')
+    reader.save()
+
+    xml = read_member(shared_formula_xlsx, 'xl/worksheets/sheet1.xml')
+    # 没有留下找不到主单元格的共享公式
+    assert 't="shared"' not in xml and 'si="0"' not in xml
+    sheet = openpyxl.load_workbook(shared_formula_xlsx)['Sheet1']
+    assert sheet['C2'].value == 'X'
+    assert [sheet.cell(r, 3).value for r in range(3, 7)] == ['=A3*2', '=A4*2', '=A5*2', '=A6*2']
+
+
+def test_overwriting_shared_formula_child_keeps_group(shared_formula_xlsx):
+    reader = ExcelReader(shared_formula_xlsx)
+    reader['Sheet1'].cell(4, 3, value=0)
+    reader.save()
+
+    xml = read_member(shared_formula_xlsx, 'xl/worksheets/sheet1.xml')
+    assert 'ref="C2:C6"' in xml
+    sheet = openpyxl.load_workbook(shared_formula_xlsx)['Sheet1']
+    assert [sheet.cell(r, 3).value for r in range(2, 7)] == ['=A2*2', '=A3*2', 0, '=A5*2', '=A6*2']
+
+
+def test_transform_column_round_trip(simple_xlsx):
+    reader = ExcelReader(simple_xlsx)
+    changed = reader.transform_column('Sheet1', 1, lambda value: value.lower() if value != 'B2' else None)
+
+    assert changed == 2
+    assert _values(simple_xlsx) == [['sku', 'qty', 'note'], ['a1', 3, 'x'], ['B2', 5, None], ['c3', 7, 'z']]
+
+
+def test_transform_column_to_new_column(simple_xlsx):
+    reader = ExcelReader(simple_xlsx)
+    reader.transform_column('Sheet1', (1, 2), lambda sku, qty: f'{sku}-{qty}', dst_column=5)
+
+    assert [row[4] for row in _values(simple_xlsx)] == [None, 'A1-3', 'B2-5', 'C3-7']
+    assert '<dimension ref="A1:E4"/>' in read_member(simple_xlsx, 'xl/worksheets/sheet1.xml')
+
+
+def test_transform_over_shared_formula_master_expands_unchanged_rows(shared_formula_xlsx):
+    reader = ExcelReader(shared_formula_xlsx)
+    # 只改写主单元格所在的第2行，其余行不改动
+    reader.transform_column('Sheet1', 1, lambda value: 'master' if value == 2 else None, dst_column=3)
+
+    xml = read_member(shared_formula_xlsx, 'xl/worksheets/sheet1.xml')
+    assert 't="shared"' not in xml
+    sheet = openpyxl.load_workbook(shared_formula_xlsx)['Sheet1']
+    assert [sheet.cell(r, 3).value for r in range(2, 7)] == ['master', '=A3*2', '=A4*2', '=A5*2', '=A6*2']
+
+
+def test_save_keeps_mode_and_symlink(tmp_path, simple_xlsx):
+    os.chmod(simple_xlsx, 0o644)
+    link = tmp_path / 'link.xlsx'
+    link.symlink_to(simple_xlsx)
+
+    reader = ExcelReader(str(link))
+    reader['Sheet1'].cell(2, 1, value='x')
+    reader.save()
+
+    assert link.is_symlink()
+    assert stat.S_IMODE(os.stat(simple_xlsx).st_mode) == 0o644
+    assert _values(simple_xlsx)[1][0] == 'x'
+
+
+def test_save_as_new_file_uses_umask(tmp_path, simple_xlsx):
+    umask = os.umask(0o022)
+    try:
+        reader = ExcelReader(simple_xlsx)
+        reader['Sheet1'].cell(2, 1, value='x')
+        reader.save(str(tmp_path / 'copy.xlsx'))
+    finally:
+        os.umask(umask)
+
+    assert stat.S_IMODE(os.stat(tmp_path / 'copy.xlsx').st_mode) == 0o644